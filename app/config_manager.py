@@ -1,25 +1,41 @@
 """
 Configuration file management for the geotagging application
 """
+import json
 import yaml
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+# Use the libyaml C implementation when available (much faster than pure Python)
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+
+@dataclass(slots=True)
+class Config:
+    """Known configuration settings and their default values"""
+    map_provider: str = "osm"  # 'osm', 'esri', or 'google'
+    elevation_service: str = "open-elevation"  # 'none', 'open-elevation', 'opentopodata', or 'google'
+    filename_format: str = "%Y%m%d_%H%M%S_{title}"
+    include_subfolders: bool = False
+    sort_by: str = "time"  # 'time' or 'name'
+    thumbnail_size: int = 150  # pixels
+    folder_path: str = ""
+    export_folder: str = ""  # Export destination folder
+    auto_save_config: bool = True  # Auto-save config file on changes
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Settings as a plain dict (field order preserved)"""
+        return asdict(self)
+
 
 class ConfigManager:
     """Manages application configuration with YAML file persistence"""
     
-    DEFAULT_CONFIG = {
-        "map_provider": "osm",  # 'osm', 'esri', or 'google'
-        "elevation_service": "open-elevation",  # 'none', 'open-elevation', 'opentopodata', or 'google'
-        "filename_format": "%Y%m%d_%H%M%S_{title}",
-        "include_subfolders": False,
-        "sort_by": "time",  # 'time' or 'name'
-        "thumbnail_size": 150,  # pixels
-        "folder_path": "",
-        "export_folder": "",  # Export destination folder
-        "auto_save_config": True  # Auto-save config file on changes
-    }
+    DEFAULT_CONFIG = Config().as_dict()
     
     def __init__(self, config_file: Optional[str] = None):
         """
@@ -30,6 +46,8 @@ class ConfigManager:
         """
         self.config_file = Path(config_file) if config_file else None
         self.config = self.DEFAULT_CONFIG.copy()
+        # Fingerprint of the last successful save, used to skip redundant writes
+        self._saved_fingerprint: Optional[str] = None
         
         if self.config_file and self.config_file.exists():
             self.load()
@@ -45,8 +63,10 @@ class ConfigManager:
             return False
         
         try:
-            with open(self.config_file, 'r', encoding='utf-8') as f:
-                loaded_config = yaml.safe_load(f)
+            loaded_config = self._load_json_sidecar()
+            if loaded_config is None:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded_config = yaml.load(f, Loader=_Loader)
             
             # Merge with defaults to ensure all keys exist
             self.config = self.DEFAULT_CONFIG.copy()
@@ -69,12 +89,21 @@ class ConfigManager:
         if not self.config_file:
             return False
         
+        fingerprint = self._fingerprint()
+        if fingerprint == self._saved_fingerprint and self.config_file.exists():
+            # Nothing changed since the last save
+            return True
+        
         try:
             # Create directory if it doesn't exist
             self.config_file.parent.mkdir(parents=True, exist_ok=True)
             
             with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(self.config, f, default_flow_style=False, sort_keys=False)
+                yaml.dump(self.config, f, Dumper=_Dumper, default_flow_style=False, sort_keys=False)
+            
+            # Written after the YAML so it can record the saved file's mtime and size
+            self._save_json_sidecar()
+            self._saved_fingerprint = fingerprint
             
             print(f"✓ Configuration saved to {self.config_file}")
             return True
@@ -82,6 +111,59 @@ class ConfigManager:
             print(f"✗ Error saving config file: {e}")
             return False
     
+    def _fingerprint(self) -> str:
+        """Serialized form of the config and target file, compared to detect changes"""
+        return json.dumps([str(self.config_file), self.config], sort_keys=True, default=str)
+    
+    def _json_sidecar_path(self) -> Optional[Path]:
+        """Path of the JSON copy kept next to the YAML config for fast loading"""
+        if not self.config_file or self.config_file.suffix.lower() == '.json':
+            return None
+        # A suffix of its own, so a user's '<name>.json' is never overwritten
+        return self.config_file.with_name(f"{self.config_file.name}.cache.json")
+    
+    def _load_json_sidecar(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the JSON sidecar if it was written from the current YAML file
+        
+        The YAML file stays the canonical, human-edited form. The sidecar
+        records the YAML file's mtime (ns) and size when it was saved and is
+        only used while both still match exactly, so any edit makes it stale.
+        
+        Returns:
+            The loaded configuration, or None if the YAML file should be parsed instead
+        """
+        sidecar = self._json_sidecar_path()
+        if not sidecar or not sidecar.exists():
+            return None
+        
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            stat = self.config_file.stat()
+            if (not isinstance(cached, dict) or cached.get('yaml_mtime_ns') != stat.st_mtime_ns
+                    or cached.get('yaml_size') != stat.st_size):
+                return None
+            loaded_config = cached.get('config')
+            return loaded_config if isinstance(loaded_config, dict) else None
+        except Exception:
+            return None
+    
+    def _save_json_sidecar(self):
+        """Write the JSON sidecar next to the YAML config, tied to the YAML file's mtime and size"""
+        sidecar = self._json_sidecar_path()
+        if not sidecar:
+            return
+        
+        try:
+            stat = self.config_file.stat()
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                json.dump({'yaml_mtime_ns': stat.st_mtime_ns, 'yaml_size': stat.st_size,
+                           'config': self.config}, f)
+        except Exception as e:
+            # The sidecar is only a cache, the YAML file has been saved
+            print(f"Warning: Could not write config cache {sidecar}: {e}")
+    
     def save_as(self, new_path: str) -> bool:
         """
         Save configuration to a new file and update config_file path
@@ -107,6 +189,14 @@ class ConfigManager:
         """Update multiple configuration values"""
         self.config.update(updates)
     
+    def get_settings(self) -> Config:
+        """
+        Get the known settings as a typed Config snapshot
+        
+        Keys outside the Config schema are ignored; use get() for those.
+        """
+        return Config(**{f.name: self.config[f.name] for f in fields(Config) if f.name in self.config})
+    
     def get_all(self) -> Dict[str, Any]:
         """Get all configuration values"""
         return self.config.copy()
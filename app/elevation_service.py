@@ -1,21 +1,76 @@
 """
 Elevation Service - Fetches elevation data from various APIs
 """
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
 import requests
 import urllib3
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Optional, Dict, List, Tuple, Union
 
 # Disable SSL warnings for APIs with certificate issues
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Maximum number of locations accepted per request by the public APIs
+MAX_LOCATIONS_PER_REQUEST = 100
+
+# Minimum seconds between requests per service (public rate limits)
+MIN_REQUEST_INTERVAL = {
+    'opentopodata': 1.0,
+}
+
+# Elevation cache: coordinates rounded to 5 decimals (~1 m), LRU bounded
+CACHE_PRECISION = 5
+CACHE_MAX_ENTRIES = 4096
+
 
 class ElevationService:
-    def __init__(self):
-        self.services = {
-            'open-elevation': self._open_elevation,
-            'opentopodata': self._opentopodata,
-            'google': self._google_elevation
-        }
+    # Service name -> fetch method name, shared by all instances (read-only)
+    services = MappingProxyType({
+        'open-elevation': '_open_elevation',
+        'opentopodata': '_opentopodata',
+        'google': '_google_elevation'
+    })
+    
+    def __init__(self, cache_file: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            cache_file: Optional JSON file used to persist the elevation cache
+        """
+        # Pooled session so consecutive lookups reuse keep-alive connections
+        self._session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        
+        # Per-service throttling state shared by concurrent workers
+        self._throttle_locks = {name: threading.Lock() for name in self.services}
+        self._last_request = {name: 0.0 for name in self.services}
+        
+        # In-memory LRU cache of elevations, optionally persisted to disk
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_dirty = False
+        self._load_cache()
+    
+    def close(self):
+        """Persist the elevation cache and release pooled HTTP connections"""
+        self.save_cache()
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def get_elevation(self, latitude: float, longitude: float, service: str = 'open-elevation') -> Optional[float]:
         """
@@ -29,72 +84,215 @@ class ElevationService:
         Returns:
             Elevation in meters or None if failed
         """
+        return self.get_elevations([(latitude, longitude)], service)[0]
+    
+    def get_elevations(self, coords: List[Tuple[float, float]], service: str = 'open-elevation') -> List[Optional[float]]:
+        """
+        Get elevations for a list of coordinates using specified service
+        
+        Cached coordinates are answered from memory; the rest are sent in
+        chunks of MAX_LOCATIONS_PER_REQUEST, one HTTP request per chunk.
+        
+        Args:
+            coords: List of (latitude, longitude) tuples in decimal degrees
+            service: Service name ('open-elevation', 'opentopodata', 'google')
+        
+        Returns:
+            List of elevations in meters (None for failed lookups), in input order
+        """
+        return self._get_elevations(coords, service, workers=1)
+    
+    def get_elevations_parallel(self, coords: List[Tuple[float, float]], service: str = 'open-elevation',
+                                workers: int = 8) -> List[Optional[float]]:
+        """
+        Get elevations for a list of coordinates, fetching chunks concurrently
+        
+        Each chunk of MAX_LOCATIONS_PER_REQUEST coordinates is fetched on a
+        worker thread over the shared session. Services with a rate limit are
+        still throttled to their minimum request interval.
+        
+        Args:
+            coords: List of (latitude, longitude) tuples in decimal degrees
+            service: Service name ('open-elevation', 'opentopodata', 'google')
+            workers: Maximum number of concurrent requests
+        
+        Returns:
+            List of elevations in meters (None for failed lookups), in input order
+        """
+        return self._get_elevations(coords, service, workers=workers)
+    
+    def _get_elevations(self, coords: List[Tuple[float, float]], service: str, workers: int) -> List[Optional[float]]:
+        """Resolve elevations from the cache, fetching the misses in chunks"""
         if service not in self.services:
             raise ValueError(f"Unknown elevation service: {service}")
         
+        coords = list(coords)
+        keys = [self._cache_key(lat, lon, service) for lat, lon in coords]
+        elevations = [self._cache_lookup(key) for key in keys]
+        
+        missing = [i for i, elevation in enumerate(elevations) if elevation is None]
+        chunks = [missing[start:start + MAX_LOCATIONS_PER_REQUEST]
+                  for start in range(0, len(missing), MAX_LOCATIONS_PER_REQUEST)]
+        
+        def fetch(indices):
+            return self._fetch_chunk([coords[i] for i in indices], service)
+        
+        if workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                fetched = list(executor.map(fetch, chunks))
+        else:
+            fetched = [fetch(indices) for indices in chunks]
+        
+        for indices, results in zip(chunks, fetched):
+            for i, elevation in zip(indices, results):
+                elevations[i] = elevation
+                if elevation is not None and keys[i] is not None:
+                    self._cache_store(keys[i], elevation)
+        
+        return elevations
+    
+    def _fetch_chunk(self, chunk: List[Tuple[float, float]], service: str) -> List[Optional[float]]:
+        """Fetch one chunk from the service, returning None entries on failure"""
         try:
-            return self.services[service](latitude, longitude)
+            self._throttle(service)
+            return getattr(self, self.services[service])(chunk)
         except Exception as e:
             print(f"Error fetching elevation from {service}: {e}")
+            return [None] * len(chunk)
+    
+    @staticmethod
+    def _cache_key(latitude: float, longitude: float, service: str) -> Optional[Tuple[float, float, str]]:
+        """Quantize coordinates to ~1 m so nearby lookups share a cache entry"""
+        try:
+            return (round(float(latitude), CACHE_PRECISION), round(float(longitude), CACHE_PRECISION), service)
+        except (TypeError, ValueError):
+            # Invalid coordinates are never cached; the service reports the error
+            return None
+    
+    def _cache_lookup(self, key: Optional[Tuple[float, float, str]]) -> Optional[float]:
+        """Return a cached elevation and mark it as recently used"""
+        if key is None:
             return None
+        with self._cache_lock:
+            elevation = self._cache.get(key)
+            if elevation is not None:
+                self._cache.move_to_end(key)
+            return elevation
     
-    def _open_elevation(self, latitude: float, longitude: float) -> Optional[float]:
-        """Fetch elevation from Open-Elevation API"""
+    def _cache_store(self, key: Tuple[float, float, str], elevation: float):
+        """Store an elevation, evicting the least recently used entries"""
+        with self._cache_lock:
+            self._cache[key] = elevation
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+            self._cache_dirty = True
+    
+    def _load_cache(self):
+        """Load persisted elevations from the cache file, if any"""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for lat, lon, service, elevation in entries[-CACHE_MAX_ENTRIES:]:
+                self._cache[(lat, lon, service)] = float(elevation)
+        except Exception as e:
+            print(f"Warning: Could not load elevation cache {self.cache_file}: {e}")
+            self._cache.clear()
+    
+    def save_cache(self) -> bool:
+        """
+        Persist cached elevations to the cache file
+        
+        Returns:
+            True if the cache was written, False otherwise
+        """
+        if not self.cache_file or not self._cache_dirty:
+            return False
+        
+        try:
+            with self._cache_lock:
+                entries = [[lat, lon, service, elevation] for (lat, lon, service), elevation in self._cache.items()]
+                self._cache_dirty = False
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            return True
+        except Exception as e:
+            print(f"Warning: Could not save elevation cache {self.cache_file}: {e}")
+            return False
+    
+    def _throttle(self, service: str):
+        """Wait until the service's minimum request interval has elapsed"""
+        interval = MIN_REQUEST_INTERVAL.get(service)
+        if not interval:
+            return
+        
+        with self._throttle_locks[service]:
+            wait = self._last_request[service] + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request[service] = time.monotonic()
+    
+    @staticmethod
+    def _parse_results(data: Dict, count: int) -> List[Optional[float]]:
+        """Extract elevations from a 'results' list, padding missing entries with None"""
+        results = data.get('results') or []
+        elevations = []
+        for i in range(count):
+            elevation = results[i].get('elevation') if i < len(results) else None
+            elevations.append(float(elevation) if elevation is not None else None)
+        return elevations
+    
+    def _open_elevation(self, coords: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """Fetch elevations from Open-Elevation API"""
         url = "https://api.open-elevation.com/api/v1/lookup"
-        params = {
-            "locations": f"{latitude},{longitude}"
+        payload = {
+            "locations": [{"latitude": lat, "longitude": lon} for lat, lon in coords]
         }
         
         # Disable SSL verification for open-elevation due to certificate issues
-        response = requests.get(url, params=params, timeout=10, verify=False)
+        response = self._session.post(url, json=payload, timeout=10, verify=False)
         response.raise_for_status()
         
-        data = response.json()
-        if data.get('results') and len(data['results']) > 0:
-            return float(data['results'][0]['elevation'])
-        
-        return None
+        return self._parse_results(response.json(), len(coords))
     
-    def _opentopodata(self, latitude: float, longitude: float) -> Optional[float]:
-        """Fetch elevation from OpenTopoData API"""
+    def _opentopodata(self, coords: List[Tuple[float, float]]) -> List[Optional[float]]:
+        """Fetch elevations from OpenTopoData API"""
         # Using SRTM 90m dataset (global coverage)
         url = f"https://api.opentopodata.org/v1/srtm90m"
-        params = {
-            "locations": f"{latitude},{longitude}"
+        payload = {
+            "locations": "|".join(f"{lat},{lon}" for lat, lon in coords)
         }
         
         # Disable SSL verification for opentopodata due to certificate issues
-        response = requests.get(url, params=params, timeout=10, verify=False)
+        response = self._session.post(url, json=payload, timeout=10, verify=False)
         response.raise_for_status()
         
-        data = response.json()
-        if data.get('results') and len(data['results']) > 0:
-            elevation = data['results'][0].get('elevation')
-            if elevation is not None:
-                return float(elevation)
-        
-        return None
+        return self._parse_results(response.json(), len(coords))
     
-    def _google_elevation(self, latitude: float, longitude: float, api_key: Optional[str] = None) -> Optional[float]:
+    def _google_elevation(self, coords: List[Tuple[float, float]], api_key: Optional[str] = None) -> List[Optional[float]]:
         """
-        Fetch elevation from Google Maps Elevation API
+        Fetch elevations from Google Maps Elevation API
         Note: Requires API key. This is a placeholder implementation.
         """
         if not api_key:
             # Google requires API key, return None if not provided
-            return None
+            return [None] * len(coords)
         
         url = "https://maps.googleapis.com/maps/api/elevation/json"
         params = {
-            "locations": f"{latitude},{longitude}",
+            "locations": "|".join(f"{lat},{lon}" for lat, lon in coords),
             "key": api_key
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         response.raise_for_status()
         
         data = response.json()
-        if data.get('status') == 'OK' and data.get('results'):
-            return float(data['results'][0]['elevation'])
+        if data.get('status') == 'OK':
+            return self._parse_results(data, len(coords))
         
-        return None
+        return [None] * len(coords)
@@ -1,46 +1,224 @@
 """
 Photo export functionality with EXIF and file attribute updates
 """
+import io
 import os
 import sys
+import copy
+import math
+import ctypes
+import ctypes.util
 import shutil
+import struct
+import atexit
+import threading
 import platform
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from fractions import Fraction
+from typing import Optional, List, Dict, Iterator, Tuple
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from functools import lru_cache
 from contextlib import contextmanager
 import piexif
 from iptcinfo3 import IPTCInfo
 
-# Windows-specific imports for setting creation time
-if platform.system() == 'Windows':
-    try:
-        import pywintypes
-        import win32file
-        import win32con
-        WINDOWS_TIMESTAMP_SUPPORT = True
-    except ImportError:
-        WINDOWS_TIMESTAMP_SUPPORT = False
-else:
-    WINDOWS_TIMESTAMP_SUPPORT = False
+# The platform cannot change at runtime, resolve it once
+_SYSTEM = platform.system()
+
+# Windows-specific modules for setting creation time, imported on first use
+_WIN32 = None
+
+
+def _ensure_win32():
+    """
+    Import the pywin32 modules once
+    
+    Returns:
+        (win32file, win32con, pywintypes) tuple, or None if pywin32 is not available
+    """
+    global _WIN32
+    if _WIN32 is None:
+        try:
+            import pywintypes
+            import win32file
+            import win32con
+            _WIN32 = (win32file, win32con, pywintypes)
+        except ImportError:
+            _WIN32 = False
+    return _WIN32 or None
+
+
+# Result of the exiftool availability probe, run on first use
+_EXIFTOOL_AVAILABLE = None
+
+
+def _probe_exiftool() -> bool:
+    """
+    Check once whether the exiftool command can be run
+    
+    Returns:
+        True if `exiftool -ver` succeeded, False otherwise
+    """
+    global _EXIFTOOL_AVAILABLE
+    if _EXIFTOOL_AVAILABLE is None:
+        try:
+            result = subprocess.run(
+                ['exiftool', '-ver'],
+                capture_output=True,
+                text=True,
+                timeout=2
+            )
+            _EXIFTOOL_AVAILABLE = result.returncode == 0
+        except (OSError, subprocess.TimeoutExpired):
+            _EXIFTOOL_AVAILABLE = False
+    return _EXIFTOOL_AVAILABLE
+
+
+# sys.stderr is process-wide, so concurrent exports must not swap it at the same time
+_stderr_lock = threading.RLock()
+
+# Shared null stream for suppress_stderr, opened on first use and kept open
+_devnull = None
+
+
+# SetFile (Xcode command line tools) is the fallback for macOS creation times;
+# look it up once instead of spawning it per file to discover it is missing
+_SETFILE_PATH = shutil.which('SetFile') if _SYSTEM == 'Darwin' else None
+
+
+# macOS setattrlist(2) definitions for setting the creation time in-process
+ATTR_BIT_MAP_COUNT = 5
+ATTR_CMN_CRTIME = 0x00000200
+
+
+class _AttrList(ctypes.Structure):
+    _fields_ = [
+        ("bitmapcount", ctypes.c_ushort),
+        ("reserved", ctypes.c_uint16),
+        ("commonattr", ctypes.c_uint32),
+        ("volattr", ctypes.c_uint32),
+        ("dirattr", ctypes.c_uint32),
+        ("fileattr", ctypes.c_uint32),
+        ("forkattr", ctypes.c_uint32),
+    ]
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [
+        ("tv_sec", ctypes.c_long),
+        ("tv_nsec", ctypes.c_long),
+    ]
+
+
+_macos_functions = None
+
+
+def _get_macos_functions() -> dict:
+    """Load the libSystem functions used for timestamps and cloning once"""
+    global _macos_functions
+    if _macos_functions is None:
+        _macos_functions = {}
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c') or '/usr/lib/libSystem.dylib', use_errno=True)
+        except OSError:
+            return _macos_functions
+        
+        try:
+            libc.setattrlist.argtypes = [ctypes.c_char_p, ctypes.POINTER(_AttrList),
+                                         ctypes.c_void_p, ctypes.c_size_t, ctypes.c_ulong]
+            libc.setattrlist.restype = ctypes.c_int
+            _macos_functions['setattrlist'] = libc.setattrlist
+        except AttributeError:
+            pass
+        
+        try:
+            # clonefile(2) is available from macOS 10.12 (APFS)
+            libc.clonefile.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+            libc.clonefile.restype = ctypes.c_int
+            _macos_functions['clonefile'] = libc.clonefile
+        except AttributeError:
+            pass
+    return _macos_functions
 
 
 @contextmanager
 def suppress_stderr():
     """Context manager to temporarily suppress stderr output"""
-    original_stderr = sys.stderr
-    try:
-        sys.stderr = open(os.devnull, 'w')
-        yield
-    finally:
-        sys.stderr.close()
-        sys.stderr = original_stderr
+    global _devnull
+    with _stderr_lock:
+        if _devnull is None:
+            _devnull = open(os.devnull, 'w')
+        original_stderr = sys.stderr
+        try:
+            sys.stderr = _devnull
+            yield
+        finally:
+            sys.stderr = original_stderr
+
+
+def _exif_time_bytes(capture_time: datetime) -> bytes:
+    """EXIF DateTime value (local wall-clock time) for a capture time"""
+    # Keyed on the wall-clock fields: aware datetimes for the same instant in
+    # different zones compare equal and would otherwise share a cache entry
+    return _exif_time_fields_bytes(capture_time.timetuple()[:6])
+
+
+@lru_cache(maxsize=1024)
+def _exif_time_fields_bytes(fields: tuple) -> bytes:
+    """EXIF DateTime value for (year, month, day, hour, minute, second), cached for bursts"""
+    return datetime(*fields).strftime("%Y:%m:%d %H:%M:%S").encode('utf-8')
+
+
+def _deg_to_dms(value: float) -> tuple:
+    """
+    Convert decimal degrees to EXIF degrees/minutes/seconds rationals
+    
+    Uses exact Fraction arithmetic on the value limited to 1e-7 degrees
+    (~1 cm), so seconds keep their full precision instead of being rounded
+    to 0.01". Results are cached for photos sharing a GPS fix.
+    """
+    return _dms_rationals(abs(value))
+
+
+@lru_cache(maxsize=4096)
+def _dms_rationals(value: float) -> tuple:
+    """DMS rationals for a non-negative coordinate, cached on the exact float value"""
+    total = Fraction(value).limit_denominator(10 ** 7)
+    degrees = int(total)
+    minutes_total = (total - degrees) * 60
+    minutes = int(minutes_total)
+    seconds = (minutes_total - minutes) * 60
+    return ((degrees, 1), (minutes, 1), (seconds.numerator, seconds.denominator))
+
+
+# Maximum number of parsed source EXIF dicts kept for re-exports
+EXIF_CACHE_MAX_ENTRIES = 64
+
+# Buffer size for user-space copies when no kernel copy is available
+COPY_BUFFER_SIZE = 1024 * 1024
+
+# Per-thread copy buffer, reused across photos instead of allocated per copy
+_copy_buffer = threading.local()
+
+# Linux ioctl to share the source extents with the destination (Btrfs, XFS)
+FICLONE = 0x40049409
 
 
 class ExportManager:
     """Manages photo export with metadata updates"""
     
+    # Parsed source EXIF keyed by (path, mtime_ns, size); entries are never mutated
+    _exif_cache: OrderedDict = OrderedDict()
+    _exif_cache_lock = threading.Lock()
+    
+    # Persistent exiftool processes (-stay_open), one per exporting thread so
+    # parallel exports never queue behind a single process
+    _exiftool_procs: Dict[threading.Thread, subprocess.Popen] = {}
+    _exiftool_lock = threading.Lock()
+    
     @staticmethod
     def export_photo(source_path: str, dest_folder: str, new_filename: str,
                     final_lat: Optional[float] = None, final_lon: Optional[float] = None, 
@@ -51,7 +229,8 @@ class ExportManager:
                     city: Optional[str] = None, sublocation: Optional[str] = None,
                     state: Optional[str] = None, country: Optional[str] = None,
                     gps_datestamp: Optional[str] = None, gps_timestamp: Optional[str] = None,
-                    offset_time: Optional[str] = None) -> bool:
+                    offset_time: Optional[str] = None,
+                    times_executor: Optional[Executor] = None) -> bool:
         """
         Export a photo with updated EXIF and file attributes
         
@@ -72,6 +251,8 @@ class ExportManager:
             gps_datestamp: GPS date stamp (YYYY:MM:DD)
             gps_timestamp: GPS time stamp (HH:MM:SS)
             offset_time: Timezone offset (+HH:MM or -HH:MM)
+            times_executor: Optional executor that sets the file timestamps in the
+                background, so a batch can move on to the next photo meanwhile
             
         Returns:
             True if export successful, False otherwise
@@ -84,17 +265,29 @@ class ExportManager:
             # Full destination path
             dest_file = dest_path / new_filename
             
-            # Copy the file (use copy instead of copy2 to avoid preserving metadata)
-            shutil.copy(source_path, dest_file)
+            # With exiftool, all EXIF/IPTC/XMP changes are written in a single pass
+            metadata_written = False
+            if ExportManager._exiftool_available():
+                args = ExportManager._build_exiftool_args(final_lat, final_lon, final_alt, new_time,
+                                                          title, keywords, city, sublocation, state, country,
+                                                          gps_datestamp, gps_timestamp, offset_time)
+                ExportManager._fast_copy(source_path, dest_file)
+                metadata_written = not args or ExportManager._run_exiftool(args, dest_file)
+                if not metadata_written:
+                    # Drop the copy exiftool may have left half-written; piexif rewrites it from the source
+                    dest_file.unlink(missing_ok=True)
             
-            # Update EXIF data (this will re-save the file, potentially resetting timestamps)
-            ExportManager._update_exif(str(dest_file), final_lat, final_lon, final_alt, new_time,
-                                      title, keywords, city, sublocation, state, country,
-                                      gps_datestamp, gps_timestamp, offset_time)
+            if not metadata_written:
+                ExportManager._export_with_piexif(source_path, dest_file, final_lat, final_lon, final_alt,
+                                                  new_time, title, keywords, city, sublocation, state, country,
+                                                  gps_datestamp, gps_timestamp, offset_time)
             
             # Update file timestamps AFTER EXIF update (if new_time is provided)
             if new_time:
-                ExportManager._set_file_times(dest_file, new_time)
+                if times_executor is not None:
+                    times_executor.submit(ExportManager._set_file_times, dest_file, new_time)
+                else:
+                    ExportManager._set_file_times(dest_file, new_time)
             
             return True
             
@@ -103,24 +296,173 @@ class ExportManager:
             return False
     
     @staticmethod
-    def _update_exif(file_path: str, latitude: Optional[float], longitude: Optional[float], 
-                    altitude: Optional[float], capture_time: Optional[datetime],
-                    title: Optional[str] = None,
-                    keywords: Optional[str] = None,
-                    city: Optional[str] = None, sublocation: Optional[str] = None,
-                    state: Optional[str] = None, country: Optional[str] = None,
-                    gps_datestamp: Optional[str] = None, gps_timestamp: Optional[str] = None,
-                    offset_time: Optional[str] = None):
+    def _export_with_piexif(source_path: str, dest_file: Path,
+                            final_lat: Optional[float], final_lon: Optional[float],
+                            final_alt: Optional[float], new_time: Optional[datetime],
+                            title: Optional[str], keywords: Optional[str],
+                            city: Optional[str], sublocation: Optional[str],
+                            state: Optional[str], country: Optional[str],
+                            gps_datestamp: Optional[str], gps_timestamp: Optional[str],
+                            offset_time: Optional[str]):
+        """Write the exported photo with piexif and iptcinfo3 (used when exiftool is unavailable)"""
+        # Only GPS and capture time changes touch the EXIF block; otherwise the
+        # source is copied as is without a piexif load/dump round-trip
+        exif_bytes = None
+        gps_changed = final_lat is not None and final_lon is not None and final_lat != -360 and final_lon != -360
+        if gps_changed or new_time:
+            # Parse source EXIF once (the copy is byte-identical)
+            exif_dict = ExportManager._load_source_exif(source_path)
+            
+            # Apply GPS and time changes to the EXIF
+            exif_bytes = ExportManager._update_exif(exif_dict, final_lat, final_lon, final_alt, new_time,
+                                                    gps_datestamp, gps_timestamp)
+        
+        # Copy the file with the updated EXIF spliced in, in a single pass
+        if exif_bytes is None:
+            # No EXIF changes: plain copy (copy-on-write clone when supported)
+            ExportManager._fast_copy(source_path, dest_file)
+        elif not ExportManager._copy_with_exif(source_path, dest_file, exif_bytes):
+            # Header could not be streamed (WebP, unusual JPEG layout): splice in memory
+            if not ExportManager._insert_exif_in_memory(source_path, dest_file, exif_bytes):
+                ExportManager._fast_copy(source_path, dest_file)
+        
+        # Update IPTC and XMP metadata (this will re-save the file, potentially resetting timestamps)
+        ExportManager._update_iptc_xmp(str(dest_file), title, keywords, city, sublocation, state, country,
+                                       offset_time)
+    
+    @staticmethod
+    def export_photos(jobs: List[Dict], max_workers: Optional[int] = None) -> List[bool]:
         """
-        Update EXIF data, IPTC location metadata, and XMP metadata in the exported photo without recompressing the image
+        Export several photos concurrently
+        
+        Args:
+            jobs: List of keyword-argument dicts for export_photo
+            max_workers: Number of worker threads (defaults to twice the CPU count)
+            
+        Returns:
+            List of export results, in the same order as jobs
+        """
+        results = [False] * len(jobs)
+        for index, success in ExportManager.iter_export_photos(jobs, max_workers):
+            results[index] = success
+        return results
+    
+    @staticmethod
+    def iter_export_photos(jobs: List[Dict], max_workers: Optional[int] = None) -> Iterator[Tuple[int, bool]]:
+        """
+        Export several photos concurrently, yielding results as they complete
+        
+        Each photo is independent and the work is I/O bound (copy, metadata
+        rewrite, timestamp syscalls), so a thread pool scales well. File
+        timestamps are set on a separate background thread, overlapping with
+        the next photo's copy and metadata write; all of them are applied
+        before the iterator is exhausted.
+        
+        Args:
+            jobs: List of keyword-argument dicts for export_photo
+            max_workers: Number of worker threads (defaults to twice the CPU count)
+            
+        Yields:
+            (job index, export result) tuples in completion order
+        """
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) * 2)
+        
+        with ThreadPoolExecutor(max_workers=1) as times_executor:
+            if max_workers <= 1 or len(jobs) <= 1:
+                for index, job in enumerate(jobs):
+                    yield index, ExportManager.export_photo(**job, times_executor=times_executor)
+                return
+            
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+                futures = {executor.submit(ExportManager.export_photo, **job, times_executor=times_executor): index
+                           for index, job in enumerate(jobs)}
+                for future in as_completed(futures):
+                    yield futures[future], future.result()
+    
+    @staticmethod
+    def _load_source_exif(source_path: str) -> dict:
+        """
+        Load EXIF from the source photo, reusing a cached parse when the file is unchanged
+        
+        Returns:
+            A private copy of the EXIF dict that the caller may modify
         """
         try:
-            # Load existing EXIF directly from file
-            try:
-                exif_dict = piexif.load(file_path)
-            except:
-                exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+            stat = os.stat(source_path)
+            key = (str(source_path), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            key = None
+        
+        if key is not None:
+            with ExportManager._exif_cache_lock:
+                cached = ExportManager._exif_cache.get(key)
+                if cached is not None:
+                    ExportManager._exif_cache.move_to_end(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+        
+        try:
+            # For JPEGs parse only the APP1 segment bytes, read in a single open
+            is_jpeg, exif_segment = ExportManager._read_exif_segment(source_path)
+            if exif_segment is not None:
+                exif_dict = piexif.load(exif_segment)
+            elif is_jpeg:
+                exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "Interop": {}, "1st": {}, "thumbnail": None}
+            else:
+                exif_dict = piexif.load(str(source_path))
+        except:
+            exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+        
+        if key is not None:
+            with ExportManager._exif_cache_lock:
+                ExportManager._exif_cache[key] = copy.deepcopy(exif_dict)
+                while len(ExportManager._exif_cache) > EXIF_CACHE_MAX_ENTRIES:
+                    ExportManager._exif_cache.popitem(last=False)
+        
+        return exif_dict
+    
+    @staticmethod
+    def _read_exif_segment(source_path: str) -> Tuple[bool, Optional[bytes]]:
+        """
+        Read the EXIF APP1 payload from a JPEG header without reading the image data
+        
+        Returns:
+            (is_jpeg, payload) where payload is the APP1 body (Exif header onwards), or None if absent
+        """
+        with open(source_path, 'rb') as f:
+            if f.read(2) != b"\xff\xd8":
+                return False, None
             
+            while True:
+                head = f.read(4)
+                if len(head) < 4 or head[0:1] != b"\xff" or head[:2] == b"\xff\xda":
+                    return True, None
+                
+                length = struct.unpack(">H", head[2:4])[0]
+                if length < 2:
+                    return True, None
+                if head[:2] == b"\xff\xe1":
+                    payload = f.read(length - 2)
+                    if payload[:6] == b"Exif\x00\x00":
+                        return True, payload
+                else:
+                    # Skip other segments without reading them
+                    f.seek(length - 2, os.SEEK_CUR)
+    
+    @staticmethod
+    def _update_exif(exif_dict: dict, latitude: Optional[float], longitude: Optional[float],
+                    altitude: Optional[float], capture_time: Optional[datetime],
+                    gps_datestamp: Optional[str] = None, gps_timestamp: Optional[str] = None) -> Optional[bytes]:
+        """
+        Apply GPS and capture time changes to the EXIF parsed from the source photo
+        
+        exif_dict is modified in place.
+        
+        Returns:
+            Serialized EXIF bytes ready to be spliced into the exported file, or None if it could not be built
+        """
+        try:
             # Clean up problematic EXIF tags that may have wrong types
             # Tag 41729 (ComponentsConfiguration) and similar tags can cause issues
             if "Exif" in exif_dict:
@@ -137,22 +479,14 @@ class ExportManager:
             if latitude is not None and longitude is not None and latitude != -360 and longitude != -360:
                 gps_ifd = exif_dict.get("GPS", {})
                 
-                # Convert latitude
-                lat_deg = int(abs(latitude))
-                lat_min = int((abs(latitude) - lat_deg) * 60)
-                lat_sec = int(((abs(latitude) - lat_deg) * 60 - lat_min) * 60 * 100)
-                gps_ifd[piexif.GPSIFD.GPSLatitude] = ((lat_deg, 1), (lat_min, 1), (lat_sec, 100))
+                # Convert latitude and longitude to degrees/minutes/seconds rationals
+                gps_ifd[piexif.GPSIFD.GPSLatitude] = _deg_to_dms(latitude)
                 gps_ifd[piexif.GPSIFD.GPSLatitudeRef] = 'N' if latitude >= 0 else 'S'
-                
-                # Convert longitude
-                lon_deg = int(abs(longitude))
-                lon_min = int((abs(longitude) - lon_deg) * 60)
-                lon_sec = int(((abs(longitude) - lon_deg) * 60 - lon_min) * 60 * 100)
-                gps_ifd[piexif.GPSIFD.GPSLongitude] = ((lon_deg, 1), (lon_min, 1), (lon_sec, 100))
+                gps_ifd[piexif.GPSIFD.GPSLongitude] = _deg_to_dms(longitude)
                 gps_ifd[piexif.GPSIFD.GPSLongitudeRef] = 'E' if longitude >= 0 else 'W'
                 
                 # Update altitude if provided
-                if altitude is not None:
+                if altitude is not None and not math.isnan(altitude):
                     alt_rational = (int(abs(altitude) * 100), 100)
                     gps_ifd[piexif.GPSIFD.GPSAltitude] = alt_rational
                     gps_ifd[piexif.GPSIFD.GPSAltitudeRef] = 0 if altitude >= 0 else 1
@@ -178,109 +512,279 @@ class ExportManager:
             # Update capture time if provided
             if capture_time:
                 exif_ifd = exif_dict.get("Exif", {})
-                time_str = capture_time.strftime("%Y:%m:%d %H:%M:%S")
-                exif_ifd[piexif.ExifIFD.DateTimeOriginal] = time_str.encode('utf-8')
-                exif_ifd[piexif.ExifIFD.DateTimeDigitized] = time_str.encode('utf-8')
+                time_bytes = _exif_time_bytes(capture_time)
+                exif_ifd[piexif.ExifIFD.DateTimeOriginal] = time_bytes
+                exif_ifd[piexif.ExifIFD.DateTimeDigitized] = time_bytes
                 exif_dict["Exif"] = exif_ifd
                 
                 # Also update the main DateTime
                 zeroth_ifd = exif_dict.get("0th", {})
-                zeroth_ifd[piexif.ImageIFD.DateTime] = time_str.encode('utf-8')
+                zeroth_ifd[piexif.ImageIFD.DateTime] = time_bytes
                 exif_dict["0th"] = zeroth_ifd
             
             # Note: OffsetTime tags (36880, 36881, 36882) are not supported by piexif
             # They will be written separately using exiftool after main EXIF is complete
             
-            # Insert updated EXIF into the file without recompressing the image
+            # Serialize the updated EXIF
             try:
-                exif_bytes = piexif.dump(exif_dict)
-                piexif.insert(exif_bytes, file_path)
+                return piexif.dump(exif_dict)
             except Exception as dump_error:
-                # If dump fails, try fallback with minimal EXIF
-                print(f"Warning: EXIF dump failed ({dump_error}), trying fallback")
+                # Dumping the same dict again would fail identically: rebuild from scratch
+                print(f"Warning: EXIF dump failed ({dump_error}), rebuilding EXIF from scratch")
                 
-                try:
-                    # Try removing problematic EXIF tags
-                    exif_bytes = piexif.dump(exif_dict)
-                    piexif.insert(exif_bytes, file_path)
-                except Exception as second_error:
-                    # If still failing, rebuild from scratch
-                    print(f"Warning: EXIF dump still failed ({second_error}), rebuilding EXIF from scratch")
-                    piexif.remove(file_path)
-                    
-                    # Create minimal EXIF dict with all important fields
-                    minimal_exif = {"0th": {}, "Exif": {}, "GPS": {}}
-                    
-                    # Copy ALL GPS data (including date/time stamps)
-                    if latitude is not None and longitude is not None and latitude != -360 and longitude != -360:
-                        minimal_exif["GPS"] = exif_dict.get("GPS", {})
-                    
-                    # Copy datetime fields (but NOT offset time)
-                    if capture_time:
-                        exif_ifd = exif_dict.get("Exif", {})
-                        minimal_exif["Exif"] = {
-                            k: v for k, v in exif_ifd.items() 
-                            if k in [piexif.ExifIFD.DateTimeOriginal, piexif.ExifIFD.DateTimeDigitized]
-                        }
-                        
-                        zeroth_ifd = exif_dict.get("0th", {})
-                        minimal_exif["0th"] = {
-                            k: v for k, v in zeroth_ifd.items() 
-                            if k in [piexif.ImageIFD.DateTime]
-                        }
+                # Create minimal EXIF dict with all important fields
+                minimal_exif = {"0th": {}, "Exif": {}, "GPS": {}}
+                
+                # Copy ALL GPS data (including date/time stamps)
+                if latitude is not None and longitude is not None and latitude != -360 and longitude != -360:
+                    minimal_exif["GPS"] = exif_dict.get("GPS", {})
+                
+                # Copy datetime fields (but NOT offset time)
+                if capture_time:
+                    exif_ifd = exif_dict.get("Exif", {})
+                    minimal_exif["Exif"] = {
+                        k: v for k, v in exif_ifd.items() 
+                        if k in [piexif.ExifIFD.DateTimeOriginal, piexif.ExifIFD.DateTimeDigitized]
+                    }
                     
-                    # Insert the minimal EXIF
-                    exif_bytes = piexif.dump(minimal_exif)
-                    piexif.insert(exif_bytes, file_path)
+                    zeroth_ifd = exif_dict.get("0th", {})
+                    minimal_exif["0th"] = {
+                        k: v for k, v in zeroth_ifd.items() 
+                        if k in [piexif.ImageIFD.DateTime]
+                    }
+                
+                return piexif.dump(minimal_exif)
+            
+        except Exception as e:
+            print(f"Error updating EXIF: {e}")
+            return None
+    
+    @staticmethod
+    def _read_jpeg_header(f) -> Optional[List[bytes]]:
+        """
+        Read the JPEG marker segments that precede the image data
+        
+        Returns:
+            List of raw segments starting with SOI, leaving f positioned at the
+            SOS marker, or None if the file is not a well-formed JPEG
+        """
+        if f.read(2) != b"\xff\xd8":
+            return None
+        
+        segments = [b"\xff\xd8"]
+        while True:
+            head = f.read(4)
+            if len(head) < 4:
+                return None
+            if head[:2] == b"\xff\xda":
+                f.seek(-4, os.SEEK_CUR)
+                return segments
+            
+            length = struct.unpack(">H", head[2:4])[0]
+            if length < 2:
+                return None
+            body = f.read(length - 2)
+            if len(body) != length - 2:
+                return None
+            segments.append(head + body)
+    
+    @staticmethod
+    def _copy_with_exif(source_path: str, dest_file: Path, exif_bytes: bytes) -> bool:
+        """
+        Copy a JPEG to dest_file replacing its EXIF segment, in a single pass
+        
+        The header segments are rewritten with the new APP1 (same layout as
+        piexif.insert) and the image data is streamed unchanged.
+        
+        Returns:
+            True if the file was written, False if the source is not a JPEG
+        """
+        with open(source_path, 'rb') as src:
+            segments = ExportManager._read_jpeg_header(src)
+            if segments is None:
+                return False
+            
+            app1 = b"\xff\xe1" + struct.pack(">H", len(exif_bytes) + 2) + exif_bytes
+            
+            def is_exif(index):
+                return len(segments) > index and segments[index][:2] == b"\xff\xe1" \
+                    and segments[index][4:10] == b"Exif\x00\x00"
+            
+            if len(segments) > 1 and segments[1][:2] == b"\xff\xe0" and is_exif(2):
+                segments[2] = app1
+                segments.pop(1)
+            elif len(segments) > 1 and segments[1][:2] == b"\xff\xe0":
+                segments[1] = app1
+            elif is_exif(1):
+                segments[1] = app1
+            else:
+                segments.insert(1, app1)
+            
+            with open(dest_file, 'wb') as dst:
+                dst.write(b"".join(segments))
+                ExportManager._stream_remaining(src, dst)
+        
+        return True
+    
+    @staticmethod
+    def _insert_exif_in_memory(source_path: str, dest_file: Path, exif_bytes: bytes) -> bool:
+        """
+        Read the source once, insert the EXIF block in memory and write dest_file once
+        
+        Returns:
+            True if the file was written, False if piexif cannot insert EXIF into it
+        """
+        try:
+            output = io.BytesIO()
+            piexif.insert(exif_bytes, Path(source_path).read_bytes(), output)
+        except (ValueError, OSError, piexif.InvalidImageDataError) as e:
+            print(f"Warning: Could not insert EXIF into {source_path}: {e}")
+            return False
+        
+        with open(dest_file, 'wb') as dst:
+            dst.write(output.getbuffer())
+        return True
+    
+    @staticmethod
+    def _stream_remaining(src, dst):
+        """Copy everything from the current position of src to dst"""
+        dst.flush()
+        offset = src.tell()
+        remaining = os.fstat(src.fileno()).st_size - offset
+        if hasattr(os, 'sendfile'):
+            try:
+                while remaining > 0:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, remaining)
+                    if sent == 0:
+                        break
+                    offset += sent
+                    remaining -= sent
+                return
+            except OSError:
+                # sendfile not supported for these files, finish with a buffered copy
+                pass
+        src.seek(offset)
+        dst.seek(0, os.SEEK_END)
+        ExportManager._buffered_copy(src, dst)
+    
+    @staticmethod
+    def _fast_copy(source_path: str, dest_file: Path):
+        """
+        Copy a file using the fastest mechanism the platform offers
+        
+        Tries a copy-on-write clone (clonefile on APFS, FICLONE on Btrfs/XFS),
+        then an in-kernel copy (copy_file_range or sendfile, CopyFile on
+        Windows), and finally a 1 MiB buffered copy. Like shutil.copy, only the
+        data and permission bits are copied, not timestamps.
+        """
+        if _SYSTEM == 'Darwin':
+            clonefile = _get_macos_functions().get('clonefile')
+            if clonefile is not None:
+                # clonefile requires that the destination does not exist
+                if os.path.lexists(dest_file):
+                    os.unlink(dest_file)
+                if clonefile(os.fsencode(str(source_path)), os.fsencode(str(dest_file)), 0) == 0:
+                    # The clone carries the source timestamps; reset them like shutil.copy
+                    os.utime(dest_file, None)
+                    return
+        elif _SYSTEM == 'Windows':
+            win32 = _ensure_win32()
+            if win32 is not None:
+                try:
+                    win32[0].CopyFile(str(source_path), str(dest_file), False)
+                    # CopyFile keeps the source modification time; reset it like shutil.copy
+                    os.utime(dest_file, None)
+                    return
+                except Exception:
+                    pass
+        
+        with open(source_path, 'rb') as src, open(dest_file, 'wb') as dst:
+            if not (_SYSTEM == 'Linux' and ExportManager._kernel_copy(src, dst)):
+                # sendfile where supported (cross-device copies), else buffered
+                ExportManager._stream_remaining(src, dst)
+        shutil.copymode(source_path, dest_file)
+    
+    @staticmethod
+    def _kernel_copy(src, dst) -> bool:
+        """
+        Copy src to the empty dst without moving the data through user space (Linux)
+        
+        Returns:
+            True if copied, False if neither FICLONE nor copy_file_range is usable
+        """
+        try:
+            import fcntl
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return True
+        except (OSError, ImportError):
+            pass
+        
+        if not hasattr(os, 'copy_file_range'):
+            return False
+        
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        try:
+            while offset < size:
+                copied = os.copy_file_range(src.fileno(), dst.fileno(), size - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            # Unsupported across these filesystems (EXDEV, ENOSYS, ...)
+            pass
+        
+        if offset < size:
+            dst.truncate(0)
+            return False
+        return True
+    
+    @staticmethod
+    def _buffered_copy(src, dst):
+        """Copy from the current position of src to dst in COPY_BUFFER_SIZE chunks"""
+        buffer = getattr(_copy_buffer, 'buffer', None)
+        if buffer is None:
+            buffer = _copy_buffer.buffer = bytearray(COPY_BUFFER_SIZE)
+        with memoryview(buffer) as view:
+            while True:
+                count = src.readinto(buffer)
+                if not count:
+                    break
+                dst.write(view[:count])
+    
+    @staticmethod
+    def _update_iptc_xmp(file_path: str, title: Optional[str] = None,
+                         keywords: Optional[str] = None,
+                         city: Optional[str] = None, sublocation: Optional[str] = None,
+                         state: Optional[str] = None, country: Optional[str] = None,
+                         offset_time: Optional[str] = None):
+        """
+        Update IPTC location metadata and XMP metadata in the exported photo without recompressing the image
+        """
+        # Plain copy/rename exports have nothing to write: skip the tool probe and any rewrite
+        if not any(value and value.strip() for value in (title, keywords, city, sublocation, state, country)) \
+                and not offset_time:
+            return
+        
+        try:
+            # exiftool writes IPTC and XMP together in a single rewrite of the file
+            if ExportManager._exiftool_available():
+                args = (ExportManager._iptc_exiftool_args(keywords, city, sublocation, state, country) +
+                        ExportManager._xmp_exiftool_args(title, keywords, city, sublocation, state, country,
+                                                         offset_time))
+                if args:
+                    ExportManager._run_exiftool(args, file_path)
+                return
             
             # Update IPTC location metadata if any location field is provided
             if any([keywords, city, sublocation, state, country]):
                 try:
-                    # Try to load existing IPTC data first
+                    # Try the existing IPTC data first; if loading or saving fails
+                    # (missing or corrupt IPTC data), rebuild it from scratch
                     try:
-                        with suppress_stderr():
-                            iptc = IPTCInfo(file_path, force=False)
-                            
-                            # Set keywords
-                            if keywords and keywords.strip():
-                                # Keywords can be comma-separated
-                                keyword_list = [kw.strip() for kw in keywords.split(',') if kw.strip()]
-                                iptc['keywords'] = keyword_list
-                            
-                            # Set location fields
-                            if city and city.strip():
-                                iptc['city'] = city
-                            if sublocation and sublocation.strip():
-                                iptc['sub-location'] = sublocation
-                            if state and state.strip():
-                                iptc['province/state'] = state
-                            if country and country.strip():
-                                iptc['country/primary location name'] = country
-                            
-                            # Try to save - this may fail if IPTC data is corrupt
-                            iptc.save(['overwrite'])
-                    except:
-                        # If loading or saving fails (corrupt IPTC data), rebuild from scratch
-                        with suppress_stderr():
-                            iptc = IPTCInfo(file_path, force=True)
-                            
-                            # Set keywords
-                            if keywords and keywords.strip():
-                                keyword_list = [kw.strip() for kw in keywords.split(',') if kw.strip()]
-                                iptc['keywords'] = keyword_list
-                            
-                            # Set location fields again
-                            if city and city.strip():
-                                iptc['city'] = city
-                            if sublocation and sublocation.strip():
-                                iptc['sub-location'] = sublocation
-                            if state and state.strip():
-                                iptc['province/state'] = state
-                            if country and country.strip():
-                                iptc['country/primary location name'] = country
-                            
-                            # Save with fresh IPTC data
-                            iptc.save(['overwrite'])
+                        ExportManager._write_iptc(file_path, False, keywords, city, sublocation, state, country)
+                    except Exception:
+                        ExportManager._write_iptc(file_path, True, keywords, city, sublocation, state, country)
                 except Exception as iptc_error:
                     # IPTC writing is optional - don't fail the entire export if it doesn't work
                     pass
@@ -289,7 +793,32 @@ class ExportManager:
             ExportManager._write_exiftool_metadata(file_path, title, keywords, city, sublocation, state, country, offset_time)
             
         except Exception as e:
-            print(f"Error updating EXIF for {file_path}: {e}")
+            print(f"Error updating IPTC/XMP for {file_path}: {e}")
+    
+    @staticmethod
+    def _write_iptc(file_path: str, force: bool, keywords: Optional[str], city: Optional[str],
+                    sublocation: Optional[str], state: Optional[str], country: Optional[str]):
+        """Load, fill in and save the IPTC keywords and location with iptcinfo3"""
+        with suppress_stderr():
+            iptc = IPTCInfo(file_path, force=force)
+            
+            # Set keywords
+            if keywords and keywords.strip():
+                # Keywords can be comma-separated
+                keyword_list = [kw.strip() for kw in keywords.split(',') if kw.strip()]
+                iptc['keywords'] = keyword_list
+            
+            # Set location fields
+            if city and city.strip():
+                iptc['city'] = city
+            if sublocation and sublocation.strip():
+                iptc['sub-location'] = sublocation
+            if state and state.strip():
+                iptc['province/state'] = state
+            if country and country.strip():
+                iptc['country/primary location name'] = country
+            
+            iptc.save(['overwrite'])
     
     @staticmethod
     def _write_exiftool_metadata(file_path: str, title: Optional[str] = None,
@@ -313,102 +842,299 @@ class ExportManager:
         """
         try:
             # Check if exiftool is available
-            result = subprocess.run(
-                ['exiftool', '-ver'],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            
-            if result.returncode != 0:
+            if not ExportManager._exiftool_available():
                 return  # exiftool not available, skip silently
             
-            # Build command with all metadata to write
-            # -overwrite_original avoids creating backup files
-            cmd = ['exiftool', '-overwrite_original']
-            
-            # Add OffsetTime tags if provided
-            if offset_time:
-                cmd.extend([
-                    f'-OffsetTime={offset_time}',
-                    f'-OffsetTimeOriginal={offset_time}',
-                    f'-OffsetTimeDigitized={offset_time}'
-                ])
-            
-            # Add XMP title (Dublin Core)
-            if title and title.strip():
-                cmd.append(f'-XMP:Title={title}')
-            
-            # Add XMP keywords (Dublin Core subject)
-            if keywords and keywords.strip():
-                # Keywords can be comma-separated
-                keyword_list = [kw.strip() for kw in keywords.split(',') if kw.strip()]
-                for keyword in keyword_list:
-                    cmd.append(f'-XMP:Subject+={keyword}')
-                
-                # Also add to PDF namespace Keywords field (single comma-separated string)
-                cmd.append(f'-XMP-pdf:Keywords={keywords.strip()}')
-            
-            # Add XMP location metadata (IPTC4XMP and Photoshop namespaces)
-            if sublocation and sublocation.strip():
-                cmd.append(f'-XMP:Location={sublocation}')
-            if city and city.strip():
-                cmd.append(f'-XMP:City={city}')
-            if state and state.strip():
-                cmd.append(f'-XMP:State={state}')
-            if country and country.strip():
-                cmd.append(f'-XMP:Country={country}')
-            
-            # Add the file path
-            cmd.append(file_path)
-            
             # Only run exiftool if we have metadata to write
-            if len(cmd) > 3:  # More than just 'exiftool -overwrite_original filepath'
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
-                
-                # Only report errors, not success
-                if result.returncode != 0:
-                    print(f"Warning: exiftool failed: {result.stderr}")
+            args = ExportManager._xmp_exiftool_args(title, keywords, city, sublocation, state, country, offset_time)
+            if args:
+                ExportManager._run_exiftool(args, file_path)
                     
-        except FileNotFoundError:
-            # exiftool not installed, skip silently
-            pass
-        except subprocess.TimeoutExpired:
-            print(f"Warning: exiftool timed out")
         except Exception as e:
             print(f"Warning: Error writing exiftool metadata: {e}")
     
+    @staticmethod
+    def _exiftool_available() -> bool:
+        """Check whether the exiftool command can be run (probed once per process)"""
+        return _probe_exiftool()
+    
+    @staticmethod
+    def _exiftool_process() -> Optional[subprocess.Popen]:
+        """
+        Return the calling thread's exiftool process, starting it on first use
+        
+        Processes left behind by threads that have exited (e.g. a finished
+        export pool) are stopped before a new one is started.
+        """
+        thread = threading.current_thread()
+        with ExportManager._exiftool_lock:
+            proc = ExportManager._exiftool_procs.get(thread)
+            if proc is not None and proc.poll() is None:
+                return proc
+            stale = [owner for owner in ExportManager._exiftool_procs
+                     if owner is thread or not owner.is_alive()]
+            stale_procs = [ExportManager._exiftool_procs.pop(owner) for owner in stale]
+        
+        for old in stale_procs:
+            ExportManager._stop_exiftool(old)
+        
+        try:
+            # -stay_open reads commands from stdin until told to stop;
+            # stderr is merged so error messages arrive before the {ready} marker
+            proc = subprocess.Popen(
+                ['exiftool', '-stay_open', 'True', '-@', '-'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                encoding='utf-8'
+            )
+        except OSError:
+            return None
+        
+        with ExportManager._exiftool_lock:
+            ExportManager._exiftool_procs[thread] = proc
+        return proc
+    
+    @staticmethod
+    def _stop_exiftool(proc: subprocess.Popen):
+        """Ask an exiftool process to exit, killing it if it does not"""
+        try:
+            if proc.poll() is None:
+                proc.stdin.write('-stay_open\nFalse\n')
+                proc.stdin.flush()
+                proc.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            proc.kill()
+    
+    @staticmethod
+    def close_exiftool():
+        """Stop all persistent exiftool processes, if running"""
+        with ExportManager._exiftool_lock:
+            procs = list(ExportManager._exiftool_procs.values())
+            ExportManager._exiftool_procs.clear()
+        
+        for proc in procs:
+            ExportManager._stop_exiftool(proc)
+    
+    @staticmethod
+    def _run_exiftool(args: List[str], file_path) -> bool:
+        """
+        Run exiftool on file_path with the given tag arguments
+        
+        Commands are sent to a long-lived exiftool process (-stay_open)
+        owned by the calling thread, so the interpreter start-up is paid
+        once per thread and parallel exports run side by side.
+        
+        Returns:
+            True if exiftool succeeded, False otherwise
+        """
+        # -overwrite_original avoids creating backup files
+        # Commands are line based, so values cannot contain newlines
+        lines = [arg.replace('\r', ' ').replace('\n', ' ') for arg in args]
+        command = '\n'.join(['-overwrite_original'] + lines + [str(file_path), '-execute']) + '\n'
+        
+        proc = ExportManager._exiftool_process()
+        if proc is None:
+            # exiftool not installed
+            return False
+        
+        try:
+            proc.stdin.write(command)
+            proc.stdin.flush()
+            
+            # Output for this command ends with the {ready} marker
+            output = []
+            while True:
+                line = proc.stdout.readline()
+                if not line:
+                    raise OSError("exiftool exited unexpectedly")
+                if line.rstrip() == '{ready}':
+                    break
+                output.append(line.rstrip())
+        except (OSError, ValueError) as e:
+            print(f"Warning: exiftool failed: {e}")
+            proc.kill()
+            with ExportManager._exiftool_lock:
+                ExportManager._exiftool_procs.pop(threading.current_thread(), None)
+            return False
+        
+        # Only report errors, not success
+        errors = [line for line in output if line.startswith('Error')]
+        if errors:
+            print(f"Warning: exiftool failed: {' '.join(errors)}")
+            return False
+        return True
+    
+    @staticmethod
+    def _build_exiftool_args(latitude: Optional[float], longitude: Optional[float],
+                             altitude: Optional[float], capture_time: Optional[datetime],
+                             title: Optional[str] = None,
+                             keywords: Optional[str] = None,
+                             city: Optional[str] = None, sublocation: Optional[str] = None,
+                             state: Optional[str] = None, country: Optional[str] = None,
+                             gps_datestamp: Optional[str] = None, gps_timestamp: Optional[str] = None,
+                             offset_time: Optional[str] = None) -> List[str]:
+        """
+        Build exiftool arguments writing every exported field (EXIF GPS and
+        capture time, IPTC location and keywords, XMP, OffsetTime) in one pass
+        
+        Returns:
+            List of -TAG=value arguments (empty if nothing needs to be written)
+        """
+        args = []
+        
+        # GPS coordinates, with altitude and GPS date/time stamps
+        if latitude is not None and longitude is not None and latitude != -360 and longitude != -360:
+            args.extend([
+                f'-GPSLatitude={abs(latitude)}',
+                f'-GPSLatitudeRef={"N" if latitude >= 0 else "S"}',
+                f'-GPSLongitude={abs(longitude)}',
+                f'-GPSLongitudeRef={"E" if longitude >= 0 else "W"}'
+            ])
+            if altitude is not None and not math.isnan(altitude):
+                args.extend([
+                    f'-GPSAltitude={abs(altitude)}',
+                    f'-GPSAltitudeRef#={0 if altitude >= 0 else 1}'
+                ])
+            if gps_datestamp:
+                args.append(f'-GPSDateStamp={gps_datestamp}')
+            if gps_timestamp:
+                args.append(f'-GPSTimeStamp={gps_timestamp}')
+        
+        # Capture time (DateTimeOriginal, DateTimeDigitized and DateTime)
+        if capture_time:
+            time_str = _exif_time_bytes(capture_time).decode('utf-8')
+            args.extend([
+                f'-EXIF:DateTimeOriginal={time_str}',
+                f'-EXIF:CreateDate={time_str}',
+                f'-EXIF:ModifyDate={time_str}'
+            ])
+        
+        # IPTC keywords and location
+        args.extend(ExportManager._iptc_exiftool_args(keywords, city, sublocation, state, country))
+        
+        # XMP metadata and OffsetTime
+        args.extend(ExportManager._xmp_exiftool_args(title, keywords, city, sublocation, state, country,
+                                                     offset_time))
+        return args
+    
+    @staticmethod
+    def _split_keywords(keywords: Optional[str]) -> List[str]:
+        """Split a comma-separated keyword string into stripped, non-empty keywords"""
+        if not keywords:
+            return []
+        return [kw for kw in (part.strip() for part in keywords.split(',')) if kw]
+    
+    @staticmethod
+    def _tag_args(fields: Dict[str, Optional[str]]) -> List[str]:
+        """Build -TAG=value arguments for the non-blank fields, stripping each value once"""
+        args = []
+        for tag, value in fields.items():
+            if value:
+                value = value.strip()
+                if value:
+                    args.append(f'-{tag}={value}')
+        return args
+    
+    @staticmethod
+    def _iptc_exiftool_args(keywords: Optional[str] = None,
+                            city: Optional[str] = None, sublocation: Optional[str] = None,
+                            state: Optional[str] = None, country: Optional[str] = None) -> List[str]:
+        """Build exiftool arguments for the IPTC keywords and location tags"""
+        # Keywords can be comma-separated; repeated assignments replace the list
+        args = [f'-IPTC:Keywords={keyword}' for keyword in ExportManager._split_keywords(keywords)]
+        args += ExportManager._tag_args({
+            'IPTC:City': city,
+            'IPTC:Sub-location': sublocation,
+            'IPTC:Province-State': state,
+            'IPTC:Country-PrimaryLocationName': country,
+        })
+        
+        # Store IPTC strings as UTF-8
+        if args:
+            args.insert(0, '-IPTC:CodedCharacterSet=UTF8')
+        return args
+    
+    @staticmethod
+    def _xmp_exiftool_args(title: Optional[str] = None,
+                           keywords: Optional[str] = None,
+                           city: Optional[str] = None, sublocation: Optional[str] = None,
+                           state: Optional[str] = None, country: Optional[str] = None,
+                           offset_time: Optional[str] = None) -> List[str]:
+        """Build exiftool arguments for the XMP and OffsetTime tags"""
+        args = []
+        
+        # Add OffsetTime tags if provided
+        if offset_time:
+            args.extend([
+                f'-OffsetTime={offset_time}',
+                f'-OffsetTimeOriginal={offset_time}',
+                f'-OffsetTimeDigitized={offset_time}'
+            ])
+        
+        # Add XMP title (Dublin Core)
+        args += ExportManager._tag_args({'XMP:Title': title})
+        
+        # Add XMP keywords (Dublin Core subject)
+        keyword_list = ExportManager._split_keywords(keywords)
+        if keyword_list:
+            args += [f'-XMP:Subject+={keyword}' for keyword in keyword_list]
+            
+            # Also add to PDF namespace Keywords field (single comma-separated string)
+            args.append(f'-XMP-pdf:Keywords={keywords.strip()}')
+        
+        # Add XMP location metadata (IPTC4XMP and Photoshop namespaces)
+        args += ExportManager._tag_args({
+            'XMP:Location': sublocation,
+            'XMP:City': city,
+            'XMP:State': state,
+            'XMP:Country': country,
+        })
+        
+        return args
+    
     @staticmethod
     def _set_file_times(file_path: Path, timestamp: datetime):
         """Set file creation, modification, and access times on all platforms"""
         try:
-            ts = timestamp.timestamp()
-            system = platform.system()
-            
-            # Platform-specific handling
-            if system == 'Windows' and WINDOWS_TIMESTAMP_SUPPORT:
-                # On Windows, set all three timestamps using Windows API
-                ExportManager._set_all_times_windows(file_path, timestamp)
-            elif system == 'Darwin':  # macOS
-                ExportManager._set_creation_time_macos(file_path, timestamp)
-                # Also set modification and access time
-                os.utime(file_path, (ts, ts))
-            else:  # Linux and fallback
-                # Linux doesn't support setting creation time (birthtime) on most filesystems
-                # Just set modification and access time
-                os.utime(file_path, (ts, ts))
-            
+            # Platform-specific setter, selected once at import time
+            ExportManager._SET_TIMES(file_path, timestamp)
         except Exception as e:
             print(f"Error setting file times for {file_path}: {e}")
     
+    @staticmethod
+    def _timestamp_ns(timestamp: datetime) -> int:
+        """Convert a datetime to integer nanoseconds since the epoch without float rounding"""
+        whole_seconds = int(timestamp.replace(microsecond=0).timestamp())
+        return whole_seconds * 1_000_000_000 + timestamp.microsecond * 1000
+    
+    @staticmethod
+    def _set_times_utime(file_path: Path, timestamp: datetime):
+        """Set modification and access times (Linux and fallback)"""
+        # Linux doesn't support setting creation time (birthtime) on most filesystems
+        ns = ExportManager._timestamp_ns(timestamp)
+        os.utime(file_path, ns=(ns, ns))
+    
+    @staticmethod
+    def _set_times_macos(file_path: Path, timestamp: datetime):
+        """Set creation, modification, and access times on macOS"""
+        ExportManager._set_creation_time_macos(file_path, timestamp)
+        # Also set modification and access time
+        ExportManager._set_times_utime(file_path, timestamp)
+    
     @staticmethod
     def _set_all_times_windows(file_path: Path, timestamp: datetime):
         """Set creation, access, and modification times on Windows"""
+        # Access and modification times need no file handle
+        ExportManager._set_times_utime(file_path, timestamp)
+        
+        win32 = _ensure_win32()
+        if win32 is None:
+            # pywin32 not installed: creation time cannot be set
+            return
+        win32file, win32con, pywintypes = win32
+        
         try:
             # Convert pandas Timestamp to Python datetime if necessary
             if hasattr(timestamp, 'to_pydatetime'):
@@ -428,45 +1154,75 @@ class ExportManager:
                 None
             )
             
-            # Set all three times: creation, access, and modification
+            # Only the creation time is left to set
             # SetFileTime(handle, creation_time, access_time, modification_time)
-            win32file.SetFileTime(handle, wintime, wintime, wintime)
+            win32file.SetFileTime(handle, wintime, None, None)
             
             handle.close()
             
         except Exception as e:
             print(f"Warning: Could not set timestamps on Windows: {e}")
     
-
-    
     @staticmethod
     def _set_creation_time_macos(file_path: Path, timestamp: datetime):
-        """Set creation time on macOS using SetFile command"""
+        """Set creation time on macOS via setattrlist, falling back to the SetFile command"""
         try:
+            if ExportManager._set_creation_time_setattrlist(file_path, timestamp):
+                return
+            
+            if _SETFILE_PATH is None:
+                # SetFile not available: creation time is left as is; modification
+                # and access times are set in-process by os.utime afterwards
+                return
+            
             # Format timestamp for SetFile command (MM/DD/YYYY HH:MM:SS)
             time_str = timestamp.strftime("%m/%d/%Y %H:%M:%S")
             
             # Try using SetFile command (part of Xcode command line tools)
             try:
                 subprocess.run(
-                    ['SetFile', '-d', time_str, str(file_path)],
+                    [_SETFILE_PATH, '-d', time_str, str(file_path)],
                     check=True,
                     capture_output=True,
                     text=True
                 )
             except (subprocess.CalledProcessError, FileNotFoundError):
-                # SetFile not available, try touch with -t flag as fallback
-                # Format: [[CC]YY]MMDDhhmm[.SS]
-                touch_time = timestamp.strftime("%Y%m%d%H%M.%S")
-                try:
-                    subprocess.run(
-                        ['touch', '-t', touch_time, str(file_path)],
-                        check=True,
-                        capture_output=True,
-                        text=True
-                    )
-                except subprocess.CalledProcessError:
-                    pass
-                
+                # SetFile failed: creation time is left as is
+                pass
+            
         except Exception as e:
             print(f"Warning: Could not set creation time on macOS: {e}")
+    
+    @staticmethod
+    def _set_creation_time_setattrlist(file_path: Path, timestamp: datetime) -> bool:
+        """
+        Set creation time with the setattrlist(2) syscall, avoiding a subprocess
+        
+        Returns:
+            True if the creation time was set, False otherwise
+        """
+        setattrlist = _get_macos_functions().get('setattrlist')
+        if setattrlist is None:
+            return False
+        
+        seconds = timestamp.timestamp()
+        whole_seconds = int(seconds // 1)
+        crtime = _Timespec(whole_seconds, int((seconds - whole_seconds) * 1e9))
+        attrs = _AttrList(bitmapcount=ATTR_BIT_MAP_COUNT, commonattr=ATTR_CMN_CRTIME)
+        
+        result = setattrlist(os.fsencode(str(file_path)), ctypes.byref(attrs),
+                             ctypes.byref(crtime), ctypes.sizeof(crtime), 0)
+        return result == 0
+    
+    # Platform-specific file time setter, resolved once at import time
+    if _SYSTEM == 'Windows':
+        # On Windows, set all three timestamps using Windows API
+        _SET_TIMES = _set_all_times_windows
+    elif _SYSTEM == 'Darwin':  # macOS
+        _SET_TIMES = _set_times_macos
+    else:  # Linux and fallback
+        _SET_TIMES = _set_times_utime
+
+
+# Stop the persistent exiftool process when the interpreter exits
+atexit.register(ExportManager.close_exiftool)
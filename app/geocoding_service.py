@@ -2,20 +2,63 @@
 Geocoding Service - Provides reverse geocoding from GPS coordinates
 Supports multiple providers with fallback
 """
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import requests
-from typing import Optional, Dict, Any
-from time import sleep
+from typing import Optional, Dict, Any, List, Tuple, Union
+from time import sleep, monotonic
 import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Disable SSL warnings when certificate verification is disabled
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+# Nominatim usage policy: at most one request per second
+NOMINATIM_MIN_INTERVAL = 1.0
+
+# Geocoding cache: coordinates rounded to 4 decimals (~11 m), LRU bounded
+CACHE_PRECISION = 4
+CACHE_MAX_ENTRIES = 8192
+
 
 class GeocodingService:
-    def __init__(self):
+    def __init__(self, cache_file: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            cache_file: Optional JSON file used to persist the geocoding cache
+        """
         self.providers = ['nominatim', 'photon']
         self.current_provider_index = 0
         
+        # Pooled session so consecutive lookups reuse keep-alive connections
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Nominatim's usage policy requires an identifying User-Agent
+        self.session.headers.update({'User-Agent': 'GeotagPhotoApp/1.0'})
+        
+        # Time of the last Nominatim request, used to space requests out
+        self._last_nominatim_call = 0.0
+        self._nominatim_lock = threading.Lock()
+        
+        # In-memory LRU cache of locations, optionally persisted to disk
+        self.cache_file = Path(cache_file) if cache_file else None
+        self._cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_dirty = False
+        self._load_cache()
+    
+    def close(self):
+        """Persist the geocoding cache and release pooled HTTP connections"""
+        self.save_cache()
+        self.session.close()
+        
     def reverse_geocode(self, latitude: float, longitude: float) -> Optional[Dict[str, str]]:
         """
         Reverse geocode GPS coordinates to location information
@@ -24,6 +67,80 @@ class GeocodingService:
         if latitude == -360.0 or longitude == -360.0:
             return None
         
+        # Photos shot close together share one lookup (and one rate-limit delay)
+        key = self._cache_key(latitude, longitude)
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            return cached
+        
+        result = self._reverse_geocode_uncached(latitude, longitude)
+        if result and key is not None:
+            self._cache_store(key, result)
+        return result
+    
+    def reverse_geocode_batch(self, coords: List[Tuple[float, float]],
+                              max_workers: int = 8) -> List[Optional[Dict[str, str]]]:
+        """
+        Reverse geocode a list of GPS coordinates
+        
+        Cached and duplicate coordinates are looked up once. When Photon is the
+        current provider the remaining lookups run concurrently over the shared
+        session; Nominatim is rate limited, so it is always queried serially.
+        
+        Args:
+            coords: List of (latitude, longitude) tuples in decimal degrees
+            max_workers: Maximum number of concurrent Photon requests
+        
+        Returns:
+            List of location dicts (None for failed lookups), in input order
+        """
+        coords = list(coords)
+        results: List[Optional[Dict[str, str]]] = [None] * len(coords)
+        
+        # Group the uncached coordinates by cache key so each area is fetched once
+        pending: Dict[Tuple[float, float], List[int]] = {}
+        for i, (lat, lon) in enumerate(coords):
+            if lat == -360.0 or lon == -360.0:
+                continue
+            key = self._cache_key(lat, lon)
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                results[i] = cached
+            elif key is not None:
+                pending.setdefault(key, []).append(i)
+        
+        if not pending:
+            return results
+        
+        def lookup_photon(indices):
+            lat, lon = coords[indices[0]]
+            try:
+                return self._reverse_geocode_photon(lat, lon)
+            except Exception as e:
+                print(f"Error with photon: {e}")
+                return None
+        
+        groups = list(pending.items())
+        if self.get_current_provider() == 'photon' and max_workers > 1 and len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+                fetched = list(executor.map(lookup_photon, [indices for _, indices in groups]))
+        else:
+            fetched = [None] * len(groups)
+        
+        for (key, indices), location in zip(groups, fetched):
+            if not location:
+                # Serial lookup with provider fallback (and Nominatim rate limiting)
+                lat, lon = coords[indices[0]]
+                location = self._reverse_geocode_uncached(lat, lon)
+            if location:
+                self._cache_store(key, location)
+                for i in indices:
+                    results[i] = dict(location)
+        
+        return results
+    
+    def _reverse_geocode_uncached(self, latitude: float, longitude: float) -> Optional[Dict[str, str]]:
+        """Query the providers in order, falling back on failure"""
         # Try each provider in order
         for _ in range(len(self.providers)):
             provider = self.providers[self.current_provider_index]
@@ -49,6 +166,70 @@ class GeocodingService:
         
         return None
     
+    @staticmethod
+    def _cache_key(latitude: float, longitude: float) -> Optional[Tuple[float, float]]:
+        """Quantize coordinates to ~11 m so nearby lookups share a cache entry"""
+        try:
+            return (round(float(latitude), CACHE_PRECISION), round(float(longitude), CACHE_PRECISION))
+        except (TypeError, ValueError):
+            return None
+    
+    def _cache_lookup(self, key: Optional[Tuple[float, float]]) -> Optional[Dict[str, str]]:
+        """Return a copy of a cached location and mark it as recently used"""
+        if key is None:
+            return None
+        with self._cache_lock:
+            location = self._cache.get(key)
+            if location is None:
+                return None
+            self._cache.move_to_end(key)
+            return dict(location)
+    
+    def _cache_store(self, key: Tuple[float, float], location: Dict[str, str]):
+        """Store a location, evicting the least recently used entries"""
+        with self._cache_lock:
+            self._cache[key] = dict(location)
+            self._cache.move_to_end(key)
+            while len(self._cache) > CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+            self._cache_dirty = True
+    
+    def _load_cache(self):
+        """Load persisted locations from the cache file, if any"""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            for lat, lon, location in entries[-CACHE_MAX_ENTRIES:]:
+                self._cache[(lat, lon)] = dict(location)
+        except Exception as e:
+            print(f"Warning: Could not load geocoding cache {self.cache_file}: {e}")
+            self._cache.clear()
+    
+    def save_cache(self) -> bool:
+        """
+        Persist cached locations to the cache file
+        
+        Returns:
+            True if the cache was written, False otherwise
+        """
+        if not self.cache_file or not self._cache_dirty:
+            return False
+        
+        try:
+            with self._cache_lock:
+                entries = [[lat, lon, location] for (lat, lon), location in self._cache.items()]
+                self._cache_dirty = False
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            return True
+        except Exception as e:
+            print(f"Warning: Could not save geocoding cache {self.cache_file}: {e}")
+            return False
+    
     def _reverse_geocode_nominatim(self, latitude: float, longitude: float) -> Optional[Dict[str, str]]:
         """
         Use OpenStreetMap Nominatim for reverse geocoding
@@ -62,13 +243,19 @@ class GeocodingService:
             'addressdetails': 1,
             'zoom': 18
         }
-        headers = {
-            'User-Agent': 'GeotagPhotoApp/1.0'
-        }
         
-        # Note: verify=False disables SSL certificate verification
-        # This is necessary in some corporate environments with proxy/firewall
-        response = requests.get(url, params=params, headers=headers, timeout=10, verify=False)
+        # Rate limiting - wait only for what is left of the interval since the last request
+        with self._nominatim_lock:
+            elapsed = monotonic() - self._last_nominatim_call
+            if elapsed < NOMINATIM_MIN_INTERVAL:
+                sleep(NOMINATIM_MIN_INTERVAL - elapsed)
+            
+            # Note: verify=False disables SSL certificate verification
+            # This is necessary in some corporate environments with proxy/firewall
+            try:
+                response = self.session.get(url, params=params, timeout=10, verify=False)
+            finally:
+                self._last_nominatim_call = monotonic()
         
         if response.status_code == 200:
             data = response.json()
@@ -95,9 +282,6 @@ class GeocodingService:
             # Country
             country = address.get('country')
             
-            # Rate limiting - sleep 1 second between requests
-            sleep(1)
-            
             return {
                 'city': city,
                 'sublocation': sublocation,
@@ -120,7 +304,7 @@ class GeocodingService:
         
         # Note: verify=False disables SSL certificate verification
         # This is necessary in some corporate environments with proxy/firewall
-        response = requests.get(url, params=params, timeout=10, verify=False)
+        response = self.session.get(url, params=params, timeout=10, verify=False)
         
         if response.status_code == 200:
             data = response.json()
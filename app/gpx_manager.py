@@ -1,88 +1,176 @@
 """
 GPX Manager - Handles GPX file parsing and track management
 """
+import re
+import xml.etree.ElementTree as ET
+import numpy as np
 import pandas as pd
 import gpxpy
 import gpxpy.gpx
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Tuple
+
+# int64 value pandas uses for NaT
+NAT_NS = np.iinfo('i8').min
+
+# GPX namespaces read by the streaming parser (documents without one are read too)
+GPX_NAMESPACES = ('http://www.topografix.com/GPX/1/1', 'http://www.topografix.com/GPX/1/0')
+_GPX_TAGS = {'gpx'} | {f'{{{namespace}}}gpx' for namespace in GPX_NAMESPACES}
+_TRK_TAGS = {'trk'} | {f'{{{namespace}}}trk' for namespace in GPX_NAMESPACES}
+_TRKPT_TAGS = {'trkpt'} | {f'{{{namespace}}}trkpt' for namespace in GPX_NAMESPACES}
+# Characters fed to the streaming parser at a time
+GPX_PARSE_CHUNK_SIZE = 1 << 20
+# ISO 8601 time ending in a zone designator
+_TIME_ZONE_RE = re.compile(r'(?:[Zz]|[+-]\d{2}:?\d{2})$')
+
+
+def _parse_gpx_times(time_texts: List[Optional[str]]) -> Any:
+    """
+    Convert GPX time strings in one vectorized pass
+    
+    The usual UTC form ('2024-01-01T10:00:00Z', optionally with fractional
+    seconds) is parsed by numpy's C ISO 8601 reader; other zoned or naive
+    times go through pandas. Times stay naive unless they carry a zone.
+    
+    Args:
+        time_texts: ISO 8601 strings, None for points without a time
+    
+    Returns:
+        DatetimeIndex (or the input list if no point has a time), or None if
+        zoned and naive times are mixed
+    
+    Raises:
+        ValueError: If a time is not ISO 8601
+    """
+    present = [text for text in time_texts if text]
+    if not present:
+        return time_texts
+    
+    if all(text[-1] == 'Z' and text[:4].isdigit() for text in present):
+        utc_times = np.array([text[:-1] if text else None for text in time_texts], dtype='datetime64[ns]')
+        return pd.DatetimeIndex(utc_times).tz_localize('UTC')
+    
+    zoned = sum(1 for text in present if _TIME_ZONE_RE.search(text))
+    if zoned not in (0, len(present)):
+        return None
+    return pd.to_datetime(time_texts, format='ISO8601', utc=zoned > 0)
+
+
+# Time offset such as '+02:30:00' or '-01:00:00'
+_OFFSET_RE = re.compile(r'^\s*([+-]*)\s*(\d+):(\d+):(\d+)\s*$')
+
+
+@lru_cache(maxsize=256)
+def _parse_offset(offset_str: str) -> int:
+    """Parse an offset string to seconds (0 if it is malformed)"""
+    match = _OFFSET_RE.match(offset_str)
+    if not match:
+        return 0
+    sign = -1 if match.group(1).startswith('-') else 1
+    hours, minutes, seconds = (int(part) for part in match.group(2, 3, 4))
+    return sign * (hours * 3600 + minutes * 60 + seconds)
+
+
+@lru_cache(maxsize=256)
+def _format_offset(seconds: int) -> str:
+    """Format seconds as a signed HH:MM:SS offset string"""
+    sign = '+' if seconds >= 0 else '-'
+    abs_seconds = abs(seconds)
+    hours = abs_seconds // 3600
+    minutes = (abs_seconds % 3600) // 60
+    secs = abs_seconds % 60
+    return f"{sign}{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
 class GPXManager:
     def __init__(self):
-        self.pd_gpx_info: Optional[pd.DataFrame] = None
+        self._pd_gpx_info: Optional[pd.DataFrame] = None
+        # Per-file point frames loaded since pd_gpx_info was last built
+        self._pending_frames: List[pd.DataFrame] = []
+        # Number of points, including pending frames (kept so has_data needn't build the frame)
+        self._row_count = 0
         self.tracks: List[Dict[str, Any]] = []
         self.main_offset_seconds: int = 0  # Main offset in seconds
+        # Per-track time index for find_closest_point, rebuilt when the points change
+        self._track_index: Optional[Tuple[pd.DataFrame, np.ndarray, List[Tuple[np.ndarray, np.ndarray]], Optional[Tuple[int, int]], bool]] = None
+        # Latitude/longitude/elevation as float arrays, rebuilt when pd_gpx_info is replaced
+        self._point_arrays: Optional[Tuple[pd.DataFrame, np.ndarray, np.ndarray, np.ndarray]] = None
+    
+    @property
+    def pd_gpx_info(self) -> Optional[pd.DataFrame]:
+        """All loaded GPX points, sorted by time (built lazily after loading files)"""
+        if self._pending_frames:
+            self._materialize()
+        return self._pd_gpx_info
+    
+    @pd_gpx_info.setter
+    def pd_gpx_info(self, value: Optional[pd.DataFrame]):
+        self._pending_frames = []
+        self._pd_gpx_info = value
+        self._row_count = len(value) if value is not None else 0
+    
+    def _materialize(self):
+        """
+        Merge the pending per-file frames into pd_gpx_info
+        
+        All frames are concatenated once and sorted once, so loading K files
+        costs a single copy instead of one concat and sort per file.
+        """
+        frames = self._pending_frames
+        self._pending_frames = []
+        if self._pd_gpx_info is not None:
+            frames = [self._pd_gpx_info] + frames
+        
+        combined = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        
+        # Dictionary-encode track names so track masks compare small integer codes
+        combined['track_name'] = combined['track_name'].astype('category')
+        
+        self._pd_gpx_info = combined
+        # Stable sort keeps load order for equal times; files are usually already sorted runs
+        self._sort_by_time()
+        self._track_index = None
+        self._point_arrays = None
     
     def parse_offset_string(self, offset_str: str) -> int:
         """Parse offset string like '+02:30:00' or '-01:00:00' to seconds"""
-        try:
-            offset_str = offset_str.strip()
-            sign = 1 if offset_str.startswith('+') else -1 if offset_str.startswith('-') else 1
-            offset_str = offset_str.lstrip('+-')
-            
-            parts = offset_str.split(':')
-            if len(parts) != 3:
-                return 0
-            
-            hours = int(parts[0])
-            minutes = int(parts[1])
-            seconds = int(parts[2])
-            
-            total_seconds = sign * (hours * 3600 + minutes * 60 + seconds)
-            return total_seconds
-        except:
+        if not isinstance(offset_str, str):
             return 0
+        return _parse_offset(offset_str)
     
     def format_offset_seconds(self, seconds: int) -> str:
         """Format seconds to offset string like '+02:30:00' or '-01:00:00'"""
-        sign = '+' if seconds >= 0 else '-'
-        abs_seconds = abs(seconds)
-        hours = abs_seconds // 3600
-        minutes = (abs_seconds % 3600) // 60
-        secs = abs_seconds % 60
-        return f"{sign}{hours:02d}:{minutes:02d}:{secs:02d}"
+        return _format_offset(seconds)
     
     def load_gpx(self, gpx_content: str, filename: str) -> Dict[str, Any]:
         """Load and parse a GPX file"""
-        gpx = gpxpy.parse(gpx_content)
+        # Stream the points with the C XML parser; gpxpy handles anything it can't
+        parsed = self._stream_track_points(gpx_content, filename)
+        if parsed is None:
+            parsed = self._gpxpy_track_points(gpx_content, filename)
+        first_track_name, lats, lngs, eles, times, names = parsed
         
-        points = []
         track_info = {
             'filename': filename,
-            'name': '',
-            'points': [],
+            'name': first_track_name,
+            'points': np.empty((0, 2)),
             'bounds': None
         }
         
-        for track in gpx.tracks:
-            if not track_info['name']:
-                track_info['name'] = track.name or filename
-            
-            for segment in track.segments:
-                for point in segment.points:
-                    point_data = {
-                        'latitude': point.latitude,
-                        'longitude': point.longitude,
-                        'elevation': point.elevation,
-                        'time': point.time,
-                        'track_name': track.name or filename
-                    }
-                    points.append(point_data)
-                    track_info['points'].append({
-                        'lat': point.latitude,
-                        'lng': point.longitude
-                    })
-        
-        # Calculate bounds
-        if track_info['points']:
-            lats = [p['lat'] for p in track_info['points']]
-            lngs = [p['lng'] for p in track_info['points']]
+        # Track polyline as an (n, 2) array of [lat, lng] rows and its bounds
+        if lats:
+            lat_array = np.asarray(lats, dtype=float)
+            lng_array = np.asarray(lngs, dtype=float)
+            track_info['points'] = np.column_stack([lat_array, lng_array])
+            # One column-wise reduction per direction instead of one pass per bound
+            south, west = track_info['points'].min(axis=0).tolist()
+            north, east = track_info['points'].max(axis=0).tolist()
             track_info['bounds'] = {
-                'north': max(lats),
-                'south': min(lats),
-                'east': max(lngs),
-                'west': min(lngs)
+                'north': north,
+                'south': south,
+                'east': east,
+                'west': west
             }
         
         # Check if track with same name already exists
@@ -102,8 +190,14 @@ class GPXManager:
         self.tracks.append(track_info)
         
         # Create or append to DataFrame with adjusted times
-        if points:
-            new_df = pd.DataFrame(points)
+        if lats:
+            new_df = pd.DataFrame({
+                'latitude': lat_array,
+                'longitude': lng_array,
+                'elevation': np.asarray([np.nan if e is None else e for e in eles], dtype=float),
+                'time': times,
+                'track_name': names
+            })
             
             # Add original_time column before applying offset
             if 'time' in new_df.columns:
@@ -112,29 +206,133 @@ class GPXManager:
                 offset_delta = timedelta(seconds=self.main_offset_seconds)
                 new_df['time'] = new_df['time'] + offset_delta
             
-            if self.pd_gpx_info is None:
-                self.pd_gpx_info = new_df
-            else:
-                self.pd_gpx_info = pd.concat([self.pd_gpx_info, new_df], ignore_index=True)
-            
-            # Sort by time
-            if 'time' in self.pd_gpx_info.columns:
-                self.pd_gpx_info = self.pd_gpx_info.sort_values('time').reset_index(drop=True)
+            # Merged into pd_gpx_info (one concat and sort) the next time it is read
+            self._pending_frames.append(new_df)
+            self._row_count += len(new_df)
         
         return track_info
     
+    @staticmethod
+    def _stream_track_points(gpx_content: str, filename: str) -> Optional[Tuple[str, List[float], List[float], List[Optional[float]], Any, List[str]]]:
+        """
+        Extract track points with the streaming (C-accelerated) ElementTree parser
+        
+        Points are read column by column as their <trkpt> elements end and
+        each point (and each finished track) is cleared once read, so the
+        parsed tree never holds the full document.
+        
+        Args:
+            gpx_content: GPX document
+            filename: Name used for tracks without a <name>
+        
+        Returns:
+            (first track name, latitudes, longitudes, elevations, times, track names),
+            or None if the document is malformed, not GPX 1.0/1.1, or has time
+            values it can't convert (gpxpy then parses it and reports errors)
+        """
+        lats: List[float] = []
+        lngs: List[float] = []
+        eles: List[Optional[float]] = []
+        time_texts: List[Optional[str]] = []
+        names: List[str] = []
+        first_track_name = ''
+        
+        parser = ET.XMLPullParser(events=('end',))
+        
+        def events():
+            for offset in range(0, len(gpx_content), GPX_PARSE_CHUNK_SIZE):
+                parser.feed(gpx_content[offset:offset + GPX_PARSE_CHUNK_SIZE])
+                yield from parser.read_events()
+            parser.close()
+            yield from parser.read_events()
+        
+        try:
+            root = None
+            for _, elem in events():
+                root = elem
+                tag = elem.tag
+                if tag in _TRKPT_TAGS:
+                    prefix = tag[:-len('trkpt')]
+                    lats.append(float(elem.get('lat')))
+                    lngs.append(float(elem.get('lon')))
+                    ele = elem.findtext(prefix + 'ele')
+                    eles.append(float(ele) if ele and ele.strip() else None)
+                    time_text = elem.findtext(prefix + 'time')
+                    time_texts.append((time_text.strip() or None) if time_text else None)
+                    # Drop the point's children now that it has been read
+                    elem.clear()
+                elif tag in _TRK_TAGS:
+                    # Points read since the previous track belong to this one
+                    track_name = elem.findtext(tag[:-len('trk')] + 'name')
+                    if not first_track_name:
+                        first_track_name = track_name or filename
+                    names.extend([track_name or filename] * (len(lats) - len(names)))
+                    elem.clear()
+            
+            # The last element to end is the root, which must be a GPX 1.0/1.1 document
+            if root is None or root.tag not in _GPX_TAGS or len(names) != len(lats):
+                return None
+            
+            times = _parse_gpx_times(time_texts)
+        except (ET.ParseError, ValueError, TypeError):
+            return None
+        if times is None:
+            return None
+        
+        return first_track_name, lats, lngs, eles, times, names
+    
+    @staticmethod
+    def _gpxpy_track_points(gpx_content: str, filename: str) -> Tuple[str, List[float], List[float], List[Optional[float]], Any, List[str]]:
+        """
+        Extract track points with gpxpy (fallback for documents the streaming parser skips)
+        
+        Returns:
+            Same columns as _stream_track_points
+        """
+        gpx = gpxpy.parse(gpx_content)
+        
+        # Collect point attributes column by column (no per-point dicts)
+        lats: List[float] = []
+        lngs: List[float] = []
+        eles: List[Optional[float]] = []
+        times: List[Optional[datetime]] = []
+        names: List[str] = []
+        first_track_name = ''
+        
+        for track in gpx.tracks:
+            if not first_track_name:
+                first_track_name = track.name or filename
+            
+            track_name = track.name or filename
+            for segment in track.segments:
+                for point in segment.points:
+                    lats.append(point.latitude)
+                    lngs.append(point.longitude)
+                    eles.append(point.elevation)
+                    times.append(point.time)
+                names.extend([track_name] * (len(lats) - len(names)))
+        
+        # gpxpy's own time zones don't mix with other frames; store zoned times as UTC
+        present = [time for time in times if time is not None]
+        if present and all(time.tzinfo is not None for time in present):
+            times = pd.to_datetime(times, utc=True)
+        
+        return first_track_name, lats, lngs, eles, times, names
+    
     def has_data(self) -> bool:
         """Check if any GPX data is loaded"""
-        return self.pd_gpx_info is not None and not self.pd_gpx_info.empty
+        return self._row_count > 0
     
     def get_all_tracks(self) -> List[Dict[str, Any]]:
-        """Get all loaded track information"""
-        return self.tracks
+        """Get all loaded track information, with points as [[lat, lng], ...] lists for JSON"""
+        return [dict(track, points=track['points'].tolist()) for track in self.tracks]
     
     def clear_tracks(self):
         """Clear all loaded tracks"""
         self.tracks = []
         self.pd_gpx_info = None
+        self._track_index = None
+        self._point_arrays = None
     
     def remove_tracks_by_indices(self, indices: List[int]):
         """Remove specific tracks by their indices"""
@@ -151,13 +349,29 @@ class GPXManager:
         
         # Remove points from DataFrame by filtering out the track names
         if self.pd_gpx_info is not None and 'track_name' in self.pd_gpx_info.columns:
-            # Filter out rows where track_name is in the removal list
-            self.pd_gpx_info = self.pd_gpx_info[~self.pd_gpx_info['track_name'].isin(track_names_to_remove)]
-            self.pd_gpx_info = self.pd_gpx_info.reset_index(drop=True)
+            # Filter out rows where track_name is in the removal list, comparing
+            # the integer category codes rather than the name strings
+            names = self.pd_gpx_info['track_name']
+            if isinstance(names.dtype, pd.CategoricalDtype):
+                categories = names.cat.categories
+                remove_codes = [categories.get_loc(name) for name in track_names_to_remove if name in categories]
+                keep = ~np.isin(names.cat.codes.to_numpy(), remove_codes)
+            else:
+                keep = ~names.isin(track_names_to_remove).to_numpy()
+            
+            if not keep.all():
+                # take() already copies, so give it a fresh index instead of reset_index()
+                remaining = self.pd_gpx_info.take(np.flatnonzero(keep))
+                remaining.index = pd.RangeIndex(len(remaining))
+                if isinstance(remaining['track_name'].dtype, pd.CategoricalDtype):
+                    remaining['track_name'] = remaining['track_name'].cat.remove_unused_categories()
+                self.pd_gpx_info = remaining
             
             # If no data remains, set to None
             if self.pd_gpx_info.empty:
                 self.pd_gpx_info = None
+            self._track_index = None
+            self._point_arrays = None
     
     def set_main_offset(self, offset_seconds: int):
         """Set main offset and apply to all tracks"""
@@ -165,20 +379,12 @@ class GPXManager:
         
         # Update all track offsets
         for track in self.tracks:
-            old_offset = track.get('offset_seconds', 0)
             track['offset_seconds'] = offset_seconds
-            
-            # Update DataFrame times for this track
-            if self.pd_gpx_info is not None and 'track_name' in self.pd_gpx_info.columns:
-                mask = self.pd_gpx_info['track_name'] == track['name']
-                if mask.any() and 'original_time' in self.pd_gpx_info.columns:
-                    # Recompute time from original_time
-                    offset_delta = timedelta(seconds=offset_seconds)
-                    self.pd_gpx_info.loc[mask, 'time'] = self.pd_gpx_info.loc[mask, 'original_time'] + offset_delta
-        
-        # Re-sort by time
-        if self.pd_gpx_info is not None and 'time' in self.pd_gpx_info.columns:
-            self.pd_gpx_info = self.pd_gpx_info.sort_values('time').reset_index(drop=True)
+        
+        # Recompute all times in one pass and re-sort
+        self._apply_track_offsets()
+        self._sort_by_time()
+        self._track_index = None
     
     def set_track_offset(self, track_index: int, offset_seconds: int):
         """Set offset for a specific track"""
@@ -186,26 +392,193 @@ class GPXManager:
             track = self.tracks[track_index]
             track['offset_seconds'] = offset_seconds
             
-            # Update DataFrame times for this track
-            if self.pd_gpx_info is not None and 'track_name' in self.pd_gpx_info.columns:
-                mask = self.pd_gpx_info['track_name'] == track['name']
-                if mask.any() and 'original_time' in self.pd_gpx_info.columns:
-                    # Recompute time from original_time
-                    offset_delta = timedelta(seconds=offset_seconds)
-                    self.pd_gpx_info.loc[mask, 'time'] = self.pd_gpx_info.loc[mask, 'original_time'] + offset_delta
-            
-            # Re-sort by time
-            if self.pd_gpx_info is not None and 'time' in self.pd_gpx_info.columns:
-                self.pd_gpx_info = self.pd_gpx_info.sort_values('time').reset_index(drop=True)
+            # Recompute times from original_time and re-sort
+            self._apply_track_offsets()
+            self._sort_by_time()
+            self._track_index = None
     
-    def find_closest_point(self, target_time: datetime, time_window_minutes: int = 5) -> Optional[Dict[str, float]]:
-        """Find the closest GPX point to a given time within a time window"""
-        if not self.has_data():
-            return None
+    def _apply_track_offsets(self):
+        """
+        Recompute every point's time as original_time plus its track's offset
         
-        if 'time' not in self.pd_gpx_info.columns:
-            return None
+        Offsets are looked up per row through the track_name category codes,
+        so all tracks are updated in a single vectorized pass. Rows whose
+        track is not loaded keep their current time.
+        """
+        if self.pd_gpx_info is None or 'track_name' not in self.pd_gpx_info.columns \
+                or 'original_time' not in self.pd_gpx_info.columns:
+            return
+        
+        names = self.pd_gpx_info['track_name']
+        if not isinstance(names.dtype, pd.CategoricalDtype):
+            names = names.astype('category')
+        categories = names.cat.categories
+        
+        # Offset (ns) per category code
+        offsets_ns = np.zeros(len(categories), dtype='i8')
+        known = np.zeros(len(categories), dtype=bool)
+        for track in self.tracks:
+            try:
+                code = categories.get_loc(track['name'])
+            except KeyError:
+                continue
+            offsets_ns[code] = int(track.get('offset_seconds', 0)) * 1_000_000_000
+            known[code] = True
+        
+        # Category codes are -1 for missing names
+        codes = names.cat.codes.to_numpy()
+        safe_codes = np.maximum(codes, 0)
+        has_track = (codes >= 0) & known[safe_codes]
+        if not has_track.any():
+            return
+        
+        row_offsets = pd.Series(pd.to_timedelta(np.where(has_track, offsets_ns[safe_codes], 0), unit='ns'),
+                                index=self.pd_gpx_info.index)
+        new_time = self.pd_gpx_info['original_time'] + row_offsets
+        self.pd_gpx_info['time'] = new_time.where(has_track, self.pd_gpx_info['time'])
+    
+    @staticmethod
+    def _time_ns(times: pd.Series) -> np.ndarray:
+        """
+        Get a time column as int64 nanoseconds since the epoch (NAT_NS for missing)
+        
+        For a datetime64[ns] column this is a view of its data, not a copy.
+        """
+        index = pd.DatetimeIndex(times, copy=False)
+        if index.unit != 'ns':
+            index = index.as_unit('ns')
+        return index.asi8
+    
+    def _sort_by_time(self):
+        """
+        Sort pd_gpx_info by time (points without a time last)
+        
+        Each track is usually already in time order, and a stable sort on the
+        int64 times merges such runs in near-linear time. An already sorted
+        frame with a default index is left untouched (no copy).
+        """
+        if self.pd_gpx_info is None or 'time' not in self.pd_gpx_info.columns:
+            return
+        
+        time_ns = self._time_ns(self.pd_gpx_info['time'])
+        time_ns = np.where(time_ns == NAT_NS, np.iinfo('i8').max, time_ns)
+        if len(time_ns) > 1 and np.any(time_ns[1:] < time_ns[:-1]):
+            order = np.argsort(time_ns, kind='stable')
+            # take() already copies, so give it a fresh index instead of reset_index()
+            sorted_info = self.pd_gpx_info.take(order)
+            sorted_info.index = pd.RangeIndex(len(sorted_info))
+            self.pd_gpx_info = sorted_info
+        elif not self.pd_gpx_info.index.equals(pd.RangeIndex(len(time_ns))):
+            self.pd_gpx_info = self.pd_gpx_info.reset_index(drop=True)
+    
+    def _get_track_index(self) -> Tuple[np.ndarray, List[Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Get the per-track time index used to match photos
+        
+        Returns:
+            (bounds, tracks) where bounds is an (n, 2) int64 array of each
+            track's first/last time in nanoseconds and tracks holds, per track,
+            its sorted times and their row positions in pd_gpx_info. Rows
+            without a time are left out. Cached until the points change (or
+            pd_gpx_info is replaced).
+        """
+        cached = self._track_index
+        if cached is not None and cached[0] is self.pd_gpx_info:
+            return cached[1], cached[2]
+        
+        time_ns = self._time_ns(self.pd_gpx_info['time'])
+        positions = np.flatnonzero(time_ns != NAT_NS)
+        time_ns = time_ns[positions]
+        
+        # pd_gpx_info is kept sorted by time, but be safe if it was modified externally
+        if len(time_ns) > 1 and np.any(time_ns[1:] < time_ns[:-1]):
+            order = np.argsort(time_ns, kind='stable')
+            time_ns = time_ns[order]
+            positions = positions[order]
+        
+        # Split the sorted points by track (each part stays sorted)
+        if 'track_name' in self.pd_gpx_info.columns:
+            codes = pd.factorize(self.pd_gpx_info['track_name'])[0][positions]
+            tracks = [(time_ns[codes == code], positions[codes == code]) for code in np.unique(codes)]
+        else:
+            tracks = [(time_ns, positions)] if len(time_ns) else []
+        
+        bounds = np.array([(track_ns[0], track_ns[-1]) for track_ns, _ in tracks], dtype='i8').reshape(-1, 2)
+        time_range = (int(time_ns[0]), int(time_ns[-1])) if len(time_ns) else None
+        
+        # Whether the GPX times carry a time zone (GPX times are normally UTC)
+        times = self.pd_gpx_info['time']
+        if isinstance(times.dtype, pd.DatetimeTZDtype):
+            zoned = True
+        elif times.dtype.kind == 'M':
+            zoned = False
+        else:
+            sample_time = times.iloc[0]
+            zoned = getattr(sample_time, 'tzinfo', None) is not None
+        
+        self._track_index = (self.pd_gpx_info, bounds, tracks, time_range, zoned)
+        return bounds, tracks
+    
+    def _get_time_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Get the first and last point time in nanoseconds
+        
+        Returns:
+            (first, last), or None if no point has a time. Cached with the track index.
+        """
+        self._get_track_index()
+        return self._track_index[3]
+    
+    def _get_time_zoned(self) -> bool:
+        """Whether the GPX times are time zone aware (cached with the track index)"""
+        self._get_track_index()
+        return self._track_index[4]
+    
+    def _get_point_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the point coordinates as float arrays indexed by row position
+        
+        Returns:
+            (latitudes, longitudes, elevations), with NaN for missing elevations.
+            Cached until pd_gpx_info is replaced.
+        """
+        cached = self._point_arrays
+        if cached is not None and cached[0] is self.pd_gpx_info:
+            return cached[1], cached[2], cached[3]
+        
+        latitudes = self.pd_gpx_info['latitude'].to_numpy(dtype=float)
+        longitudes = self.pd_gpx_info['longitude'].to_numpy(dtype=float)
+        elevations = self.pd_gpx_info['elevation'].to_numpy(dtype=float)
+        
+        self._point_arrays = (self.pd_gpx_info, latitudes, longitudes, elevations)
+        return latitudes, longitudes, elevations
+    
+    @staticmethod
+    def _nearest_index(time_ns: np.ndarray, target_ns: int) -> int:
+        """
+        Binary search the sorted times for the one closest to target_ns
+        
+        Ties (and repeated times) resolve to the earliest point.
+        """
+        if len(time_ns) < 2:
+            return 0
+        # Clamp into [1, n - 1] so both bracket candidates exist; the earlier one
+        # wins ties, and outside the range the sign of the deltas picks the end
+        i = min(max(int(np.searchsorted(time_ns, target_ns, side='left')), 1), len(time_ns) - 1)
+        i -= int(target_ns - time_ns[i - 1] <= time_ns[i] - target_ns)
+        # First of the points sharing the picked time
+        return int(np.searchsorted(time_ns, time_ns[i], side='left'))
+    
+    def _target_ns(self, target_time) -> Optional[int]:
+        """
+        Convert a photo time to nanoseconds comparable with the GPX times
+        
+        Args:
+            target_time: datetime, Timestamp or parseable string
         
+        Returns:
+            Nanoseconds since the epoch, or None if the time is missing or invalid
+        """
         # Convert target_time to datetime if it's a string
         if isinstance(target_time, str):
             try:
@@ -214,39 +587,159 @@ class GPXManager:
                 print(f"Error parsing target time '{target_time}': {e}")
                 return None
         
-        # Ensure target_time is timezone-aware if DataFrame times are
-        # or make both timezone-naive for comparison
-        sample_time = self.pd_gpx_info['time'].iloc[0]
-        if hasattr(sample_time, 'tz') and sample_time.tz is not None:
-            # DataFrame times are timezone-aware
-            if not hasattr(target_time, 'tz') or target_time.tz is None:
-                # Make target_time timezone-aware (assume UTC)
-                target_time = pd.Timestamp(target_time).tz_localize('UTC')
-        else:
-            # DataFrame times are timezone-naive
-            if hasattr(target_time, 'tz') and target_time.tz is not None:
-                # Remove timezone from target_time
-                target_time = target_time.tz_localize(None)
+        if target_time is None or pd.isna(target_time):
+            return None
+        
+        # Timestamp.value counts UTC nanoseconds, so a naive target is read as UTC
+        # against zoned GPX times; against naive GPX times a zoned target keeps
+        # its wall-clock time
+        target_time = pd.Timestamp(target_time)
+        if target_time.tzinfo is not None and not self._get_time_zoned():
+            target_time = target_time.tz_localize(None)
+        
+        return target_time.as_unit('ns').value
+    
+    def find_closest_point(self, target_time: datetime, time_window_minutes: int = 5) -> Optional[Dict[str, float]]:
+        """Find the closest GPX point to a given time within a time window"""
+        if not self.has_data():
+            return None
+        
+        if 'time' not in self.pd_gpx_info.columns:
+            return None
+        
+        target_ns = self._target_ns(target_time)
+        if target_ns is None:
+            return None
+        window_ns = int(time_window_minutes * 60 * 1_000_000_000)
+        
+        # Nothing can match outside the loaded time range (widened by the window)
+        time_range = self._get_time_range()
+        if time_range is None or target_ns < time_range[0] - window_ns or target_ns > time_range[1] + window_ns:
+            return None
         
-        # Filter points within time window
-        time_min = target_time - timedelta(minutes=time_window_minutes)
-        time_max = target_time + timedelta(minutes=time_window_minutes)
+        # Only tracks whose time range (widened by the window) covers the target can match
+        bounds, tracks = self._get_track_index()
+        candidates = np.flatnonzero((bounds[:, 0] <= target_ns + window_ns) &
+                                    (bounds[:, 1] >= target_ns - window_ns))
         
-        mask = (self.pd_gpx_info['time'] >= time_min) & (self.pd_gpx_info['time'] <= time_max)
-        nearby_points = self.pd_gpx_info[mask]
+        # Binary search each candidate track; ties go to the earliest row
+        best = None
+        for track in candidates:
+            track_ns, track_positions = tracks[track]
+            index = self._nearest_index(track_ns, target_ns)
+            candidate = (abs(int(track_ns[index]) - target_ns), int(track_positions[index]))
+            if best is None or candidate < best:
+                best = candidate
         
-        # Check if any points were found
-        if nearby_points.empty:
+        if best is None or best[0] > window_ns:
             return None
+        diff_ns, position = best
         
-        # Find closest point by time difference
-        nearby_points = nearby_points.copy()
-        nearby_points['time_diff'] = abs((nearby_points['time'] - target_time).dt.total_seconds())
-        closest = nearby_points.loc[nearby_points['time_diff'].idxmin()]
+        latitudes, longitudes, elevations = self._get_point_arrays()
+        elevation = elevations[position]
         
         return {
-            'latitude': closest['latitude'],
-            'longitude': closest['longitude'],
-            'elevation': closest['elevation'] if pd.notna(closest['elevation']) else None,
-            'time_diff_seconds': closest['time_diff']
+            'latitude': latitudes[position],
+            'longitude': longitudes[position],
+            'elevation': elevation if not np.isnan(elevation) else None,
+            'time_diff_seconds': diff_ns / 1e9
         }
+    
+    def find_closest_points(self, target_times, time_window_minutes: int = 5) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Find the closest GPX point for many times at once
+        
+        Same matching rules as find_closest_point, but every track is binary
+        searched for all targets in one vectorized pass.
+        
+        Args:
+            target_times: Sequence of datetimes/Timestamps/strings, a datetime64
+                Series/array (converted in one step, NaT never matches), or an
+                int64 array of nanoseconds since the epoch
+            time_window_minutes: Maximum time difference for a match
+        
+        Returns:
+            (latitudes, longitudes, elevations, time_diff_seconds) float arrays
+            in input order; NaN where no point is within the window (and for
+            points without elevation)
+        """
+        if isinstance(target_times, np.ndarray) and target_times.dtype.kind == 'i':
+            targets = target_times.astype('i8')
+            valid = np.ones(len(targets), dtype=bool)
+        elif getattr(target_times, 'dtype', None) is not None and target_times.dtype.kind == 'M':
+            # Same rules as _target_ns: zoned targets keep their wall-clock time
+            # against naive GPX times
+            index = pd.DatetimeIndex(target_times)
+            if (index.tz is not None and self.has_data() and 'time' in self.pd_gpx_info.columns
+                    and not self._get_time_zoned()):
+                index = index.tz_localize(None)
+            valid = ~index.isna()
+            targets = self._time_ns(index)
+        else:
+            target_list = list(target_times)
+            targets = np.zeros(len(target_list), dtype='i8')
+            valid = np.zeros(len(target_list), dtype=bool)
+            if self.has_data() and 'time' in self.pd_gpx_info.columns:
+                for i, target_time in enumerate(target_list):
+                    target_ns = self._target_ns(target_time)
+                    if target_ns is not None:
+                        targets[i] = target_ns
+                        valid[i] = True
+        
+        count = len(targets)
+        latitudes = np.full(count, np.nan)
+        longitudes = np.full(count, np.nan)
+        elevations = np.full(count, np.nan)
+        time_diffs = np.full(count, np.nan)
+        
+        if count == 0 or not valid.any() or not self.has_data() or 'time' not in self.pd_gpx_info.columns:
+            return latitudes, longitudes, elevations, time_diffs
+        
+        window_ns = int(time_window_minutes * 60 * 1_000_000_000)
+        
+        # Targets outside the loaded time range (widened by the window) can't match
+        time_range = self._get_time_range()
+        if time_range is None:
+            return latitudes, longitudes, elevations, time_diffs
+        valid &= (targets >= time_range[0] - window_ns) & (targets <= time_range[1] + window_ns)
+        if not valid.any():
+            return latitudes, longitudes, elevations, time_diffs
+        
+        no_match = np.iinfo('i8').max
+        best_diff = np.full(count, no_match, dtype='i8')
+        best_position = np.full(count, no_match, dtype='i8')
+        
+        bounds, tracks = self._get_track_index()
+        for (first_ns, last_ns), (track_ns, track_positions) in zip(bounds, tracks):
+            # Only targets within the track's time range (widened by the window) can match
+            selected = np.flatnonzero(valid & (targets >= first_ns - window_ns) & (targets <= last_ns + window_ns))
+            if len(selected) == 0:
+                continue
+            target = targets[selected]
+            
+            # Pick between the two bracketing points without branching: clamp into
+            # [1, n - 1] and step back when the earlier point is at least as close
+            if len(track_ns) > 1:
+                after = np.clip(np.searchsorted(track_ns, target, side='left'), 1, len(track_ns) - 1)
+                index = after - ((target - track_ns[after - 1]) <= (track_ns[after] - target))
+                # Repeated times resolve to the first of them
+                index = np.searchsorted(track_ns, track_ns[index], side='left')
+            else:
+                index = np.zeros(len(target), dtype='i8')
+            diff = np.abs(track_ns[index] - target)
+            position = track_positions[index]
+            
+            # Keep the smallest difference; ties go to the earliest row
+            better = (diff < best_diff[selected]) | ((diff == best_diff[selected]) & (position < best_position[selected]))
+            best_diff[selected[better]] = diff[better]
+            best_position[selected[better]] = position[better]
+        
+        matched = np.flatnonzero(best_diff <= window_ns)
+        positions = best_position[matched]
+        point_latitudes, point_longitudes, point_elevations = self._get_point_arrays()
+        latitudes[matched] = point_latitudes[positions]
+        longitudes[matched] = point_longitudes[positions]
+        elevations[matched] = point_elevations[positions]
+        time_diffs[matched] = best_diff[matched] / 1e9
+        
+        return latitudes, longitudes, elevations, time_diffs
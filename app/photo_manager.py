@@ -1,15 +1,81 @@
 """
 Photo Manager - Handles photo scanning, EXIF extraction, and DataFrame management
 """
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from PIL import Image, ImageOps
-from PIL.ExifTags import TAGS, GPSTAGS
-import piexif
+from PIL import Image, ImageOps, IptcImagePlugin
+from PIL.ExifTags import Base, GPS
 import tempfile
 import os
-from typing import Optional, Dict, Any
+import struct
+import mmap
+import json
+import hashlib
+from collections import OrderedDict
+import threading
+import multiprocessing
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Future
+from typing import Optional, Dict, Any, List, Iterable, Iterator, Tuple
+
+# EXIF tag ids read by _read_photo_info, looked up directly in the EXIF dict
+_TAG_DATETIME_ORIGINAL = int(Base.DateTimeOriginal)
+_TAG_DATETIME = int(Base.DateTime)
+_TAG_IMAGE_DESCRIPTION = int(Base.ImageDescription)
+_TAG_XP_TITLE = int(Base.XPTitle)
+_TAG_XP_COMMENT = int(Base.XPComment)
+_TAG_GPS_INFO = int(Base.GPSInfo)
+_TAG_ORIENTATION = int(Base.Orientation)
+# Offset tags by priority (the digitized offset has always won over the others)
+_OFFSET_TIME_TAGS = (int(Base.OffsetTimeDigitized), int(Base.OffsetTimeOriginal), int(Base.OffsetTime))
+_GPS_LATITUDE_REF = int(GPS.GPSLatitudeRef)
+_GPS_LATITUDE = int(GPS.GPSLatitude)
+_GPS_LONGITUDE_REF = int(GPS.GPSLongitudeRef)
+_GPS_LONGITUDE = int(GPS.GPSLongitude)
+_GPS_ALTITUDE_REF = int(GPS.GPSAltitudeRef)
+_GPS_ALTITUDE = int(GPS.GPSAltitude)
+_GPS_TIME_STAMP = int(GPS.GPSTimeStamp)
+_GPS_DATE_STAMP = int(GPS.GPSDateStamp)
+# Sign of a GPS coordinate by its EXIF reference (anything else counts as N/E)
+_HEMISPHERE_SIGN = {'N': 1.0, 'S': -1.0, 'E': 1.0, 'W': -1.0}
+# Image file extensions picked up by scan_folder (lower case)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.heic')
+# Folders with at least this many photos are scanned by a process pool
+PARALLEL_SCAN_MIN_FILES = 50
+# Photos sent to a worker process per task
+SCAN_CHUNK_SIZE = 32
+# Scan workers are never forked from the threaded server process, where a child
+# could inherit a lock held by another thread and hang; forkserver children
+# fork from a clean single-threaded server instead (spawn where unavailable)
+SCAN_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+# Bytes read from the start of a JPEG to find its EXIF/IPTC segments
+JPEG_HEAD_BYTES = 128 * 1024
+# Scan results are cached per folder here and reused for unchanged files; the
+# files hold photo paths and GPS positions, so they are private to the user
+SCAN_CACHE_DIR = Path.home() / ".cache" / "python_geotag" / "scans"
+# Bumped whenever the fields read by _read_photo_info change
+SCAN_CACHE_VERSION = 1
+# Photo fields stored as ISO strings in the scan cache
+SCAN_CACHE_TIME_FIELDS = ('exif_capture_time', 'creation_time')
+# Explicit pd_photo_info dtypes; altitude columns that start out all None
+# would otherwise be inferred as object columns holding boxed floats
+PHOTO_COLUMN_DTYPES = {
+    'exif_capture_time': 'datetime64[ns]',
+    'creation_time': 'datetime64[ns]',
+    'exif_altitude': 'float64',
+    'gpx_altitude': 'float64',
+    'manual_altitude': 'float64',
+    'final_altitude': 'float64',
+    'tagged': 'bool',
+}
+# Thumbnails are stored here, named '<pid>-<token>_<signature>' per cache; each
+# LRU keeps at most THUMBNAIL_CACHE_MAX_ENTRIES and deletes its evicted files
+THUMBNAIL_DIR = Path(tempfile.gettempdir()) / "geotag_thumbs"
+THUMBNAIL_CACHE_MAX_ENTRIES = 4096
+# Thumbnails up to this size use bilinear resampling (LANCZOS above it)
+THUMBNAIL_BILINEAR_MAX_SIZE = 256
 
 
 class PhotoManager:
@@ -17,43 +83,221 @@ class PhotoManager:
         self.pd_photo_info: Optional[pd.DataFrame] = None
         self.current_folder: Optional[str] = None
         self.sort_by: str = "time"  # 'time' or 'name'
-        self.thumbnail_cache = {}
+        # Thumbnail paths keyed by file content signature and size (LRU)
+        self.thumbnail_cache: OrderedDict = OrderedDict()
+        self._thumbnail_lock = threading.Lock()
+        # Prefix of this instance's thumbnail files in the shared THUMBNAIL_DIR
+        # (process id first), so no two caches ever share or remove a file
+        self._thumbnail_namespace = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._thumbnail_dir_ready = False
+        # Background workers for prefetch_thumbnails (PIL releases the GIL while resizing)
+        # and worker processes for large scans; both started on first use, stopped by close()
+        self._thumbnail_pool: Optional[ThreadPoolExecutor] = None
+        self._scan_pool: Optional[ProcessPoolExecutor] = None
         self.filename_format: str = "%Y%m%d_%H%M%S_{title}"  # Default format for new filenames
         
-    def scan_folder(self, folder_path: str, recursive: bool = False) -> pd.DataFrame:
-        """Scan folder for photos and create pd_photo_info DataFrame"""
+    def close(self):
+        """Stop the thumbnail prefetch threads and scan worker processes"""
+        with self._thumbnail_lock:
+            thumbnail_pool, self._thumbnail_pool = self._thumbnail_pool, None
+        scan_pool, self._scan_pool = self._scan_pool, None
+        
+        if thumbnail_pool is not None:
+            thumbnail_pool.shutdown(wait=True, cancel_futures=True)
+        if scan_pool is not None:
+            scan_pool.shutdown(wait=True, cancel_futures=True)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def scan_folder(self, folder_path: str, recursive: bool = False, use_cache: bool = True) -> pd.DataFrame:
+        """
+        Scan folder for photos and create pd_photo_info DataFrame
+        
+        Args:
+            folder_path: Folder to scan
+            recursive: Also scan subfolders
+            use_cache: Reuse EXIF data cached by a previous scan for files whose
+                size and modification times are unchanged
+        """
         folder = Path(folder_path)
         if not folder.exists():
             raise ValueError(f"Folder does not exist: {folder_path}")
         
-        # Find all image files
-        image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.tif', '.heic'}
+        # Find all image files (their stat results are reused below)
+        image_files = []
+        stats = []
+        for img_file, stat in self._iter_image_files(folder, recursive):
+            image_files.append(img_file)
+            stats.append(stat)
+        
+        # Reuse cached EXIF data for unchanged files
+        cache_path = self._scan_cache_path(folder, recursive) if use_cache else None
+        cached = self._load_scan_cache(cache_path) if cache_path else {}
+        signatures = [self._file_signature(stat) for stat in stats]
+        photo_data = []
+        to_read = []
+        for position, (img_file, signature) in enumerate(zip(image_files, signatures)):
+            entry = cached.get(str(img_file))
+            if entry is not None and entry['signature'] == signature:
+                photo_data.append(entry['info'])
+            else:
+                photo_data.append(None)
+                to_read.append(position)
         
-        if recursive:
-            image_files = [f for f in folder.rglob('*') if f.suffix.lower() in image_extensions]
-        else:
-            image_files = [f for f in folder.glob('*') if f.suffix.lower() in image_extensions]
+        read_data = self._read_photos([image_files[i] for i in to_read], [stats[i] for i in to_read])
+        for position, info in zip(to_read, read_data):
+            photo_data[position] = info
         
-        # Create DataFrame
-        photo_data = []
-        for img_file in image_files:
-            photo_info = self._extract_photo_info(img_file)
-            photo_data.append(photo_info)
+        if cache_path and (to_read or len(cached) != len(image_files)):
+            self._save_scan_cache(cache_path, image_files, signatures, photo_data)
+        
+        # Generate new filenames based on current format
+        for photo_info in photo_data:
+            photo_info['new_name'] = self._generate_new_filename_from_info(photo_info)
         
-        self.pd_photo_info = pd.DataFrame(photo_data)
+        # Create DataFrame; naming the columns (every record has the same keys)
+        # skips pandas' pass collecting the union of the dict keys
+        df = pd.DataFrame(photo_data, columns=list(photo_data[0]) if photo_data else None)
+        self.pd_photo_info = df.astype({col: dtype for col, dtype in PHOTO_COLUMN_DTYPES.items() if col in df.columns})
         self.current_folder = folder_path
         self._deduplicate_filenames()
         self._apply_sort()
         
         return self.pd_photo_info
     
-    def _extract_photo_info(self, file_path: Path) -> Dict[str, Any]:
-        """Extract photo information including EXIF data"""
+    def _read_photos(self, image_files: List[Path], stats: List[os.stat_result]) -> List[Dict[str, Any]]:
+        """Read EXIF data of the given files, across worker processes for large batches"""
+        if len(image_files) >= PARALLEL_SCAN_MIN_FILES:
+            try:
+                if self._scan_pool is None:
+                    self._scan_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context(SCAN_START_METHOD))
+                return list(self._scan_pool.map(self._read_photo_info, image_files, stats, chunksize=SCAN_CHUNK_SIZE))
+            except Exception as e:
+                print(f"Warning: Parallel scan failed, reading photos serially: {e}")
+                # A broken pool cannot run further tasks; start a fresh one next time
+                if self._scan_pool is not None:
+                    self._scan_pool.shutdown(wait=False, cancel_futures=True)
+                    self._scan_pool = None
+        return [self._read_photo_info(img_file, stat) for img_file, stat in zip(image_files, stats)]
+    
+    @staticmethod
+    def _iter_image_files(folder: Path, recursive: bool) -> Iterator[Tuple[Path, os.stat_result]]:
+        """
+        Yield (path, stat) for the image files of a folder
+        
+        Walks with os.scandir so only image files become Path objects. Like
+        rglob, a folder's files come before its subfolders' and symlinked
+        folders are not followed; unreadable subfolders are skipped.
+        """
+        subfolders = []
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subfolders.append(entry.path)
+                elif entry.name.lower().endswith(IMAGE_EXTENSIONS) and entry.is_file():
+                    yield Path(entry.path), entry.stat()
+        
+        for subfolder in subfolders:
+            try:
+                yield from PhotoManager._iter_image_files(subfolder, recursive)
+            except OSError as e:
+                print(f"Warning: Could not scan folder {subfolder}: {e}")
+    
+    @staticmethod
+    def _scan_cache_path(folder: Path, recursive: bool) -> Path:
+        """Path of the scan cache for a folder (separate for recursive scans)"""
+        key = hashlib.blake2b(f"{folder.resolve()}|{recursive}".encode('utf-8'), digest_size=8).hexdigest()
+        return SCAN_CACHE_DIR / f"geotag_scan_{key}.json"
+    
+    @staticmethod
+    def _file_signature(stat: os.stat_result) -> List[int]:
+        """Size and modification times of a file; any change invalidates its cached data"""
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+    
+    @staticmethod
+    def _load_scan_cache(cache_path: Path) -> Dict[str, Dict[str, Any]]:
+        """
+        Load a scan cache
+        
+        Returns:
+            {full_path: {'signature': [...], 'info': photo_info}}, empty if missing or unreadable
+        """
+        if not cache_path.exists():
+            return {}
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') != SCAN_CACHE_VERSION:
+                return {}
+            entries = cache['files']
+            for entry in entries.values():
+                info = entry['info']
+                for field in SCAN_CACHE_TIME_FIELDS:
+                    if info.get(field) is not None:
+                        info[field] = datetime.fromisoformat(info[field])
+            return entries
+        except Exception as e:
+            print(f"Warning: Could not load scan cache {cache_path}: {e}")
+            return {}
+    
+    @staticmethod
+    def _save_scan_cache(cache_path: Path, image_files: List[Path], signatures: List[List[int]],
+                         photo_data: List[Dict[str, Any]]):
+        """Write the EXIF data of a scan to its cache file"""
+        entries = {}
+        for img_file, signature, info in zip(image_files, signatures, photo_data):
+            info = dict(info)
+            for field in SCAN_CACHE_TIME_FIELDS:
+                if isinstance(info.get(field), datetime):
+                    info[field] = info[field].isoformat()
+            entries[str(img_file)] = {'signature': signature, 'info': info}
+        
+        try:
+            cache_path.parent.mkdir(parents=True, mode=0o700, exist_ok=True)
+            # Written user-only under a temporary name, then moved into place
+            temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with open(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': SCAN_CACHE_VERSION, 'files': entries}, f)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            # The cache only speeds up the next scan
+            print(f"Warning: Could not write scan cache {cache_path}: {e}")
+    
+    def _extract_photo_info(self, file_path: Path, stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """Extract photo information including EXIF data (stat: the file's stat result, if known)"""
+        info = self._read_photo_info(file_path, stat)
+        
+        # Generate new filename based on current format
+        info['new_name'] = self._generate_new_filename_from_info(info)
+        
+        return info
+    
+    @staticmethod
+    def _read_photo_info(file_path: Path, stat: Optional[os.stat_result] = None) -> Dict[str, Any]:
+        """
+        Read photo information including EXIF data (new_name is left empty)
+        
+        Uses no instance state so scan_folder can run it in worker processes.
+        
+        Args:
+            file_path: Path to the photo
+            stat: The file's stat result if already known (saves a stat call)
+        """
+        if stat is None:
+            stat = file_path.stat()
+        
         info = {
             'filename': file_path.name,
             'full_path': str(file_path),
             'exif_capture_time': None,
-            'creation_time': datetime.fromtimestamp(file_path.stat().st_ctime),
+            'creation_time': datetime.fromtimestamp(stat.st_ctime),
             'new_time': None,
             'exif_gps_datestamp': None,
             'exif_gps_timestamp': None,
@@ -90,171 +334,147 @@ class PhotoManager:
         }
         
         try:
-            with Image.open(file_path) as img:
-                exif_data = img._getexif()
-                if exif_data:
-                    # Extract capture time and image title
-                    # First pass: look for ImageDescription (highest priority)
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        
-                        if tag == 'DateTimeOriginal' or tag == 'DateTime':
+            # Read the metadata segments directly; fall back to PIL for other formats
+            metadata = PhotoManager._read_jpeg_metadata(file_path)
+            if metadata is None:
+                with Image.open(file_path) as img:
+                    metadata = (img._getexif(), PhotoManager._get_iptc_info(img))
+            exif_data, iptc_data = metadata
+            
+            if exif_data:
+                # Extract capture time: DateTimeOriginal, else DateTime
+                for tag_id in (_TAG_DATETIME_ORIGINAL, _TAG_DATETIME):
+                    capture_time = PhotoManager._parse_exif_datetime(exif_data.get(tag_id))
+                    if capture_time is not None:
+                        info['exif_capture_time'] = capture_time
+                        break
+                
+                # Extract offset time (timezone)
+                for tag_id in _OFFSET_TIME_TAGS:
+                    value = exif_data.get(tag_id)
+                    if value:
+                        info['exif_offset_time'] = str(value).strip()
+                        break
+                
+                # Extract image title - prioritize ImageDescription for cross-platform compatibility
+                value = exif_data.get(_TAG_IMAGE_DESCRIPTION)
+                if value and str(value).strip():
+                    info['exif_image_title'] = str(value).strip()
+                
+                # If no ImageDescription found, try Windows-specific tags as fallback
+                if not info['exif_image_title']:
+                    for tag_id in (_TAG_XP_TITLE, _TAG_XP_COMMENT):
+                        value = exif_data.get(tag_id)
+                        # XPTitle/XPComment are stored as bytes, need to decode
+                        if value and isinstance(value, bytes):
                             try:
-                                info['exif_capture_time'] = datetime.strptime(
-                                    value, '%Y:%m:%d %H:%M:%S'
-                                )
+                                decoded = value.decode('utf-16le').rstrip('\x00').strip()
+                                if decoded:
+                                    info['exif_image_title'] = decoded
+                                    break
                             except:
                                 pass
-                        
-                        # Extract offset time (timezone)
-                        if tag == 'OffsetTime' or tag == 'OffsetTimeOriginal':
-                            if value:
-                                info['exif_offset_time'] = str(value).strip()
-                        
-                        # Also check for numeric offset time tags (36880, 36881, 36882)
-                        if tag_id in [36880, 36881, 36882]:
-                            if value:
-                                info['exif_offset_time'] = str(value).strip()
-                        
-                        # Extract image title - prioritize ImageDescription for cross-platform compatibility
-                        if tag == 'ImageDescription':
-                            if value and str(value).strip():
-                                info['exif_image_title'] = str(value).strip()
-                    
-                    # If no ImageDescription found, try Windows-specific tags as fallback
-                    if not info['exif_image_title']:
-                        for tag_id, value in exif_data.items():
-                            tag = TAGS.get(tag_id, tag_id)
-                            
-                            if tag in ['XPTitle', 'XPComment']:
-                                if value:
-                                    # XPTitle/XPComment are stored as bytes, need to decode
-                                    if isinstance(value, bytes):
-                                        try:
-                                            decoded = value.decode('utf-16le').rstrip('\x00').strip()
-                                            if decoded:
-                                                info['exif_image_title'] = decoded
-                                                break
-                                        except:
-                                            pass
+                
+                # Extract GPS data
+                gps_data = exif_data.get(_TAG_GPS_INFO)
+                if isinstance(gps_data, dict):
+                    # Extract GPS Date and Time stamps
+                    if _GPS_DATE_STAMP in gps_data:
+                        info['exif_gps_datestamp'] = str(gps_data[_GPS_DATE_STAMP]).strip()
                     
-                    # Extract GPS data
-                    for tag_id, value in exif_data.items():
-                        tag = TAGS.get(tag_id, tag_id)
-                        
-                        if tag == 'GPSInfo':
-                            gps_data = {}
-                            for gps_tag_id in value:
-                                gps_tag = GPSTAGS.get(gps_tag_id, gps_tag_id)
-                                gps_data[gps_tag] = value[gps_tag_id]
-                            
-                            # Extract GPS Date and Time stamps
-                            if 'GPSDateStamp' in gps_data:
-                                info['exif_gps_datestamp'] = str(gps_data['GPSDateStamp']).strip()
-                            
-                            if 'GPSTimeStamp' in gps_data:
-                                try:
-                                    # GPSTimeStamp is typically a tuple of (hours, minutes, seconds)
-                                    time_tuple = gps_data['GPSTimeStamp']
-                                    if isinstance(time_tuple, (list, tuple)) and len(time_tuple) >= 3:
-                                        # PIL can return either:
-                                        # 1. Floats already converted: (8.0, 34.0, 24.0)
-                                        # 2. IFDRational objects: need different handling
-                                        # 3. Tuples of (numerator, denominator): ((8, 1), (34, 1), (24, 1))
-                                        
-                                        # Try as direct numeric values first
-                                        try:
-                                            hours = int(float(time_tuple[0]))
-                                            minutes = int(float(time_tuple[1]))
-                                            seconds = int(float(time_tuple[2]))
-                                        except (TypeError, AttributeError):
-                                            # If that fails, try as rational tuples
-                                            hours = int(time_tuple[0][0] / time_tuple[0][1])
-                                            minutes = int(time_tuple[1][0] / time_tuple[1][1])
-                                            seconds = int(time_tuple[2][0] / time_tuple[2][1])
-                                        
-                                        info['exif_gps_timestamp'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-                                except:
-                                    pass
-                            
-                            # Convert GPS coordinates
-                            lat = self._get_decimal_coordinates(
-                                gps_data.get('GPSLatitude'),
-                                gps_data.get('GPSLatitudeRef')
-                            )
-                            lon = self._get_decimal_coordinates(
-                                gps_data.get('GPSLongitude'),
-                                gps_data.get('GPSLongitudeRef')
-                            )
-                            
-                            if lat is not None:
-                                info['exif_latitude'] = lat
-                            if lon is not None:
-                                info['exif_longitude'] = lon
-                            
-                            # Extract altitude
-                            if 'GPSAltitude' in gps_data:
+                    if _GPS_TIME_STAMP in gps_data:
+                        try:
+                            # GPSTimeStamp is typically a tuple of (hours, minutes, seconds)
+                            time_tuple = gps_data[_GPS_TIME_STAMP]
+                            if isinstance(time_tuple, (list, tuple)) and len(time_tuple) >= 3:
+                                # PIL can return either:
+                                # 1. Floats already converted: (8.0, 34.0, 24.0)
+                                # 2. IFDRational objects: need different handling
+                                # 3. Tuples of (numerator, denominator): ((8, 1), (34, 1), (24, 1))
+                                
+                                # Try as direct numeric values first
                                 try:
-                                    altitude = float(gps_data['GPSAltitude'])
-                                    # GPSAltitudeRef: 0 = above sea level, 1 = below sea level
-                                    if gps_data.get('GPSAltitudeRef', 0) == 1:
-                                        altitude = -altitude
-                                    info['exif_altitude'] = altitude
-                                except:
-                                    pass
+                                    hours = int(float(time_tuple[0]))
+                                    minutes = int(float(time_tuple[1]))
+                                    seconds = int(float(time_tuple[2]))
+                                except (TypeError, AttributeError):
+                                    # If that fails, try as rational tuples
+                                    hours = int(time_tuple[0][0] / time_tuple[0][1])
+                                    minutes = int(time_tuple[1][0] / time_tuple[1][1])
+                                    seconds = int(time_tuple[2][0] / time_tuple[2][1])
+                                
+                                info['exif_gps_timestamp'] = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+                        except:
+                            pass
+                    
+                    # Convert GPS coordinates
+                    lat = PhotoManager._get_decimal_coordinates(
+                        gps_data.get(_GPS_LATITUDE),
+                        gps_data.get(_GPS_LATITUDE_REF)
+                    )
+                    lon = PhotoManager._get_decimal_coordinates(
+                        gps_data.get(_GPS_LONGITUDE),
+                        gps_data.get(_GPS_LONGITUDE_REF)
+                    )
                     
-                    # Extract IPTC location data using piexif
-                    try:
-                        exif_dict = piexif.load(str(file_path))
-                        if '0th' in exif_dict and piexif.ImageIFD.XPKeywords in exif_dict['0th']:
-                            # Check for IPTC data in tag 33723
+                    if lat is not None:
+                        info['exif_latitude'] = lat
+                    if lon is not None:
+                        info['exif_longitude'] = lon
+                    
+                    # Extract altitude
+                    if _GPS_ALTITUDE in gps_data:
+                        try:
+                            altitude = float(gps_data[_GPS_ALTITUDE])
+                            # GPSAltitudeRef: 0 = above sea level, 1 = below sea level
+                            if gps_data.get(_GPS_ALTITUDE_REF, 0) == 1:
+                                altitude = -altitude
+                            info['exif_altitude'] = altitude
+                        except:
                             pass
+                
+                # Extract IPTC location data
+                try:
+                    if iptc_data:
+                        # IPTC City: (2, 90)
+                        if (2, 90) in iptc_data:
+                            city = iptc_data[(2, 90)]
+                            info['exif_city'] = city.decode('utf-8', errors='ignore') if isinstance(city, bytes) else str(city)
                         
-                        # Try to get IPTC from XMP or other sources
-                        # piexif doesn't directly support IPTC, so we'll use PIL's built-in for now
-                        from PIL import IptcImagePlugin
-                        with open(file_path, 'rb') as f:
-                            iptc_data = IptcImagePlugin.getiptcinfo(img)
-                            if iptc_data:
-                                # IPTC City: (2, 90)
-                                if (2, 90) in iptc_data:
-                                    city = iptc_data[(2, 90)]
-                                    info['exif_city'] = city.decode('utf-8', errors='ignore') if isinstance(city, bytes) else str(city)
-                                
-                                # IPTC Sub-location: (2, 92)
-                                if (2, 92) in iptc_data:
-                                    subloc = iptc_data[(2, 92)]
-                                    info['exif_sublocation'] = subloc.decode('utf-8', errors='ignore') if isinstance(subloc, bytes) else str(subloc)
-                                
-                                # IPTC Province/State: (2, 95)
-                                if (2, 95) in iptc_data:
-                                    state = iptc_data[(2, 95)]
-                                    info['exif_state'] = state.decode('utf-8', errors='ignore') if isinstance(state, bytes) else str(state)
-                                
-                                # IPTC Country: (2, 101)
-                                if (2, 101) in iptc_data:
-                                    country = iptc_data[(2, 101)]
-                                    info['exif_country'] = country.decode('utf-8', errors='ignore') if isinstance(country, bytes) else str(country)
-                                
-                                # IPTC Keywords: (2, 25)
-                                if (2, 25) in iptc_data:
-                                    keywords = iptc_data[(2, 25)]
-                                    if isinstance(keywords, bytes):
-                                        info['exif_keywords'] = keywords.decode('utf-8', errors='ignore')
-                                    elif isinstance(keywords, list):
-                                        # Keywords can be multiple values
-                                        decoded_keywords = []
-                                        for kw in keywords:
-                                            if isinstance(kw, bytes):
-                                                decoded_keywords.append(kw.decode('utf-8', errors='ignore'))
-                                            else:
-                                                decoded_keywords.append(str(kw))
-                                        info['exif_keywords'] = ', '.join(decoded_keywords)
-                                    else:
-                                        info['exif_keywords'] = str(keywords)
-                    except:
-                        pass  # IPTC data not available or error reading it
+                        # IPTC Sub-location: (2, 92)
+                        if (2, 92) in iptc_data:
+                            subloc = iptc_data[(2, 92)]
+                            info['exif_sublocation'] = subloc.decode('utf-8', errors='ignore') if isinstance(subloc, bytes) else str(subloc)
+                        
+                        # IPTC Province/State: (2, 95)
+                        if (2, 95) in iptc_data:
+                            state = iptc_data[(2, 95)]
+                            info['exif_state'] = state.decode('utf-8', errors='ignore') if isinstance(state, bytes) else str(state)
                         
+                        # IPTC Country: (2, 101)
+                        if (2, 101) in iptc_data:
+                            country = iptc_data[(2, 101)]
+                            info['exif_country'] = country.decode('utf-8', errors='ignore') if isinstance(country, bytes) else str(country)
+                        
+                        # IPTC Keywords: (2, 25)
+                        if (2, 25) in iptc_data:
+                            keywords = iptc_data[(2, 25)]
+                            if isinstance(keywords, bytes):
+                                info['exif_keywords'] = keywords.decode('utf-8', errors='ignore')
+                            elif isinstance(keywords, list):
+                                # Keywords can be multiple values
+                                decoded_keywords = []
+                                for kw in keywords:
+                                    if isinstance(kw, bytes):
+                                        decoded_keywords.append(kw.decode('utf-8', errors='ignore'))
+                                    else:
+                                        decoded_keywords.append(str(kw))
+                                info['exif_keywords'] = ', '.join(decoded_keywords)
+                            else:
+                                info['exif_keywords'] = str(keywords)
+                except:
+                    pass  # IPTC data not available or error reading it
+                    
         except Exception as e:
             print(f"Error reading EXIF from {file_path}: {e}")
         
@@ -271,43 +491,220 @@ class PhotoManager:
         info['final_longitude'] = info['exif_longitude']
         info['final_altitude'] = info['exif_altitude']
         
-        # Generate new filename based on current format
-        info['new_name'] = self._generate_new_filename_from_info(info)
-        
         return info
     
-    def _get_decimal_coordinates(self, coords, ref):
+    @staticmethod
+    def _parse_exif_datetime(value) -> Optional[datetime]:
+        """
+        Parse an EXIF 'YYYY:MM:DD HH:MM:SS' value (None if it is not a valid date)
+        
+        The usual zero-padded form is parsed by slicing, which is much faster
+        than strptime; anything else (e.g. unpadded '2024:1:5 1:02:03') falls
+        back to strptime, so the same values are accepted.
+        """
+        if not isinstance(value, str):
+            return None
+        
+        if (len(value) == 19 and value[10] == ' '
+                and value[4] == value[7] == value[13] == value[16] == ':'):
+            fields = (value[0:4], value[5:7], value[8:10], value[11:13], value[14:16], value[17:19])
+            if ''.join(fields).isdigit():
+                try:
+                    return datetime(*map(int, fields))
+                except ValueError:
+                    # Out of range, e.g. the all-zero date some cameras write
+                    return None
+        
+        try:
+            return datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _read_jpeg_metadata(file_path: Path) -> Optional[tuple]:
+        """
+        Read EXIF and IPTC data from the header segments of a JPEG file
+        
+        The file is memory-mapped and only the APPn segments before the image
+        data (within the first JPEG_HEAD_BYTES) are touched; no image decoder
+        is created.
+        
+        Args:
+            file_path: Path to the photo
+        
+        Returns:
+            (exif_data, iptc_data) like PIL's _getexif() and getiptcinfo()
+            (either may be None), or None if the file is not a JPEG or its
+            segments extend past the first JPEG_HEAD_BYTES
+        """
+        try:
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as head:
+                # Only the pages holding the segments walked below are faulted in
+                limit = min(len(head), JPEG_HEAD_BYTES)
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    head.madvise(mmap.MADV_SEQUENTIAL, 0, limit)
+                segments = PhotoManager._find_jpeg_segments(head, limit)
+        except (OSError, ValueError):
+            # Empty files and file systems without mmap support go through PIL
+            return None
+        
+        if segments is None:
+            return None
+        exif_block, iptc_block = segments
+        
+        exif_data = None
+        if exif_block:
+            exif = Image.Exif()
+            exif.load(exif_block)
+            exif_data = exif._get_merged_dict()
+        
+        iptc_data = PhotoManager._parse_iptc(iptc_block) if iptc_block is not None else None
+        return exif_data, iptc_data
+    
+    @staticmethod
+    def _find_jpeg_segments(head, limit: int) -> Optional[tuple]:
+        """
+        Walk the JPEG markers in head[:limit] and copy out the metadata segments
+        
+        Returns:
+            (exif_block, iptc_block) (either may be None), or None if head is not
+            a JPEG or its segments extend past limit
+        """
+        if head[:2] != b'\xff\xd8':
+            return None
+        
+        exif_block = None
+        iptc_block = None
+        offset = 2
+        while True:
+            if offset + 4 > limit or head[offset] != 0xFF:
+                return None
+            marker = head[offset + 1]
+            if marker == 0xFF:
+                # Fill byte before a marker
+                offset += 1
+                continue
+            if marker in (0xDA, 0xD9):
+                # Start of scan / end of image: no metadata follows
+                break
+            
+            end = offset + 2 + struct.unpack_from('>H', head, offset + 2)[0]
+            if end > limit:
+                return None
+            
+            if marker == 0xE1 and head[offset + 4:offset + 10] == b'Exif\x00\x00':
+                segment = head[offset + 10:end]
+                exif_block = segment if exif_block is None else exif_block + segment
+            elif marker == 0xED and head[offset + 4:offset + 18] == b'Photoshop 3.0\x00':
+                iptc_block = PhotoManager._find_photoshop_resource(head[offset + 4:end], 0x0404)
+            offset = end
+        
+        return exif_block, iptc_block
+    
+    @staticmethod
+    def _find_photoshop_resource(segment: bytes, code: int) -> Optional[bytes]:
+        """Return one resource block from a Photoshop APP13 segment"""
+        offset = 14  # Past 'Photoshop 3.0\0'
+        try:
+            while segment[offset:offset + 4] == b'8BIM':
+                resource_code, name_len = struct.unpack_from('>HB', segment, offset + 4)
+                offset += 7 + name_len
+                offset += offset & 1  # Pascal name is padded to even length
+                size = struct.unpack_from('>I', segment, offset)[0]
+                offset += 4
+                if resource_code == code:
+                    return segment[offset:offset + size]
+                offset += size + (size & 1)
+        except struct.error:
+            pass  # Truncated resource block
+        return None
+    
+    @staticmethod
+    def _parse_iptc(data: bytes) -> Optional[Dict]:
+        """
+        Parse an IPTC-NAA block into {(record, dataset): value}
+        
+        Repeated datasets (such as keywords) become lists, as in PIL.
+        
+        Returns:
+            IPTC dictionary or None if the block is malformed
+        """
+        iptc_data = {}
+        offset = 0
+        while offset + 5 <= len(data):
+            header = data[offset:offset + 5]
+            if not header.strip(b'\x00'):
+                break
+            tag = (header[1], header[2])
+            if header[0] != 0x1C or tag[0] not in (1, 2, 3, 4, 5, 6, 7, 8, 9, 240):
+                return None
+            if tag == (8, 10):
+                break
+            
+            offset += 5
+            size = header[3]
+            if size > 132:
+                return None
+            elif size == 128:
+                size = 0
+            elif size > 128:
+                # Extended dataset: the length is stored in the next bytes
+                size = int.from_bytes(data[offset:offset + size - 128], 'big')
+                offset += header[3] - 128
+            else:
+                size = struct.unpack_from('>H', header, 3)[0]
+            
+            value = data[offset:offset + size] if size else None
+            offset += size
+            if tag in iptc_data:
+                if isinstance(iptc_data[tag], list):
+                    iptc_data[tag].append(value)
+                else:
+                    iptc_data[tag] = [iptc_data[tag], value]
+            else:
+                iptc_data[tag] = value
+        return iptc_data
+    
+    @staticmethod
+    def _get_iptc_info(img) -> Optional[Dict]:
+        """Read IPTC data through PIL, returning None on malformed blocks"""
+        try:
+            return IptcImagePlugin.getiptcinfo(img)
+        except Exception:
+            return None
+    
+    @staticmethod
+    def _get_decimal_coordinates(coords, ref):
         """Convert GPS coordinates to decimal format"""
         if coords is None or ref is None:
             return None
         
         try:
             # Handle Fraction objects (common on Mac) by converting to float
-            degrees = float(coords[0])
-            minutes = float(coords[1])
-            seconds = float(coords[2])
-            
-            decimal = degrees + minutes / 60 + seconds / 3600
-            if ref in ['S', 'W']:
-                decimal = -decimal
-            return decimal
+            return _HEMISPHERE_SIGN.get(ref, 1.0) * (
+                float(coords[0]) + float(coords[1]) / 60 + float(coords[2]) / 3600
+            )
         except Exception as e:
             print(f"Error converting GPS coordinates: {e}")
             return None
     
     def get_photos(self, filter_type: str = "all") -> pd.DataFrame:
-        """Get photos with optional filtering, maintaining current sort order"""
+        """
+        Get photos with optional filtering, maintaining current sort order
+        
+        No copy is made: 'all' returns pd_photo_info itself and the filters
+        return a new frame selected by a boolean mask. Callers must not modify
+        the result.
+        """
         if self.pd_photo_info is None or self.pd_photo_info.empty:
             return pd.DataFrame()
         
-        df = self.pd_photo_info.copy()
-        
         if filter_type == "tagged":
-            df = df[df['tagged'] == True]
+            return self.pd_photo_info[self._tagged_mask()]
         elif filter_type == "untagged":
-            df = df[df['tagged'] == False]
+            return self.pd_photo_info[~self._tagged_mask()]
         
-        return df
+        return self.pd_photo_info
     
     def get_photo_by_index(self, index: int) -> Dict[str, Any]:
         """Get a specific photo by index"""
@@ -392,9 +789,15 @@ class PhotoManager:
         if self.pd_photo_info is None:
             raise ValueError("No photos loaded")
         
-        for index in indices:
-            if index < len(self.pd_photo_info):
-                self.pd_photo_info.at[index, 'tagged'] = tagged
+        # One masked write for all valid indices
+        rows = np.zeros(len(self.pd_photo_info), dtype=bool)
+        indices = np.asarray(indices, dtype=np.int64)
+        rows[indices[(indices >= 0) & (indices < len(rows))]] = True
+        self.pd_photo_info.loc[rows, 'tagged'] = tagged
+    
+    def _tagged_mask(self) -> np.ndarray:
+        """Boolean array of the tagged photos"""
+        return self.pd_photo_info['tagged'].to_numpy().astype(bool)
     
     def apply_filename_format(self, format_str: str) -> int:
         """Alias for apply_rename_format - for test compatibility"""
@@ -403,8 +806,6 @@ class PhotoManager:
     def set_sort_order(self, sort_by: str):
         """Set the sort order and re-sort the DataFrame"""
         self.sort_by = sort_by
-        # Clear thumbnail cache since indices will change after sorting
-        self.thumbnail_cache.clear()
         self._apply_sort()
     
     def _apply_sort(self):
@@ -412,50 +813,201 @@ class PhotoManager:
         if self.pd_photo_info is None or self.pd_photo_info.empty:
             return
         
+        df = self.pd_photo_info
         if self.sort_by == "name":
-            self.pd_photo_info = self.pd_photo_info.sort_values('filename').reset_index(drop=True)
+            order = np.argsort(df['filename'].to_numpy(), kind='stable')
         else:  # time
-            self.pd_photo_info = self.pd_photo_info.sort_values(
-                ['exif_capture_time', 'creation_time']
-            ).reset_index(drop=True)
+            # lexsort sorts by its last key first (and is stable)
+            order = np.lexsort((self._time_sort_key(df['creation_time']),
+                                self._time_sort_key(df['exif_capture_time'])))
+        
+        # Already in order with a default index: keep the frame as it is
+        if df.index.equals(pd.RangeIndex(len(df))) and (order == np.arange(len(order))).all():
+            return
+        
+        sorted_df = df.take(order)
+        sorted_df.index = pd.RangeIndex(len(sorted_df))
+        self.pd_photo_info = sorted_df
+    
+    @staticmethod
+    def _time_sort_key(column: pd.Series) -> np.ndarray:
+        """int64 nanoseconds of a time column, with missing times sorting last"""
+        key = pd.DatetimeIndex(column).asi8.copy()
+        key[key == np.iinfo(np.int64).min] = np.iinfo(np.int64).max
+        return key
     
     def get_thumbnail(self, index: int, size: int = 200) -> str:
-        """Generate or retrieve cached thumbnail"""
-        cache_key = f"{index}_{size}"
-        
-        if cache_key in self.thumbnail_cache:
-            return self.thumbnail_cache[cache_key]
+        """
+        Generate or retrieve cached thumbnail
         
+        Thumbnails are keyed by the file's path, size and mtime rather than its
+        row index, so they survive re-sorting and rescans. Their files are
+        named after this instance's namespace and the key.
+        """
         photo = self.get_photo_by_index(index)
         img_path = Path(photo['full_path'])
         
-        if not img_path.exists():
+        # One stat both checks the file exists and keys the cache
+        try:
+            cache_key = self._thumbnail_key(img_path, size)
+        except FileNotFoundError:
             raise ValueError(f"Image file not found: {img_path}")
+        with self._thumbnail_lock:
+            if cache_key in self.thumbnail_cache:
+                self.thumbnail_cache.move_to_end(cache_key)
+                return self.thumbnail_cache[cache_key]
+        
+        thumb_path = THUMBNAIL_DIR / f"{self._thumbnail_namespace}_{cache_key}.jpg"
+        if not thumb_path.exists():
+            try:
+                # Create thumbnail
+                with Image.open(img_path) as img:
+                    if self._is_thumbnail_sized(img, size):
+                        # Already small enough and displayable as is: serve the photo itself
+                        thumb_path = img_path
+                    else:
+                        self._prepare_thumbnail_dir()
+                        self._save_thumbnail(img, thumb_path, size)
+            except Exception as e:
+                print(f"Error creating thumbnail for {img_path}: {e}")
+                raise ValueError(f"Failed to create thumbnail: {str(e)}")
+        
+        evicted = []
+        with self._thumbnail_lock:
+            self.thumbnail_cache[cache_key] = str(thumb_path)
+            while len(self.thumbnail_cache) > THUMBNAIL_CACHE_MAX_ENTRIES:
+                evicted.append(Path(self.thumbnail_cache.popitem(last=False)[1]))
+        
+        # Drop evicted thumbnail files so the thumbnail folder stays bounded too
+        # (only this cache's own files; photos served as their own thumbnail are kept)
+        for path in evicted:
+            if path.parent == THUMBNAIL_DIR and path.name.startswith(f"{self._thumbnail_namespace}_"):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError as e:
+                    print(f"Warning: Could not remove thumbnail {path}: {e}")
+        return str(thumb_path)
+    
+    @staticmethod
+    def _is_thumbnail_sized(img: Image.Image, size: int) -> bool:
+        """Whether a photo can be served as its own thumbnail (fits, browser format, upright)"""
+        return (max(img.size) <= size and img.format in ('JPEG', 'PNG') and img.mode in ('RGB', 'L')
+                and img.getexif().get(_TAG_ORIENTATION, 1) == 1)
+    
+    @staticmethod
+    def _save_thumbnail(img: Image.Image, thumb_path: Path, size: int):
+        """Resize an opened photo and save it as a JPEG thumbnail at thumb_path"""
+        # Let the JPEG decoder scale down by 1/2, 1/4 or 1/8 while
+        # keeping at least twice the thumbnail size (no-op for other formats)
+        img.draft('RGB', (size * 2, size * 2))
+        
+        # Apply EXIF orientation before creating thumbnail
+        img = ImageOps.exif_transpose(img)
+        
+        # Convert to RGB if necessary (handles PNG, RGBA, etc.)
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+        
+        if size <= THUMBNAIL_BILINEAR_MAX_SIZE:
+            resample = Image.Resampling.BILINEAR
+        else:
+            resample = Image.Resampling.LANCZOS
+        img.thumbnail((size, size), resample)
         
+        # Save under a temporary name so a partial file is never served
+        temp_path = thumb_path.with_name(f"{thumb_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        img.save(temp_path, "JPEG", quality=85)
+        os.replace(temp_path, thumb_path)
+    
+    def _prepare_thumbnail_dir(self):
+        """
+        Create THUMBNAIL_DIR on first use and prune thumbnails left by earlier runs
+        
+        Files are named '<pid>-<token>_<key>'; those of processes that are no
+        longer running (and unnamespaced files from older versions) are
+        removed, so the folder only holds the live caches' LRU entries.
+        """
+        with self._thumbnail_lock:
+            if self._thumbnail_dir_ready:
+                return
+            self._thumbnail_dir_ready = True
+            
+            THUMBNAIL_DIR.mkdir(exist_ok=True)
+            alive = {}
+            for path in THUMBNAIL_DIR.iterdir():
+                owner = path.name.split('-', 1)[0]
+                if owner.isdigit():
+                    pid = int(owner)
+                    if pid not in alive:
+                        alive[pid] = self._process_alive(pid)
+                    if alive[pid]:
+                        continue
+                try:
+                    path.unlink()
+                except OSError as e:
+                    print(f"Warning: Could not remove stale thumbnail {path}: {e}")
+    
+    @staticmethod
+    def _process_alive(pid: int) -> bool:
+        """Whether a process is running (unknown answers count as running)"""
+        if pid == os.getpid():
+            return True
+        if os.name == 'nt':
+            # os.kill would terminate the process on Windows; ask for a handle instead
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+            if handle:
+                kernel32.CloseHandle(handle)
+                return True
+            return kernel32.GetLastError() == 5  # ERROR_ACCESS_DENIED: exists but not ours
         try:
-            # Create thumbnail
-            with Image.open(img_path) as img:
-                # Apply EXIF orientation before creating thumbnail
-                img = ImageOps.exif_transpose(img)
-                
-                # Convert to RGB if necessary (handles PNG, RGBA, etc.)
-                if img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
-                
-                img.thumbnail((size, size), Image.Resampling.LANCZOS)
-                
-                # Save to temp file
-                temp_dir = Path(tempfile.gettempdir()) / "geotag_thumbs"
-                temp_dir.mkdir(exist_ok=True)
-                
-                thumb_path = temp_dir / f"{cache_key}_{img_path.stem}.jpg"
-                img.save(thumb_path, "JPEG", quality=85)
-                
-                self.thumbnail_cache[cache_key] = str(thumb_path)
-                return str(thumb_path)
-        except Exception as e:
-            print(f"Error creating thumbnail for {img_path}: {e}")
-            raise ValueError(f"Failed to create thumbnail: {str(e)}")
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            return True
+        return True
+    
+    @staticmethod
+    def _thumbnail_key(img_path: Path, size: int) -> str:
+        """Thumbnail cache key from the photo's path, size and mtime and the thumbnail size"""
+        stat = img_path.stat()
+        return hashlib.blake2b(
+            f"{img_path}|{stat.st_size}|{stat.st_mtime_ns}|{size}".encode('utf-8'), digest_size=12
+        ).hexdigest()
+    
+    def prefetch_thumbnails(self, indices: Iterable[int], size: int = 200) -> List[Future]:
+        """
+        Generate thumbnails in the background so later get_thumbnail calls are cache hits
+        
+        Args:
+            indices: Photo indices, e.g. the visible range of the grid
+            size: Thumbnail size in pixels
+        
+        Returns:
+            Futures of the thumbnails submitted (already cached ones are skipped)
+        """
+        if self.pd_photo_info is None:
+            return []
+        
+        futures = []
+        for index in indices:
+            if not 0 <= index < len(self.pd_photo_info):
+                continue
+            try:
+                cache_key = self._thumbnail_key(Path(self.pd_photo_info['full_path'].iloc[index]), size)
+            except OSError:
+                continue
+            with self._thumbnail_lock:
+                if cache_key in self.thumbnail_cache:
+                    continue
+                if self._thumbnail_pool is None:
+                    self._thumbnail_pool = ThreadPoolExecutor(max_workers=os.cpu_count(),
+                                                              thread_name_prefix="thumbnail")
+                pool = self._thumbnail_pool
+            futures.append(pool.submit(self.get_thumbnail, index, size))
+        return futures
     
     def match_all_photos_with_gpx(self, gpx_manager):
         """Match all photos with GPX data and update DataFrame"""
@@ -465,44 +1017,54 @@ class PhotoManager:
         if not gpx_manager.has_data():
             return
         
-        for index in range(len(self.pd_photo_info)):
-            capture_time = self.pd_photo_info.at[index, 'exif_capture_time']
-            
-            # Only try to match if photo has capture time and doesn't have manual position
-            if capture_time is not None and pd.notna(capture_time):
-                closest_point = gpx_manager.find_closest_point(capture_time)
-                
-                if closest_point:
-                    self.pd_photo_info.at[index, 'gpx_latitude'] = closest_point['latitude']
-                    self.pd_photo_info.at[index, 'gpx_longitude'] = closest_point['longitude']
-                    self.pd_photo_info.at[index, 'gpx_altitude'] = closest_point.get('elevation')
-                    
-                    # Update final coordinates if no manual position exists
-                    manual_lat = self.pd_photo_info.at[index, 'manual_latitude']
-                    if manual_lat == -360.0:
-                        # Priority: manual > gpx > exif
-                        self.pd_photo_info.at[index, 'final_latitude'] = closest_point['latitude']
-                        self.pd_photo_info.at[index, 'final_longitude'] = closest_point['longitude']
-                        self.pd_photo_info.at[index, 'final_altitude'] = closest_point.get('elevation')
-                else:
-                    # Clear GPX coordinates if no match found
-                    self.pd_photo_info.at[index, 'gpx_latitude'] = -360.0
-                    self.pd_photo_info.at[index, 'gpx_longitude'] = -360.0
-                    self.pd_photo_info.at[index, 'gpx_altitude'] = None
-                    
-                    # Update final coordinates if no manual position
-                    manual_lat = self.pd_photo_info.at[index, 'manual_latitude']
-                    if manual_lat == -360.0:
-                        # Fall back to EXIF
-                        exif_lat = self.pd_photo_info.at[index, 'exif_latitude']
-                        if exif_lat != -360.0:
-                            self.pd_photo_info.at[index, 'final_latitude'] = exif_lat
-                            self.pd_photo_info.at[index, 'final_longitude'] = self.pd_photo_info.at[index, 'exif_longitude']
-                            self.pd_photo_info.at[index, 'final_altitude'] = self.pd_photo_info.at[index, 'exif_altitude']
-                        else:
-                            self.pd_photo_info.at[index, 'final_latitude'] = -360.0
-                            self.pd_photo_info.at[index, 'final_longitude'] = -360.0
-                            self.pd_photo_info.at[index, 'final_altitude'] = None
+        # Match every capture time in one batched search over the GPX points
+        df = self.pd_photo_info
+        latitudes, longitudes, elevations, _ = gpx_manager.find_closest_points(df['exif_capture_time'])
+        
+        # Only photos with a capture time are matched; unmatched ones get the -360 sentinel
+        has_time = df['exif_capture_time'].notna().to_numpy()
+        found = ~np.isnan(latitudes)
+        self._set_column_rows('gpx_latitude', has_time, np.where(found, latitudes, -360.0))
+        self._set_column_rows('gpx_longitude', has_time, np.where(found, longitudes, -360.0))
+        self._set_column_rows('gpx_altitude', has_time, np.where(found, elevations, np.nan))
+        
+        self._resolve_final_coords(has_time)
+    
+    def _resolve_final_coords(self, rows: np.ndarray):
+        """
+        Recompute final coordinates with priority manual > gpx > exif
+        
+        Args:
+            rows: Boolean mask of the photos to update
+        """
+        has_manual = self._float_column('manual_latitude') != -360.0
+        has_gpx = (self._float_column('gpx_latitude') != -360.0) & (self._float_column('gpx_longitude') != -360.0)
+        has_exif = self._float_column('exif_latitude') != -360.0
+        
+        for axis, missing in (('latitude', -360.0), ('longitude', -360.0), ('altitude', np.nan)):
+            final = np.where(has_manual, self._float_column(f'manual_{axis}'),
+                             np.where(has_gpx, self._float_column(f'gpx_{axis}'),
+                                      np.where(has_exif, self._float_column(f'exif_{axis}'), missing)))
+            self._set_column_rows(f'final_{axis}', rows, final)
+    
+    def _float_column(self, column: str) -> np.ndarray:
+        """Return a photo column as a float64 array, with None as NaN"""
+        return self.pd_photo_info[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    
+    def _set_column_rows(self, column: str, rows: np.ndarray, values: np.ndarray):
+        """
+        Write values into the masked rows of a photo column in one assignment
+        
+        Args:
+            column: Column name
+            rows: Boolean mask of the rows to update
+            values: Float values for every row; NaN is stored as None in object columns
+        """
+        current = self.pd_photo_info[column].to_numpy(copy=True)
+        if current.dtype == object:
+            values = np.where(np.isnan(values), None, values)
+        current[rows] = values[rows]
+        self.pd_photo_info[column] = current
     
     def match_single_photo_with_gpx(self, index: int, gpx_manager, use_new_time: bool = True):
         """
@@ -593,9 +1155,7 @@ class PhotoManager:
         # Update the stored format
         self.filename_format = format_str
         
-        for index in range(len(self.pd_photo_info)):
-            new_name = self._generate_new_filename(index, format_str)
-            self.pd_photo_info.at[index, 'new_name'] = new_name
+        self.pd_photo_info['new_name'] = self._generate_new_filenames(format_str)
         
         # Deduplicate filenames to avoid conflicts
         self._deduplicate_filenames()
@@ -610,16 +1170,8 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        for index in range(len(self.pd_photo_info)):
-            self.pd_photo_info.at[index, 'new_title'] = title
-            # Regenerate filename if format includes {title}
-            if '{title}' in self.filename_format:
-                new_name = self._generate_new_filename(index, self.filename_format)
-                self.pd_photo_info.at[index, 'new_name'] = new_name
-        
-        # Deduplicate filenames if format includes {title}
-        if '{title}' in self.filename_format:
-            self._deduplicate_filenames()
+        self.pd_photo_info['new_title'] = title
+        self._regenerate_title_names()
         
         return len(self.pd_photo_info)
     
@@ -631,21 +1183,11 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        count = 0
-        for index in range(len(self.pd_photo_info)):
-            if self.pd_photo_info.at[index, 'tagged']:
-                self.pd_photo_info.at[index, 'new_title'] = title
-                # Regenerate filename if format includes {title}
-                if '{title}' in self.filename_format:
-                    new_name = self._generate_new_filename(index, self.filename_format)
-                    self.pd_photo_info.at[index, 'new_name'] = new_name
-                count += 1
+        tagged = self._tagged_mask()
+        self.pd_photo_info.loc[tagged, 'new_title'] = title
+        self._regenerate_title_names(tagged)
         
-        # Deduplicate filenames if format includes {title}
-        if '{title}' in self.filename_format:
-            self._deduplicate_filenames()
-        
-        return count
+        return int(tagged.sum())
     
     def clear_photo_titles(self) -> int:
         """
@@ -655,19 +1197,28 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        for index in range(len(self.pd_photo_info)):
-            self.pd_photo_info.at[index, 'new_title'] = None
-            # Regenerate filename if format includes {title}
-            if '{title}' in self.filename_format:
-                new_name = self._generate_new_filename(index, self.filename_format)
-                self.pd_photo_info.at[index, 'new_name'] = new_name
-        
-        # Deduplicate filenames if format includes {title}
-        if '{title}' in self.filename_format:
-            self._deduplicate_filenames()
+        self.pd_photo_info['new_title'] = None
+        self._regenerate_title_names()
         
         return len(self.pd_photo_info)
     
+    def _regenerate_title_names(self, rows: Optional[np.ndarray] = None):
+        """
+        Regenerate new_name if the filename format includes {title}
+        
+        Args:
+            rows: Boolean mask of the photos to rename (all photos if None)
+        """
+        if '{title}' not in self.filename_format:
+            return
+        
+        if rows is None:
+            rows = np.ones(len(self.pd_photo_info), dtype=bool)
+        self.pd_photo_info.loc[rows, 'new_name'] = self._generate_new_filenames(self.filename_format, rows)
+        
+        # Deduplicate filenames to avoid conflicts
+        self._deduplicate_filenames()
+    
     def apply_photo_keywords(self, keywords: str) -> int:
         """
         Apply keywords to all photos (updates new_keywords column)
@@ -676,8 +1227,7 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        for index in range(len(self.pd_photo_info)):
-            self.pd_photo_info.at[index, 'new_keywords'] = keywords
+        self.pd_photo_info['new_keywords'] = keywords
         
         return len(self.pd_photo_info)
     
@@ -689,13 +1239,10 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        count = 0
-        for index in range(len(self.pd_photo_info)):
-            if self.pd_photo_info.at[index, 'tagged']:
-                self.pd_photo_info.at[index, 'new_keywords'] = keywords
-                count += 1
+        tagged = self._tagged_mask()
+        self.pd_photo_info.loc[tagged, 'new_keywords'] = keywords
         
-        return count
+        return int(tagged.sum())
     
     def clear_photo_keywords(self) -> int:
         """
@@ -705,8 +1252,7 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        for index in range(len(self.pd_photo_info)):
-            self.pd_photo_info.at[index, 'new_keywords'] = ""
+        self.pd_photo_info['new_keywords'] = ""
         
         return len(self.pd_photo_info)
     
@@ -1012,7 +1558,7 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return 0
         
-        count = 0
+        indices = []
         for index in range(len(self.pd_photo_info)):
             # Apply filtering based on mode
             if mode == 'tagged' and not self.pd_photo_info.at[index, 'tagged']:
@@ -1023,8 +1569,25 @@ class PhotoManager:
             lon = self.pd_photo_info.at[index, 'final_longitude']
             
             if lat != -360.0 and lon != -360.0:
-                if self.retrieve_location_for_photo(index, geocoding_service):
-                    count += 1
+                indices.append(index)
+        
+        if not indices:
+            return 0
+        
+        # Look up all coordinates in one batch (deduplicated, concurrent where allowed)
+        coords = [(self.pd_photo_info.at[index, 'final_latitude'],
+                   self.pd_photo_info.at[index, 'final_longitude']) for index in indices]
+        locations = geocoding_service.reverse_geocode_batch(coords)
+        
+        count = 0
+        for index, location in zip(indices, locations):
+            if location:
+                # Update new_* location fields with retrieved data
+                self.pd_photo_info.at[index, 'new_city'] = location.get('city')
+                self.pd_photo_info.at[index, 'new_sublocation'] = location.get('sublocation')
+                self.pd_photo_info.at[index, 'new_state'] = location.get('state')
+                self.pd_photo_info.at[index, 'new_country'] = location.get('country')
+                count += 1
         
         return count
     
@@ -1117,33 +1680,29 @@ class PhotoManager:
         if self.pd_photo_info is None or len(self.pd_photo_info) == 0:
             return
         
-        # Create a temporary column with lowercase names for grouping
-        self.pd_photo_info['_temp_lower_name'] = self.pd_photo_info['new_name'].str.lower()
-        
-        # Group by lowercase name to find duplicates
-        name_groups = self.pd_photo_info.groupby('_temp_lower_name', sort=False)
-        
-        for lower_name, group in name_groups:
-            if len(group) > 1:
-                # Multiple photos have the same name (case-insensitive)
-                # Append _02, _03, _04, etc. to all but the first
-                for i, idx in enumerate(group.index):
-                    if i > 0:  # Skip the first one (keep original name)
-                        old_name = self.pd_photo_info.at[idx, 'new_name']
-                        # Split name and extension
-                        name_path = Path(old_name)
-                        base_name = name_path.stem
-                        extension = name_path.suffix
-                        
-                        # Append 2-digit number starting from _02 (_02, _03, etc.)
-                        new_name = f"{base_name}_{i+1:02d}{extension}"
-                        
-                        self.pd_photo_info.at[idx, 'new_name'] = new_name
-                        # Update the temporary lowercase column too
-                        self.pd_photo_info.at[idx, '_temp_lower_name'] = new_name.lower()
+        # Group case-insensitively equal names (missing names get code -1)
+        names = self.pd_photo_info['new_name']
+        codes, _ = pd.factorize(names.str.lower())
+        
+        # Rank each photo within its group, in row order: a stable sort puts
+        # every group in one run and the rank is the offset from the run start
+        order = np.argsort(codes, kind='stable')
+        positions = np.arange(len(codes))
+        sorted_codes = codes[order]
+        run_starts = np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]
+        rank = np.empty_like(positions)
+        rank[order] = positions - np.maximum.accumulate(np.where(run_starts, positions, 0))
+        
+        duplicates = np.flatnonzero((rank > 0) & (codes >= 0))
+        if len(duplicates) == 0:
+            return
         
-        # Remove the temporary column
-        self.pd_photo_info.drop(columns=['_temp_lower_name'], inplace=True)
+        # Append _02, _03, _04, etc. to all but the first of each group
+        new_names = names.to_numpy(copy=True)
+        for position in duplicates:
+            name_path = Path(new_names[position])
+            new_names[position] = f"{name_path.stem}_{rank[position] + 1:02d}{name_path.suffix}"
+        self.pd_photo_info['new_name'] = new_names
     
     def _sanitize_title_for_filename(self, title: str) -> str:
         """
@@ -1175,45 +1734,9 @@ class PhotoManager:
         Uses new_time if set, otherwise EXIF capture time, otherwise file creation time
         Supports {title} placeholder for photo title
         """
-        # Get the timestamp to use - prioritize new_time
-        capture_time = info.get('new_time')
-        
-        if capture_time is None or pd.isna(capture_time):
-            capture_time = info['exif_capture_time']
-        
-        if capture_time is None or pd.isna(capture_time):
-            # Fall back to creation time
-            capture_time = info['creation_time']
-        
-        # Get the original file extension
-        old_filename = info['filename']
-        extension = Path(old_filename).suffix
-        
-        # Format the timestamp according to the format string
-        try:
-            format_str = self.filename_format
-            
-            # Check if format contains {title} placeholder
-            if '{title}' in format_str:
-                # Get and sanitize title
-                title = info.get('new_title') if info.get('new_title') is not None else info.get('exif_image_title')
-                sanitized_title = self._sanitize_title_for_filename(title)
-                
-                if sanitized_title:
-                    # Replace {title} with sanitized title
-                    format_str = format_str.replace('{title}', sanitized_title)
-                else:
-                    # Remove {title} and any adjacent underscores/separators if no title
-                    format_str = format_str.replace('_{title}', '').replace('{title}_', '').replace('{title}', '')
-            
-            new_base_name = capture_time.strftime(format_str)
-            new_filename = f"{new_base_name}{extension}"
-        except Exception as e:
-            # If format is invalid, return original filename
-            print(f"Error formatting filename: {e}")
-            new_filename = old_filename
-        
-        return new_filename
+        capture_time = self._pick_capture_time(info.get('new_time'), info['exif_capture_time'], info['creation_time'])
+        title = info.get('new_title') if info.get('new_title') is not None else info.get('exif_image_title')
+        return self._format_filename(capture_time, title, info['filename'], self.filename_format)
     
     def _generate_new_filename(self, index: int, format_str: str) -> str:
         """
@@ -1221,29 +1744,61 @@ class PhotoManager:
         Uses new_time if set, otherwise EXIF capture time, otherwise file creation time
         Supports {title} placeholder for photo title
         """
-        # Get the timestamp to use - prioritize new_time
-        capture_time = self.pd_photo_info.at[index, 'new_time']
+        df = self.pd_photo_info
+        capture_time = self._pick_capture_time(df.at[index, 'new_time'], df.at[index, 'exif_capture_time'],
+                                               df.at[index, 'creation_time'])
+        title = df.at[index, 'new_title']
+        if title is None or pd.isna(title):
+            title = df.at[index, 'exif_image_title']
+        return self._format_filename(capture_time, title, df.at[index, 'filename'], format_str)
+    
+    def _generate_new_filenames(self, format_str: str, rows: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Generate new filenames for many photos at once (see _generate_new_filename)
         
-        if capture_time is None or pd.isna(capture_time):
-            capture_time = self.pd_photo_info.at[index, 'exif_capture_time']
+        Columns are read once as lists instead of with per-row lookups.
         
-        if capture_time is None or pd.isna(capture_time):
-            # Fall back to creation time
-            capture_time = self.pd_photo_info.at[index, 'creation_time']
+        Args:
+            format_str: Filename format string
+            rows: Boolean mask of the photos to name (all photos if None)
         
+        Returns:
+            New filenames of the selected photos, in row order
+        """
+        df = self.pd_photo_info if rows is None else self.pd_photo_info[rows]
+        columns = ['new_time', 'exif_capture_time', 'creation_time', 'new_title', 'exif_image_title', 'filename']
+        
+        names = []
+        for new_time, exif_time, creation_time, new_title, exif_title, filename in zip(
+                *(df[column].tolist() for column in columns)):
+            capture_time = self._pick_capture_time(new_time, exif_time, creation_time)
+            title = exif_title if new_title is None or pd.isna(new_title) else new_title
+            names.append(self._format_filename(capture_time, title, filename, format_str))
+        return names
+    
+    @staticmethod
+    def _pick_capture_time(new_time, exif_capture_time, creation_time):
+        """The time a photo is named after: new_time, else EXIF capture time, else file creation time"""
+        if new_time is not None and not pd.isna(new_time):
+            return new_time
+        if exif_capture_time is not None and not pd.isna(exif_capture_time):
+            return exif_capture_time
+        return creation_time
+    
+    def _format_filename(self, capture_time, title: Optional[str], old_filename: str, format_str: str) -> str:
+        """
+        Format a capture time and title into a filename keeping the original extension
+        
+        Returns:
+            New filename, or the original filename if the format is invalid
+        """
         # Get the original file extension
-        old_filename = self.pd_photo_info.at[index, 'filename']
         extension = Path(old_filename).suffix
         
         # Format the timestamp according to the format string
         try:
             # Check if format contains {title} placeholder
             if '{title}' in format_str:
-                # Get and sanitize title
-                title = self.pd_photo_info.at[index, 'new_title']
-                if title is None or pd.isna(title):
-                    title = self.pd_photo_info.at[index, 'exif_image_title']
-                
                 sanitized_title = self._sanitize_title_for_filename(title)
                 
                 if sanitized_title:
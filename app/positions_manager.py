@@ -4,6 +4,12 @@ Positions Manager - Handles predefined positions from YAML files
 import yaml
 from typing import Optional, Dict, Any, List
 
+# Use the libyaml C implementation when available (much faster than pure Python)
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
+
 
 class PositionsManager:
     def __init__(self):
@@ -12,7 +18,7 @@ class PositionsManager:
     def load_yaml(self, yaml_content: str, filename: str) -> Dict[str, Any]:
         """Load and parse a YAML file with predefined positions"""
         try:
-            data = yaml.safe_load(yaml_content)
+            data = yaml.load(yaml_content, Loader=_Loader)
             
             if not isinstance(data, list):
                 raise ValueError("YAML file must contain a list of positions")
@@ -26,21 +32,22 @@ class PositionsManager:
                 if 'name' not in item or 'latitude' not in item or 'longitude' not in item:
                     continue
                 
-                position = {
-                    'name': str(item['name']),
-                    'latitude': float(item['latitude']),
-                    'longitude': float(item['longitude']),
-                    'altitude': float(item['altitude']) if 'altitude' in item and item['altitude'] is not None else None,
-                    'source_file': filename
-                }
-                
                 # Validate coordinates
-                if position['latitude'] < -90 or position['latitude'] > 90:
+                latitude = float(item['latitude'])
+                longitude = float(item['longitude'])
+                if latitude < -90 or latitude > 90:
                     continue
-                if position['longitude'] < -180 or position['longitude'] > 180:
+                if longitude < -180 or longitude > 180:
                     continue
                 
-                loaded_positions.append(position)
+                altitude = item.get('altitude')
+                loaded_positions.append({
+                    'name': str(item['name']),
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'altitude': float(altitude) if altitude is not None else None,
+                    'source_file': filename
+                })
             
             # Add to positions list
             self.positions.extend(loaded_positions)
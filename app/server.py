@@ -6,7 +6,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Dict
 from pydantic import BaseModel
 import pandas as pd
 import json
@@ -44,6 +44,10 @@ class ScanFolderRequest(BaseModel):
 class TagUpdateRequest(BaseModel):
     tagged: bool
 
+class ThumbnailPrefetchRequest(BaseModel):
+    indices: List[int]
+    size: int = 200
+
 class LocationUpdateRequest(BaseModel):
     latitude: float
     longitude: float
@@ -57,6 +61,10 @@ class ElevationRequest(BaseModel):
     longitude: float
     service: str = "open-elevation"
 
+class ElevationBatchRequest(BaseModel):
+    locations: List[Dict[str, float]]  # [{'latitude': ..., 'longitude': ...}, ...]
+    service: str = "open-elevation"
+
 class FilenameFormatRequest(BaseModel):
     format: str
 
@@ -109,9 +117,9 @@ app.add_middleware(
 # Global data storage (in production, use proper state management)
 photo_manager = PhotoManager()
 gpx_manager = GPXManager()
-elevation_service = ElevationService()
+elevation_service = ElevationService(cache_file=Path.home() / ".cache" / "python_geotag" / "elev.json")
 positions_manager = PositionsManager()
-geocoding_service = GeocodingService()
+geocoding_service = GeocodingService(cache_file=Path.home() / ".cache" / "python_geotag" / "geocode.json")
 
 # Configuration manager (initialized from main.py)
 config_manager: ConfigManager = ConfigManager()
@@ -140,6 +148,15 @@ templates_path = Path(__file__).parent.parent / "templates"
 templates_path.mkdir(exist_ok=True)
 
 
+@app.on_event("shutdown")
+async def shutdown_services():
+    """Persist service caches, release pooled HTTP connections and stop photo workers"""
+    elevation_service.close()
+    geocoding_service.close()
+    photo_manager.close()
+    ExportManager.close_exiftool()
+
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root():
     """Serve the main HTML page"""
@@ -174,6 +191,22 @@ async def get_elevation(request: ElevationRequest):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/api/elevations")
+async def get_elevations(request: ElevationBatchRequest):
+    """Fetch elevations for a list of coordinates in batched requests"""
+    try:
+        coords = [(loc['latitude'], loc['longitude']) for loc in request.locations]
+        elevations = elevation_service.get_elevations_parallel(coords, request.service)
+        
+        return {
+            "success": True,
+            "elevations": elevations,
+            "service": request.service
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/api/scan-folder")
 async def scan_folder(request: ScanFolderRequest):
     """
@@ -316,6 +349,16 @@ async def get_photo_thumbnail(index: int, size: int = 200):
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@app.post("/api/photo-thumbnails/prefetch")
+async def prefetch_photo_thumbnails(request: ThumbnailPrefetchRequest):
+    """Start generating thumbnails in the background"""
+    try:
+        futures = photo_manager.prefetch_thumbnails(request.indices, request.size)
+        return {"success": True, "queued": len(futures)}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.get("/api/photo-image/{index}")
 async def get_photo_image(index: int):
     """Get the full-size image"""
@@ -905,20 +948,15 @@ async def export_photos(request: ExportRequest):
                 yield f"data: {json.dumps(data)}\n\n"
                 return
             
-            # Export each photo
-            exported_count = 0
-            failed_photos = []
+            # Collect export jobs for all photos
+            jobs = []
+            job_photos = []
             
             for idx, row in photos_df.iterrows():
                 photo = row.to_dict()
                 # Get the new filename or use original
                 new_filename = photo.get('new_name') or photo.get('filename')
                 
-                # Send progress update
-                progress = int((exported_count / total_photos) * 100)
-                data = {"progress": progress, "current": exported_count + 1, "total": total_photos, "filename": new_filename}
-                yield f"data: {json.dumps(data)}\n\n"
-                
                 # Get the new time or use original
                 new_time = None
                 if photo.get('new_time') and pd.notna(photo['new_time']):
@@ -950,8 +988,7 @@ async def export_photos(request: ExportRequest):
                 gps_timestamp = photo.get('new_gps_timestamp') or photo.get('exif_gps_timestamp')
                 offset_time = photo.get('new_offset_time') or photo.get('exif_offset_time')
                 
-                # Export the photo
-                success = ExportManager.export_photo(
+                jobs.append(dict(
                     source_path=photo['full_path'],
                     dest_folder=export_folder,
                     new_filename=new_filename,
@@ -968,13 +1005,28 @@ async def export_photos(request: ExportRequest):
                     gps_datestamp=gps_datestamp,
                     gps_timestamp=gps_timestamp,
                     offset_time=offset_time
-                )
+                ))
+                job_photos.append(photo)
+            
+            # Export the photos concurrently, reporting progress as each one completes
+            exported_count = 0
+            failed_photos = []
+            completed = 0
+            
+            for job_index, success in ExportManager.iter_export_photos(jobs):
+                photo = job_photos[job_index]
+                completed += 1
                 
                 if success:
                     exported_count += 1
                 else:
                     failed_photos.append(photo['filename'])
                 
+                # Send progress update
+                progress = int((completed / total_photos) * 100)
+                data = {"progress": progress, "current": completed, "total": total_photos, "filename": jobs[job_index]['new_filename']}
+                yield f"data: {json.dumps(data)}\n\n"
+                
                 # Small delay to ensure progress updates are sent
                 await asyncio.sleep(0.01)
             
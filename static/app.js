@@ -27,6 +27,9 @@ const state = {
     }
 };
 
+// Number of grid thumbnails generated ahead on the server
+const THUMBNAIL_PREFETCH_COUNT = 100;
+
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', () => {
     initializeMenu();
@@ -623,6 +626,12 @@ function displayPhotoGrid() {
     }
     photoGrid.innerHTML = '';
 
+    // Generate the first screens of thumbnails in parallel on the server
+    const prefetchIndices = state.filteredPhotos
+        .slice(0, THUMBNAIL_PREFETCH_COUNT)
+        .map((photo, index) => photo.original_index !== undefined ? photo.original_index : index);
+    prefetchThumbnails(prefetchIndices);
+
     state.filteredPhotos.forEach((photo, index) => {
         const item = document.createElement('div');
         item.className = 'photo-grid-item';
@@ -671,6 +680,21 @@ function displayPhotoGrid() {
     });
 }
 
+async function prefetchThumbnails(indices) {
+    if (indices.length === 0) {
+        return;
+    }
+    try {
+        await fetch('/api/photo-thumbnails/prefetch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ indices, size: state.thumbnailSize })
+        });
+    } catch (error) {
+        console.error('Error prefetching thumbnails:', error);
+    }
+}
+
 function updateThumbnailSizes() {
     const photoGrid = document.getElementById('photo-grid');
     
@@ -872,7 +896,7 @@ function displayGPXTracks() {
         const bounds = new google.maps.LatLngBounds();
 
         state.gpxTracks.forEach(track => {
-            const path = track.points.map(p => ({ lat: p.lat, lng: p.lng }));
+            const path = track.points.map(([lat, lng]) => ({ lat, lng }));
             
             const polyline = new google.maps.Polyline({
                 path: path,
@@ -896,7 +920,8 @@ function displayGPXTracks() {
         const bounds = [];
 
         state.gpxTracks.forEach(track => {
-            const latlngs = track.points.map(p => [p.lat, p.lng]);
+            // Points are already [lat, lng] pairs
+            const latlngs = track.points;
             
             const polyline = L.polyline(latlngs, {
                 color: '#FF0000',
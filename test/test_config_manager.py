@@ -1,10 +1,12 @@
 """
 Tests for ConfigManager - configuration file management
 """
+import os
 import pytest
 from pathlib import Path
 import yaml
-from app.config_manager import ConfigManager
+from unittest.mock import patch
+from app.config_manager import ConfigManager, Config
 
 
 class TestConfigLoading:
@@ -138,6 +140,21 @@ class TestConfigSaving:
         # Config should be updated in memory
         assert manager.get('thumbnail_size') == 400
     
+    def test_save_skips_unchanged_config(self, tmp_path):
+        """Test that saving an unchanged config does not rewrite the file"""
+        config_file = tmp_path / "unchanged.yaml"
+        manager = ConfigManager()
+        manager.config_file = config_file
+        
+        with patch('app.config_manager.yaml.dump', wraps=yaml.dump) as mock_dump:
+            assert manager.save() is True
+            assert manager.save() is True
+            assert mock_dump.call_count == 1
+            
+            manager.set('thumbnail_size', 210)
+            assert manager.save() is True
+            assert mock_dump.call_count == 2
+    
     @pytest.mark.skip(reason="get_config_yaml method not implemented")
     def test_get_config_as_yaml(self):
         """Test getting configuration as YAML string"""
@@ -278,6 +295,19 @@ class TestConfigDefaults:
         assert manager.get('folder_path') == ''
         assert manager.get('export_folder') == ''
     
+    def test_typed_settings_snapshot(self):
+        """Test that known settings are exposed as a typed Config"""
+        manager = ConfigManager()
+        manager.set('thumbnail_size', 220)
+        manager.set('custom_key', 'ignored')
+        
+        settings = manager.get_settings()
+        
+        assert isinstance(settings, Config)
+        assert settings.thumbnail_size == 220
+        assert settings.as_dict().keys() == ConfigManager.DEFAULT_CONFIG.keys()
+        assert not hasattr(settings, '__dict__')
+    
     def test_filename_format_default(self):
         """Test default filename format"""
         manager = ConfigManager()
@@ -326,3 +356,44 @@ class TestEdgeCases:
         
         manager.set('folder_path', None)
         assert manager.get('folder_path') is None
+
+
+class TestConfigJsonSidecar:
+    """Test the JSON sidecar used to speed up config loading"""
+    
+    def test_save_writes_json_sidecar(self, tmp_path):
+        """Test that saving also writes a JSON copy next to the YAML file"""
+        config_file = tmp_path / "sidecar.yaml"
+        manager = ConfigManager()
+        manager.config_file = config_file
+        manager.set('thumbnail_size', 180)
+        manager.save()
+        
+        sidecar = tmp_path / "sidecar.yaml.cache.json"
+        assert sidecar.exists()
+        assert ConfigManager(str(config_file)).get('thumbnail_size') == 180
+    
+    def test_edited_yaml_takes_precedence(self, tmp_path):
+        """Test that an edited YAML file is not shadowed by the sidecar, even with an unchanged mtime"""
+        config_file = tmp_path / "edited.yaml"
+        manager = ConfigManager()
+        manager.config_file = config_file
+        manager.save()
+        
+        # Edit within the filesystem's mtime resolution: same mtime, different size
+        saved_mtime = config_file.stat().st_mtime_ns
+        config_file.write_text("thumbnail_size: 333\n")
+        os.utime(config_file, ns=(saved_mtime, saved_mtime))
+        
+        assert ConfigManager(str(config_file)).get('thumbnail_size') == 333
+    
+    def test_sidecar_keeps_user_json_file(self, tmp_path):
+        """Test that a user's JSON file named like the config is not overwritten"""
+        config_file = tmp_path / "settings.yaml"
+        user_json = tmp_path / "settings.json"
+        user_json.write_text('{"mine": true}')
+        manager = ConfigManager()
+        manager.config_file = config_file
+        manager.save()
+        
+        assert user_json.read_text() == '{"mine": true}'
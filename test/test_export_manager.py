@@ -1,12 +1,18 @@
 """
 Tests for ExportManager - photo export with metadata updates
 """
+import io
+import os
 import pytest
 import shutil
+import threading
 from pathlib import Path
 from PIL import Image
 import piexif
-from app.export_manager import ExportManager
+from datetime import datetime, timedelta, timezone
+from fractions import Fraction
+from unittest.mock import patch, Mock, MagicMock
+from app.export_manager import ExportManager, _deg_to_dms, _exif_time_bytes
 
 
 class TestPhotoExport:
@@ -78,6 +84,17 @@ class TestPhotoExport:
 class TestGPSExport:
     """Test GPS coordinate export to EXIF"""
     
+    def test_deg_to_dms_conversion(self):
+        """Test decimal degrees to DMS rational conversion"""
+        assert _deg_to_dms(48.8584) == ((48, 1), (51, 1), (756, 25))
+        # Sign is carried by the reference tag, not the rationals
+        assert _deg_to_dms(-2.2945) == ((2, 1), (17, 1), (201, 5))
+        # Seconds keep sub-0.01" precision and never round up to 60"
+        (d, _), (m, _), (num, den) = _deg_to_dms(0.9999999)
+        assert (d, m) == (0, 59)
+        assert Fraction(num, den) == Fraction(1499991, 25000)
+        assert d + Fraction(m, 60) + Fraction(num, den) / 3600 == Fraction(9999999, 10 ** 7)
+    
     def test_export_with_gps_coordinates(self, sample_photo_paths, clean_output_dir):
         """Test exporting photo with GPS coordinates"""
         source = sample_photo_paths["camera"]
@@ -177,6 +194,22 @@ class TestMetadataExport:
         
         assert result is True
     
+    def test_iptc_save_failure_rebuilds_from_scratch(self, sample_photo_paths, tmp_path):
+        """Test that a failed IPTC save is retried with a fresh IPTC block"""
+        dest = tmp_path / "iptc_retry.jpg"
+        shutil.copy2(sample_photo_paths["camera"], dest)
+        existing, fresh = MagicMock(), MagicMock()
+        existing.save.side_effect = ValueError("corrupt IPTC")
+        
+        with patch.object(ExportManager, '_exiftool_available', return_value=False), \
+             patch('app.export_manager.IPTCInfo', side_effect=[existing, fresh]) as mock_iptc:
+            ExportManager._update_iptc_xmp(str(dest), keywords="a, b", city="Madrid")
+        
+        assert [call.kwargs['force'] for call in mock_iptc.call_args_list] == [False, True]
+        fresh.__setitem__.assert_any_call('keywords', ['a', 'b'])
+        fresh.__setitem__.assert_any_call('city', 'Madrid')
+        fresh.save.assert_called_once_with(['overwrite'])
+    
     def test_export_with_location_metadata(self, sample_photo_paths, clean_output_dir):
         """Test exporting photo with location metadata"""
         source = sample_photo_paths["camera"]
@@ -247,6 +280,54 @@ class TestTimestampExport:
         )
         
         assert result is True
+    
+    def test_export_photos_applies_times_in_background(self, sample_photo_paths, clean_output_dir):
+        """Test that batch exports set file times off the export thread before returning"""
+        new_time = datetime(2023, 7, 14, 9, 15, 0)
+        jobs = [
+            dict(source_path=str(sample_photo_paths["camera"]), dest_folder=str(clean_output_dir),
+                 new_filename=f"timed{i}.jpg", new_time=new_time)
+            for i in range(2)
+        ]
+        
+        with patch.object(ExportManager, '_set_file_times', wraps=ExportManager._set_file_times) as mock_times:
+            results = ExportManager.export_photos(jobs, max_workers=1)
+        
+        assert results == [True, True]
+        assert mock_times.call_count == 2
+        for i in range(2):
+            assert os.path.getmtime(clean_output_dir / f"timed{i}.jpg") == new_time.timestamp()
+    
+    def test_set_times_utime_nanoseconds(self, clean_output_dir):
+        """Test that file times are set to the exact nanosecond"""
+        dest = clean_output_dir / "times.jpg"
+        dest.write_bytes(b"data")
+        timestamp = datetime(2022, 3, 4, 5, 6, 7, 123456)
+        
+        ExportManager._set_times_utime(dest, timestamp)
+        expected_ns = ExportManager._timestamp_ns(timestamp)
+        assert os.stat(dest).st_mtime_ns == expected_ns
+        assert os.stat(dest).st_atime_ns == expected_ns
+    
+    def test_macos_creation_time_skips_missing_setfile(self, clean_output_dir):
+        """Test that no SetFile process is spawned when it is known to be missing"""
+        dest = clean_output_dir / "no_setfile.jpg"
+        dest.write_bytes(b"data")
+        
+        with patch.object(ExportManager, '_set_creation_time_setattrlist', return_value=False), \
+             patch('app.export_manager._SETFILE_PATH', None), \
+             patch('app.export_manager.subprocess.run') as mock_run:
+            ExportManager._set_creation_time_macos(dest, datetime(2021, 1, 1, 12, 0, 0))
+        
+        assert not mock_run.called
+    
+    def test_exif_time_bytes_uses_local_time_of_aware_datetimes(self):
+        """Test that equal instants in different zones keep their own wall-clock time"""
+        utc = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        cest = datetime(2024, 1, 1, 14, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+        
+        assert _exif_time_bytes(utc) == b'2024:01:01 12:00:00'
+        assert _exif_time_bytes(cest) == b'2024:01:01 14:00:00'
 
 
 class TestFileOperations:
@@ -310,6 +391,41 @@ class TestFileOperations:
         output_file = dest_folder / filename
         assert output_file.exists()
         assert output_file.stat().st_mtime > 0
+    
+    def test_fast_copy_duplicates_file(self, sample_photo_paths, clean_output_dir):
+        """Test that the clone/copy helper produces an identical file"""
+        source = sample_photo_paths["camera"]
+        dest = clean_output_dir / "fast_copy.jpeg"
+        
+        ExportManager._fast_copy(str(source), dest)
+        
+        assert dest.read_bytes() == source.read_bytes()
+    
+    def test_fast_copy_buffered_fallback(self, sample_photo_paths, clean_output_dir):
+        """Test the user-space copy used when no clone or kernel copy is available"""
+        source = sample_photo_paths["phone"]
+        dest = clean_output_dir / "buffered_copy.jpg"
+        
+        with patch.object(ExportManager, '_kernel_copy', return_value=False), \
+             patch('app.export_manager.os.sendfile', side_effect=OSError, create=True):
+            ExportManager._fast_copy(str(source), dest)
+        
+        assert dest.read_bytes() == source.read_bytes()
+    
+    @pytest.mark.skipif(not hasattr(os, 'sendfile'), reason="os.sendfile not available on this platform")
+    def test_fast_copy_sendfile_fallback(self, sample_photo_paths, clean_output_dir):
+        """Test the sendfile copy used when clone and copy_file_range are unavailable"""
+        source = sample_photo_paths["camera"]
+        dest = clean_output_dir / "sendfile_copy.jpg"
+        
+        with patch.object(ExportManager, '_kernel_copy', return_value=False), \
+             patch.object(ExportManager, '_buffered_copy') as mock_buffered, \
+             patch('app.export_manager.os.sendfile', wraps=os.sendfile) as mock_sendfile:
+            ExportManager._fast_copy(str(source), dest)
+        
+        assert mock_sendfile.called
+        assert not mock_buffered.called
+        assert dest.read_bytes() == source.read_bytes()
 
 
 class TestComplexExport:
@@ -368,3 +484,233 @@ class TestComplexExport:
         for _, filename in photos_to_export:
             if (dest_folder / filename).exists():
                 assert (dest_folder / filename).is_file()
+    
+    def test_reexport_reuses_source_exif(self, sample_photo_paths, clean_output_dir):
+        """Test that re-exporting the same source parses its EXIF only once"""
+        source = sample_photo_paths["phone"]
+        ExportManager._exif_cache.clear()
+        
+        with patch('app.export_manager.piexif.load', wraps=piexif.load) as mock_load:
+            for i, lat in enumerate([10.0, 20.0]):
+                result = ExportManager.export_photo(
+                    source_path=str(source),
+                    dest_folder=str(clean_output_dir),
+                    new_filename=f"reexport_{i}.jpg",
+                    final_lat=lat,
+                    final_lon=5.0
+                )
+                assert result is True
+            assert mock_load.call_count == 1
+        
+        # Each export gets its own coordinates, the cached dict is not shared
+        lats = [piexif.load(str(clean_output_dir / f"reexport_{i}.jpg"))['GPS'][piexif.GPSIFD.GPSLatitude][0]
+                for i in range(2)]
+        assert lats == [(10, 1), (20, 1)]
+    
+    def test_copy_with_exif_matches_piexif_insert(self, sample_photo_paths, clean_output_dir):
+        """Test that the single-pass EXIF splice produces the same file as copy + piexif.insert"""
+        source = sample_photo_paths["vert"]
+        exif_bytes = piexif.dump({"0th": {}, "Exif": {}, "GPS": {piexif.GPSIFD.GPSLatitudeRef: b'N'}})
+        
+        spliced = clean_output_dir / "spliced.jpg"
+        assert ExportManager._copy_with_exif(str(source), spliced, exif_bytes) is True
+        
+        reference = clean_output_dir / "reference.jpg"
+        shutil.copy(source, reference)
+        piexif.insert(exif_bytes, str(reference))
+        
+        assert spliced.read_bytes() == reference.read_bytes()
+    
+    def test_copy_with_exif_rejects_non_jpeg(self, clean_output_dir):
+        """Test that non-JPEG sources are left to the plain copy path"""
+        source = clean_output_dir / "not_a_jpeg.png"
+        Image.new('RGB', (8, 8)).save(source)
+        
+        dest = clean_output_dir / "not_a_jpeg_copy.png"
+        assert ExportManager._copy_with_exif(str(source), dest, piexif.dump({})) is False
+        assert not dest.exists()
+    
+    def test_export_webp_inserts_exif_in_memory(self, clean_output_dir):
+        """Test that GPS is written to sources the streaming splice cannot handle"""
+        source = clean_output_dir / "source.webp"
+        Image.new('RGB', (8, 8)).save(source, exif=piexif.dump({"0th": {}, "Exif": {}, "GPS": {}}))
+        
+        result = ExportManager.export_photo(
+            source_path=str(source),
+            dest_folder=str(clean_output_dir),
+            new_filename="exported.webp",
+            final_lat=40.0,
+            final_lon=-3.5
+        )
+        
+        assert result is True
+        gps = piexif.load(str(clean_output_dir / "exported.webp"))['GPS']
+        assert gps[piexif.GPSIFD.GPSLatitude] == ((40, 1), (0, 1), (0, 1))
+        assert gps[piexif.GPSIFD.GPSLongitudeRef] == b'W'
+    
+    def test_export_photos_batch_preserves_order(self, sample_photo_paths, clean_output_dir):
+        """Test concurrent batch export returns results in job order"""
+        jobs = [
+            dict(source_path=str(sample_photo_paths["camera"]), dest_folder=str(clean_output_dir),
+                 new_filename="batch1.jpg", final_lat=1.0, final_lon=2.0),
+            dict(source_path="nonexistent_photo.jpg", dest_folder=str(clean_output_dir),
+                 new_filename="batch2.jpg"),
+            dict(source_path=str(sample_photo_paths["phone"]), dest_folder=str(clean_output_dir),
+                 new_filename="batch3.jpg", keywords="one, two"),
+        ]
+        
+        results = ExportManager.export_photos(jobs, max_workers=3)
+        
+        assert results == [True, False, True]
+        assert (clean_output_dir / "batch1.jpg").exists()
+        assert (clean_output_dir / "batch3.jpg").exists()
+    
+    def test_export_without_changes_copies_unchanged(self, sample_photo_paths, clean_output_dir):
+        """Test that exports with no GPS or time changes skip the EXIF rewrite"""
+        source = sample_photo_paths["vert"]
+        
+        with patch('app.export_manager.piexif.dump') as mock_dump, \
+             patch('app.export_manager.IPTCInfo') as mock_iptc:
+            result = ExportManager.export_photo(
+                source_path=str(source),
+                dest_folder=str(clean_output_dir),
+                new_filename="unchanged.jpg",
+                final_alt=100.0,
+                title="  ",
+                city=""
+            )
+            assert not mock_dump.called
+            assert not mock_iptc.called
+        
+        assert result is True
+        assert (clean_output_dir / "unchanged.jpg").read_bytes() == source.read_bytes()
+    
+    def test_exiftool_single_pass(self, sample_photo_paths, clean_output_dir):
+        """Test that all metadata is written in one exiftool run when available"""
+        source = sample_photo_paths["camera"]
+        stdin = io.StringIO()
+        proc = Mock(stdin=stdin, stdout=io.StringIO("    1 image files updated\n{ready}\n"))
+        proc.poll.return_value = None
+        
+        with patch.object(ExportManager, '_exiftool_available', return_value=True), \
+             patch.object(ExportManager, '_exiftool_procs', {}), \
+             patch('app.export_manager.subprocess.Popen', return_value=proc) as mock_popen:
+            result = ExportManager.export_photo(
+                source_path=str(source),
+                dest_folder=str(clean_output_dir),
+                new_filename="exiftool_pass.jpg",
+                final_lat=40.4168,
+                final_lon=-3.7038,
+                final_alt=float('nan'),
+                new_time=datetime(2024, 5, 1, 10, 30, 0),
+                title="Plaza",
+                city="Madrid"
+            )
+        
+        assert result is True
+        assert mock_popen.call_count == 1
+        args = stdin.getvalue().splitlines()
+        assert args.count('-execute') == 1
+        assert '-GPSLatitude=40.4168' in args
+        assert '-GPSLongitudeRef=W' in args
+        assert not any(arg.startswith('-GPSAltitude') for arg in args)
+        assert '-EXIF:DateTimeOriginal=2024:05:01 10:30:00' in args
+        assert '-IPTC:City=Madrid' in args
+        assert '-XMP:Title=Plaza' in args
+    
+    def test_exiftool_process_per_thread(self):
+        """Test that each exporting thread gets its own exiftool process"""
+        procs = []
+        
+        def start(*args, **kwargs):
+            proc = Mock(stdin=io.StringIO(), stdout=io.StringIO("{ready}\n" * 2))
+            proc.poll.return_value = None
+            procs.append(proc)
+            return proc
+        
+        with patch.object(ExportManager, '_exiftool_procs', {}), \
+             patch('app.export_manager.subprocess.Popen', side_effect=start):
+            assert ExportManager._run_exiftool(['-XMP:Title=a'], 'a.jpg') is True
+            assert ExportManager._run_exiftool(['-XMP:Title=b'], 'b.jpg') is True
+            
+            worker = threading.Thread(target=ExportManager._run_exiftool, args=(['-XMP:Title=c'], 'c.jpg'))
+            worker.start()
+            worker.join()
+            assert len(procs) == 2
+            assert procs[0].stdin.getvalue().count('-execute') == 2
+            assert procs[1].stdin.getvalue().count('-execute') == 1
+            
+            ExportManager.close_exiftool()
+            assert ExportManager._exiftool_procs == {}
+        
+        for proc in procs:
+            assert proc.stdin.getvalue().endswith('-stay_open\nFalse\n')
+    
+    def test_exiftool_probe_runs_once(self):
+        """Test that the exiftool availability check is memoized"""
+        with patch('app.export_manager._EXIFTOOL_AVAILABLE', None), \
+             patch('app.export_manager.subprocess.run', side_effect=FileNotFoundError) as mock_run:
+            assert ExportManager._exiftool_available() is False
+            assert ExportManager._exiftool_available() is False
+            assert mock_run.call_count == 1
+    
+    def test_exiftool_failure_falls_back_to_piexif(self, sample_photo_paths, clean_output_dir):
+        """Test that a failed exiftool run discards its copy and exports with piexif instead"""
+        source = sample_photo_paths["camera"]
+        export_args = dict(source_path=str(source), dest_folder=str(clean_output_dir),
+                           final_lat=40.4168, final_lon=-3.7038, new_time=datetime(2024, 5, 1, 10, 30, 0))
+        dest = clean_output_dir / "exiftool_failed.jpg"
+        real_export = ExportManager._export_with_piexif
+        
+        def export_with_piexif(source_path, dest_file, *args):
+            # The exiftool copy must be gone before piexif writes the photo again
+            assert not dest_file.exists()
+            return real_export(source_path, dest_file, *args)
+        
+        with patch.object(ExportManager, '_exiftool_available', return_value=True), \
+             patch.object(ExportManager, '_run_exiftool', return_value=False) as mock_run, \
+             patch.object(ExportManager, '_export_with_piexif', side_effect=export_with_piexif) as mock_piexif:
+            result = ExportManager.export_photo(new_filename=dest.name, **export_args)
+        
+        assert result is True
+        assert mock_run.called
+        assert mock_piexif.call_count == 1
+        
+        with patch.object(ExportManager, '_exiftool_available', return_value=False):
+            assert ExportManager.export_photo(new_filename="piexif_only.jpg", **export_args) is True
+        assert dest.read_bytes() == (clean_output_dir / "piexif_only.jpg").read_bytes()
+    
+    def test_iptc_written_by_exiftool_when_available(self, sample_photo_paths, tmp_path):
+        """Test that IPTC and XMP go through one exiftool run instead of iptcinfo3"""
+        dest = tmp_path / "iptc_exiftool.jpg"
+        shutil.copy2(sample_photo_paths["camera"], dest)
+        
+        with patch.object(ExportManager, '_exiftool_available', return_value=True), \
+             patch.object(ExportManager, '_run_exiftool', return_value=True) as mock_run, \
+             patch('app.export_manager.IPTCInfo') as mock_iptc:
+            ExportManager._update_iptc_xmp(str(dest), title="Plaza", keywords="a, b", city="Madrid")
+        
+        assert not mock_iptc.called
+        assert mock_run.call_count == 1
+        args = mock_run.call_args[0][0]
+        assert '-IPTC:Keywords=b' in args
+        assert '-IPTC:City=Madrid' in args
+        assert '-XMP:City=Madrid' in args
+    
+    def test_update_exif_rebuilds_after_single_failed_dump(self):
+        """Test that a failing EXIF dump is rebuilt from scratch without retrying the same dict"""
+        real_dump = piexif.dump
+        calls = []
+        
+        def flaky_dump(exif_dict):
+            calls.append(exif_dict)
+            if len(calls) == 1:
+                raise ValueError("bad tag")
+            return real_dump(exif_dict)
+        
+        exif_dict = {"0th": {}, "Exif": {}, "GPS": {}, "1st": {}, "thumbnail": None}
+        with patch('app.export_manager.piexif.dump', side_effect=flaky_dump):
+            exif_bytes = ExportManager._update_exif(exif_dict, 40.0, -3.5, None, None, None, None)
+        
+        assert len(calls) == 2
+        assert piexif.load(exif_bytes)['GPS'][piexif.GPSIFD.GPSLatitudeRef] == b'N'
@@ -2,8 +2,11 @@
 Tests for GPXManager - GPX file parsing, matching, and time offset handling
 """
 import pytest
-from datetime import datetime, timedelta
-from app.gpx_manager import GPXManager
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from app.gpx_manager import GPXManager, _parse_gpx_times
 
 
 class TestGPXLoading:
@@ -31,6 +34,52 @@ class TestGPXLoading:
         # Should have points from both tracks
         assert len(manager.pd_gpx_info) > 0
     
+    def test_points_merged_once_after_loading(self, sample_gpx_paths, load_gpx_content):
+        """Test that loaded files are concatenated and sorted in a single pass"""
+        manager = GPXManager()
+        manager.load_gpx(load_gpx_content(sample_gpx_paths["outbound"]), "outbound.gpx")
+        manager.load_gpx(load_gpx_content(sample_gpx_paths["return"]), "return.gpx")
+        
+        assert len(manager._pending_frames) == 2
+        # Checking for data doesn't build the merged frame
+        assert manager.has_data()
+        assert len(manager._pending_frames) == 2
+        with patch('app.gpx_manager.pd.concat', wraps=pd.concat) as mock_concat:
+            points = manager.pd_gpx_info
+            assert manager.pd_gpx_info is points
+        
+        assert mock_concat.call_count == 1
+        assert manager._pending_frames == []
+        assert points['time'].is_monotonic_increasing
+        assert points['track_name'].dtype == 'category'
+    
+    def test_streaming_parser_matches_gpxpy(self, sample_gpx_paths, load_gpx_content):
+        """Test that the streaming parser reads the same points as gpxpy"""
+        content = load_gpx_content(sample_gpx_paths["outbound"])
+        
+        streamed = GPXManager._stream_track_points(content, "outbound.gpx")
+        parsed = GPXManager._gpxpy_track_points(content, "outbound.gpx")
+        
+        assert streamed[0] == parsed[0]
+        for streamed_column, parsed_column in zip(streamed[1:], parsed[1:]):
+            assert list(streamed_column) == list(parsed_column)
+        
+        # Other namespaces and malformed documents are left to gpxpy
+        assert GPXManager._stream_track_points('<gpx xmlns="urn:other"><trk/></gpx>', "x.gpx") is None
+        assert GPXManager._stream_track_points("invalid xml content", "x.gpx") is None
+    
+    def test_gpx_times_parsed_in_one_pass(self):
+        """Test the vectorized conversion of GPX time strings"""
+        utc = _parse_gpx_times(['2024-01-01T10:00:00.5Z', None])
+        assert str(utc.dtype) == 'datetime64[ns, UTC]'
+        assert utc[0] == pd.Timestamp('2024-01-01 10:00:00.5', tz='UTC')
+        assert pd.isna(utc[1])
+        
+        # Other zones are converted to UTC, naive times stay naive
+        assert _parse_gpx_times(['2024-01-01T12:00:00+02:00'])[0] == pd.Timestamp('2024-01-01 10:00', tz='UTC')
+        assert _parse_gpx_times(['2024-01-01T10:00:00'])[0] == pd.Timestamp('2024-01-01 10:00')
+        assert _parse_gpx_times(['2024-01-01T10:00:00', '2024-01-01T10:00:00Z']) is None
+    
     def test_gpx_dataframe_structure(self, sample_gpx_paths, load_gpx_content):
         """Test that GPX dataframe has all required columns"""
         manager = GPXManager()
@@ -45,6 +94,21 @@ class TestGPXLoading:
         for col in required_columns:
             assert col in manager.pd_gpx_info.columns, f"Missing column: {col}"
     
+    def test_track_points_and_bounds(self, sample_gpx_paths, load_gpx_content):
+        """Test that track points are an (n, 2) array matching the DataFrame"""
+        manager = GPXManager()
+        content = load_gpx_content(sample_gpx_paths["outbound"])
+        track_info = manager.load_gpx(content, "outbound.gpx")
+        
+        points = track_info['points']
+        assert isinstance(points, np.ndarray)
+        assert points.shape == (len(manager.pd_gpx_info), 2)
+        assert track_info['bounds']['north'] == max(lat for lat, _ in points)
+        assert track_info['bounds']['west'] == min(lng for _, lng in points)
+        
+        # Converted to plain [lat, lng] lists only when returned for JSON
+        assert manager.get_all_tracks()[0]['points'] == points.tolist()
+    
     def test_duplicate_detection(self, sample_gpx_paths, load_gpx_content):
         """Test that duplicate tracks are not loaded"""
         manager = GPXManager()
@@ -72,8 +136,13 @@ class TestTimeOffset:
         
         # Set main offset to 2 hours
         offset_seconds = 2 * 3600
+        points = manager.pd_gpx_info
         manager.set_main_offset(offset_seconds)
         
+        # Shifting every track keeps the time order, so the points aren't re-sorted or copied
+        assert manager.pd_gpx_info is points
+        assert manager.pd_gpx_info['time'].is_monotonic_increasing
+        
         # Check that all tracks have the offset
         for track in manager.tracks:
             assert track['offset_seconds'] == offset_seconds
@@ -109,6 +178,15 @@ class TestTimeOffset:
         # Test zero
         offset_seconds = manager.parse_offset_string("00:00:00")
         assert offset_seconds == 0
+        
+        # Malformed offsets fall back to zero
+        assert manager.parse_offset_string("01:00") == 0
+        assert manager.parse_offset_string("+aa:00:00") == 0
+        assert manager.parse_offset_string(None) == 0
+        
+        # Formatting round-trips
+        assert manager.format_offset_seconds(-(1 * 3600 + 15 * 60)) == "-01:15:00"
+        assert manager.parse_offset_string(manager.format_offset_seconds(9000)) == 9000
 
 
 class TestGPXMatching:
@@ -146,6 +224,116 @@ class TestGPXMatching:
             # Should still find a match
             assert result is not None
     
+    def test_find_closest_point_picks_nearest_and_respects_window(self):
+        """Test binary-search matching against a small hand-built track"""
+        manager = GPXManager()
+        manager.load_gpx(
+            '<?xml version="1.0"?><gpx version="1.1" creator="test"><trk><name>t</name><trkseg>'
+            '<trkpt lat="1.0" lon="1.0"><time>2024-01-01T10:00:00Z</time></trkpt>'
+            '<trkpt lat="2.0" lon="2.0"><time>2024-01-01T10:01:00Z</time></trkpt>'
+            '<trkpt lat="3.0" lon="3.0"><time>2024-01-01T10:02:00Z</time></trkpt>'
+            '</trkseg></trk></gpx>', "t.gpx")
+        
+        result = manager.find_closest_point(datetime(2024, 1, 1, 10, 1, 20))
+        assert result['latitude'] == 2.0
+        assert result['time_diff_seconds'] == 20
+        
+        # Halfway between two points, the earlier one wins
+        assert manager.find_closest_point(datetime(2024, 1, 1, 10, 1, 30))['latitude'] == 2.0
+        
+        assert manager.find_closest_point(datetime(2024, 1, 1, 10, 8, 0)) is None
+        assert manager._get_time_range() == (pd.Timestamp('2024-01-01T10:00Z').value,
+                                             pd.Timestamp('2024-01-01T10:02Z').value)
+        assert manager.find_closest_point(datetime(2024, 1, 1, 10, 7, 0))['latitude'] == 3.0
+        
+        # Before the first point, on a tie and after the last point, in one batch
+        latitudes, _, _, _ = manager.find_closest_points([
+            datetime(2024, 1, 1, 9, 57, 0), datetime(2024, 1, 1, 10, 0, 30), datetime(2024, 1, 1, 10, 4, 0)])
+        assert list(latitudes) == [1.0, 1.0, 3.0]
+        
+        # Zoned photo times are compared in UTC
+        paris = timezone(timedelta(hours=1))
+        assert manager.find_closest_point(datetime(2024, 1, 1, 11, 1, 20, tzinfo=paris))['latitude'] == 2.0
+        
+        # Offsets shift the search arrays too
+        manager.set_main_offset(3600)
+        assert manager.find_closest_point(datetime(2024, 1, 1, 11, 0, 10))['latitude'] == 1.0
+    
+    def test_find_closest_point_across_tracks(self):
+        """Test matching when several tracks cover different time ranges"""
+        def gpx(name, lat, hour):
+            return ('<?xml version="1.0"?><gpx version="1.1" creator="test"><trk>'
+                    f'<name>{name}</name><trkseg>'
+                    f'<trkpt lat="{lat}" lon="0.0"><time>2024-01-01T{hour:02d}:00:00Z</time></trkpt>'
+                    f'<trkpt lat="{lat + 0.5}" lon="0.0"><time>2024-01-01T{hour:02d}:30:00Z</time></trkpt>'
+                    '</trkseg></trk></gpx>')
+        
+        manager = GPXManager()
+        manager.load_gpx(gpx("morning", 10.0, 8), "morning.gpx")
+        manager.load_gpx(gpx("evening", 20.0, 18), "evening.gpx")
+        
+        bounds, tracks = manager._get_track_index()
+        assert bounds.shape == (2, 2)
+        
+        assert manager.find_closest_point(datetime(2024, 1, 1, 18, 29))['latitude'] == 20.5
+        assert manager.find_closest_point(datetime(2024, 1, 1, 8, 2))['latitude'] == 10.0
+        assert manager.find_closest_point(datetime(2024, 1, 1, 13, 0)) is None
+        
+        # Track names are dictionary-encoded; per-track offsets only move that track
+        assert manager.pd_gpx_info['track_name'].dtype == 'category'
+        manager.set_track_offset(1, 3600)
+        assert manager.find_closest_point(datetime(2024, 1, 1, 19, 29))['latitude'] == 20.5
+        assert manager.find_closest_point(datetime(2024, 1, 1, 8, 2))['latitude'] == 10.0
+        
+        # Overlapping tracks at identical times resolve to the track loaded first
+        manager.set_main_offset(0)
+        manager.set_track_offset(1, -10 * 3600)
+        assert manager.pd_gpx_info['time'].is_monotonic_increasing
+        assert manager.find_closest_point(datetime(2024, 1, 1, 8, 0))['latitude'] == 10.0
+        
+        manager.remove_tracks_by_indices([0])
+        assert list(manager.pd_gpx_info['track_name'].cat.categories) == ["evening"]
+    
+    def test_find_closest_points_matches_single_lookups(self, sample_gpx_paths, load_gpx_content):
+        """Test that the batched search agrees with find_closest_point"""
+        manager = GPXManager()
+        manager.load_gpx(load_gpx_content(sample_gpx_paths["outbound"]), "outbound.gpx")
+        manager.load_gpx(load_gpx_content(sample_gpx_paths["return"]), "return.gpx")
+        
+        first = manager.pd_gpx_info['time'].iloc[0].tz_localize(None).to_pydatetime()
+        targets = [first + timedelta(seconds=97 * i) - timedelta(minutes=10) for i in range(200)]
+        targets += [None, "2000-01-01 00:00:00"]
+        
+        latitudes, longitudes, elevations, time_diffs = manager.find_closest_points(targets)
+        
+        assert len(latitudes) == len(targets)
+        for i, target in enumerate(targets):
+            expected = manager.find_closest_point(target) if target is not None else None
+            if expected is None:
+                assert np.isnan(latitudes[i]) and np.isnan(time_diffs[i])
+            else:
+                assert latitudes[i] == expected['latitude']
+                assert longitudes[i] == expected['longitude']
+                assert time_diffs[i] == pytest.approx(expected['time_diff_seconds'])
+                if expected['elevation'] is None:
+                    assert np.isnan(elevations[i])
+                else:
+                    assert elevations[i] == expected['elevation']
+    
+    def test_find_closest_points_accepts_datetime_column(self, sample_gpx_paths, load_gpx_content):
+        """Test that a datetime64 column (with NaT, naive or zoned) matches the per-item conversion"""
+        manager = GPXManager()
+        manager.load_gpx(load_gpx_content(sample_gpx_paths["outbound"]), "outbound.gpx")
+        
+        first = manager.pd_gpx_info['time'].iloc[0].tz_localize(None)
+        column = pd.Series([first + pd.Timedelta(seconds=61 * i) for i in range(50)] + [pd.NaT])
+        
+        for times in (column, column.dt.tz_localize('UTC'), column.dt.tz_localize('Europe/Madrid')):
+            batched = manager.find_closest_points(times)
+            expected = manager.find_closest_points(times.tolist())
+            for got, want in zip(batched, expected):
+                np.testing.assert_array_equal(got, want)
+    
     def test_elevation_data(self, sample_gpx_paths, load_gpx_content):
         """Test that elevation data is preserved"""
         manager = GPXManager()
@@ -158,6 +346,22 @@ class TestGPXMatching:
         # Some points should have elevation data (not all GPX files have this)
         # Just verify the column can contain data
         assert manager.pd_gpx_info['elevation'].dtype in ['float64', 'object']
+    
+    def test_coordinates_keep_full_precision(self):
+        """Test that point coordinates are stored and matched as float64 without rounding"""
+        content = """<?xml version="1.0"?>
+<gpx version="1.1" creator="test" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><name>precise</name><trkseg>
+    <trkpt lat="43.44081234" lon="-3.81234567"><ele>12.345</ele><time>2024-05-01T10:00:00Z</time></trkpt>
+  </trkseg></trk>
+</gpx>"""
+        manager = GPXManager()
+        manager.load_gpx(content, "precise.gpx")
+        
+        assert manager.pd_gpx_info['latitude'].dtype == 'float64'
+        assert manager.pd_gpx_info['longitude'].dtype == 'float64'
+        point = manager.find_closest_point(manager.pd_gpx_info['time'].iloc[0])
+        assert (point['latitude'], point['longitude'], point['elevation']) == (43.44081234, -3.81234567, 12.345)
 
 
 class TestTrackManagement:
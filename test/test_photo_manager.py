@@ -1,9 +1,15 @@
 """
 Tests for PhotoManager - photo scanning, EXIF extraction, and metadata operations
 """
+import os
+import threading
 import pytest
 import pandas as pd
 from pathlib import Path
+from datetime import datetime
+from unittest.mock import patch
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, IptcImagePlugin
 from app.photo_manager import PhotoManager
 
 
@@ -56,6 +62,55 @@ class TestPhotoScanning:
         
         for col in required_columns:
             assert col in manager.pd_photo_info.columns, f"Missing column: {col}"
+    
+    def test_dataframe_dtypes(self, test_resources_dir):
+        """Test that scanned columns get their declared dtypes"""
+        manager = PhotoManager()
+        manager.scan_folder(str(test_resources_dir), recursive=False, use_cache=False)
+        dtypes = manager.pd_photo_info.dtypes
+        
+        for col in ['exif_altitude', 'gpx_altitude', 'manual_altitude', 'final_altitude',
+                    'exif_latitude', 'final_longitude']:
+            assert dtypes[col] == 'float64', col
+        assert dtypes['tagged'] == bool
+        assert dtypes['exif_capture_time'] == 'datetime64[ns]'
+    
+    def test_parallel_scan_matches_serial(self, test_resources_dir):
+        """Test that the process pool scan reads the same data as the serial scan"""
+        serial = PhotoManager()
+        serial.scan_folder(str(test_resources_dir), recursive=True, use_cache=False)
+        
+        parallel = PhotoManager()
+        with patch('app.photo_manager.PARALLEL_SCAN_MIN_FILES', 1), \
+             patch('app.photo_manager.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as mock_pool:
+            parallel.scan_folder(str(test_resources_dir), recursive=True, use_cache=False)
+            parallel.scan_folder(str(test_resources_dir), recursive=True, use_cache=False)
+        
+        parallel.close()
+        
+        # One pool serves both scans, and its workers are not forked from this process
+        assert mock_pool.call_count == 1
+        assert mock_pool.call_args.kwargs['mp_context'].get_start_method() != 'fork'
+        columns = [c for c in serial.pd_photo_info.columns if c != 'creation_time']
+        pd.testing.assert_frame_equal(serial.pd_photo_info[columns], parallel.pd_photo_info[columns])
+    
+    def test_scan_cache_reuses_unchanged_files(self, test_resources_dir, tmp_path):
+        """Test that a repeated scan reads no EXIF data and gives the same DataFrame"""
+        cache_dir = tmp_path / "scans"
+        with patch('app.photo_manager.SCAN_CACHE_DIR', cache_dir):
+            first = PhotoManager()
+            first.scan_folder(str(test_resources_dir), recursive=True)
+            cache_files = list(cache_dir.glob('geotag_scan_*.json'))
+            assert len(cache_files) == 1
+            if os.name == 'posix':
+                # Photo paths and positions are readable by the user only
+                assert cache_files[0].stat().st_mode & 0o777 == 0o600
+            
+            second = PhotoManager()
+            with patch.object(PhotoManager, '_read_photo_info', side_effect=AssertionError("file re-read")):
+                second.scan_folder(str(test_resources_dir), recursive=True)
+        
+        pd.testing.assert_frame_equal(first.pd_photo_info, second.pd_photo_info)
 
 
 class TestEXIFExtraction:
@@ -84,6 +139,26 @@ class TestEXIFExtraction:
         # Some photos might have exif_capture_time
         assert 'exif_capture_time' in manager.pd_photo_info.columns
     
+    def test_jpeg_segment_reader_matches_pil(self, sample_photo_paths):
+        """Test that reading the JPEG header segments matches PIL's EXIF/IPTC parsing"""
+        for path in (sample_photo_paths['camera'], sample_photo_paths['phone'], sample_photo_paths['vert']):
+            with Image.open(path) as img:
+                expected = (img._getexif(), IptcImagePlugin.getiptcinfo(img))
+            assert PhotoManager._read_jpeg_metadata(path) == expected
+    
+    def test_exif_datetime_parsing(self):
+        """Test that the sliced EXIF date parser agrees with strptime"""
+        values = ['2025:07:01 10:34:24', '2024:02:29 23:59:59', '2025:02:29 10:00:00',
+                  '0000:00:00 00:00:00', '    :  :     :  :  ', '2025-07-01 10:34:24',
+                  '2025:07:01 10:34:24 ', '2025:07:01 1_:34:24', '2024:1:5 1:02:03',
+                  '2024:12:31 7:05:09', None]
+        for value in values:
+            try:
+                expected = datetime.strptime(value, '%Y:%m:%d %H:%M:%S')
+            except (TypeError, ValueError):
+                expected = None
+            assert PhotoManager._parse_exif_datetime(value) == expected, value
+    
     def test_location_extraction(self, test_resources_dir):
         """Test IPTC location metadata extraction"""
         manager = PhotoManager()
@@ -313,3 +388,108 @@ class TestSorting:
             manager.set_sort_order('filename')
             filenames = manager.pd_photo_info['filename'].tolist()
             assert filenames == sorted(filenames)
+    
+    def test_thumbnails_survive_resort(self, test_resources_dir, tmp_path):
+        """Test that thumbnails follow their photo across sorts and are not regenerated"""
+        manager = PhotoManager()
+        manager.scan_folder(str(test_resources_dir), recursive=False)
+        
+        with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path):
+            manager.set_sort_order('time')
+            thumbs = {manager.pd_photo_info.at[i, 'full_path']: manager.get_thumbnail(i, 120)
+                      for i in range(len(manager.pd_photo_info))}
+            
+            manager.set_sort_order('filename')
+            with patch('app.photo_manager.Image.open', side_effect=AssertionError("thumbnail regenerated")):
+                for i in range(len(manager.pd_photo_info)):
+                    path = manager.pd_photo_info.at[i, 'full_path']
+                    assert manager.get_thumbnail(i, 120) == thumbs[path]
+            
+            # Another manager keeps thumbnail files of its own
+            other = PhotoManager()
+            other.pd_photo_info = manager.pd_photo_info
+            other_thumbs = {other.get_thumbnail(i, 120) for i in range(len(other.pd_photo_info))}
+            assert other_thumbs.isdisjoint(thumbs.values())
+        
+        assert len(list(tmp_path.glob('*.jpg'))) == 2 * len(thumbs)
+    
+    def test_prefetch_thumbnails(self, test_resources_dir, tmp_path):
+        """Test that prefetched thumbnails are cached and skipped when prefetched again"""
+        manager = PhotoManager()
+        manager.scan_folder(str(test_resources_dir), recursive=False)
+        indices = list(range(len(manager.pd_photo_info)))
+        
+        with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path):
+            futures = manager.prefetch_thumbnails(indices + [len(indices)], 120)
+            paths = [future.result() for future in futures]
+            
+            assert len(paths) == len(indices)
+            assert paths == [manager.get_thumbnail(i, 120) for i in indices]
+            assert manager.prefetch_thumbnails(indices, 120) == []
+        manager.close()
+    
+    def test_close_stops_worker_threads(self, test_resources_dir, tmp_path):
+        """Test that prefetch threads start on first use and are stopped by close()"""
+        before = set(threading.enumerate())
+        with PhotoManager() as manager:
+            manager.scan_folder(str(test_resources_dir), recursive=False)
+            assert set(threading.enumerate()) == before
+            
+            with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path):
+                for future in manager.prefetch_thumbnails(range(len(manager.pd_photo_info)), 120):
+                    future.result()
+            started = set(threading.enumerate()) - before
+            assert started
+        
+        assert not any(thread.is_alive() for thread in started)
+    
+    def test_small_photo_is_its_own_thumbnail(self, tmp_path):
+        """Test that photos within the thumbnail size are served without re-encoding"""
+        photos = tmp_path / "photos"
+        photos.mkdir()
+        Image.new('RGB', (160, 120), 'red').save(photos / "small.jpg")
+        rotated = Image.new('RGB', (160, 120), 'blue')
+        exif = rotated.getexif()
+        exif[0x0112] = 6
+        rotated.save(photos / "rotated.jpg", exif=exif)
+        
+        manager = PhotoManager()
+        manager.scan_folder(str(photos))
+        with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path / "thumbs"):
+            paths = {manager.pd_photo_info.at[i, 'filename']: manager.get_thumbnail(i, 200)
+                     for i in range(len(manager.pd_photo_info))}
+        
+        assert paths['small.jpg'] == str(photos / "small.jpg")
+        assert Path(paths['rotated.jpg']).parent == tmp_path / "thumbs"
+    
+    def test_thumbnail_cache_evicts_files(self, test_resources_dir, tmp_path):
+        """Test that the thumbnail LRU is bounded and removes evicted thumbnail files"""
+        manager = PhotoManager()
+        manager.scan_folder(str(test_resources_dir), recursive=False)
+        
+        with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path), \
+             patch('app.photo_manager.THUMBNAIL_CACHE_MAX_ENTRIES', 2):
+            paths = [manager.get_thumbnail(i, 120) for i in range(3)]
+        
+        assert len(manager.thumbnail_cache) == 2
+        assert not Path(paths[0]).exists()
+        assert all(Path(path).exists() for path in paths[1:])
+    
+    def test_thumbnail_dir_prunes_earlier_runs(self, test_resources_dir, tmp_path):
+        """Test that thumbnails of finished processes are pruned and live ones are kept"""
+        dead = tmp_path / "999999999-deadbeef_0123.jpg"
+        legacy = tmp_path / "0123456789abcdef01234567.jpg"
+        live = tmp_path / f"{os.getpid()}-cafef00d_0123.jpg"
+        for path in (dead, legacy, live):
+            path.write_bytes(b"thumb")
+        
+        manager = PhotoManager()
+        manager.scan_folder(str(test_resources_dir), recursive=False)
+        with patch('app.photo_manager.THUMBNAIL_DIR', tmp_path), \
+             patch.object(PhotoManager, '_process_alive', side_effect=lambda pid: pid == os.getpid()):
+            thumb = manager.get_thumbnail(0, 120)
+        
+        assert not dead.exists()
+        assert not legacy.exists()
+        assert live.exists()
+        assert Path(thumb).exists()
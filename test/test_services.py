@@ -19,8 +19,8 @@ class TestElevationService:
         assert 'opentopodata' in service.services
         assert 'google' in service.services
     
-    @patch('app.elevation_service.requests.get')
-    def test_open_elevation_success(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_open_elevation_success(self, mock_post):
         """Test successful elevation fetch from Open-Elevation"""
         # Mock successful response
         mock_response = Mock()
@@ -28,58 +28,58 @@ class TestElevationService:
         mock_response.json.return_value = {
             'results': [{'elevation': 123.45}]
         }
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0, service='open-elevation')
         
         assert elevation == 123.45
-        assert mock_get.called
+        assert mock_post.called
     
-    @patch('app.elevation_service.requests.get')
-    def test_opentopo_success(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_opentopo_success(self, mock_post):
         """Test successful elevation fetch from OpenTopoData"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             'results': [{'elevation': 456.78}]
         }
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         elevation = service.get_elevation(48.8584, 2.2945, service='opentopodata')
         
         assert elevation == 456.78
     
-    @patch('app.elevation_service.requests.get')
-    def test_elevation_api_failure(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_elevation_api_failure(self, mock_post):
         """Test handling of API failure"""
         # Mock failed response
         mock_response = Mock()
         mock_response.status_code = 500
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0)
         
         assert elevation is None
     
-    @patch('app.elevation_service.requests.get')
-    def test_elevation_timeout(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_elevation_timeout(self, mock_post):
         """Test handling of request timeout"""
         import requests
-        mock_get.side_effect = requests.exceptions.Timeout()
+        mock_post.side_effect = requests.exceptions.Timeout()
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0)
         
         assert elevation is None
     
-    @patch('app.elevation_service.requests.get')
-    def test_elevation_connection_error(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_elevation_connection_error(self, mock_post):
         """Test handling of connection error"""
         import requests
-        mock_get.side_effect = requests.exceptions.ConnectionError()
+        mock_post.side_effect = requests.exceptions.ConnectionError()
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0)
@@ -96,51 +96,148 @@ class TestElevationService:
         except ValueError:
             pass  # Expected
     
-    @patch('app.elevation_service.requests.get')
-    def test_invalid_json_response(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_invalid_json_response(self, mock_post):
         """Test handling of invalid JSON response"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.side_effect = ValueError("Invalid JSON")
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0)
         
         assert elevation is None
     
-    @patch('app.elevation_service.requests.get')
-    def test_missing_elevation_in_response(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_missing_elevation_in_response(self, mock_post):
         """Test handling of missing elevation in response"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             'results': [{}]  # Missing elevation key
         }
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         elevation = service.get_elevation(45.0, -75.0)
         
         assert elevation is None
     
-    @patch('app.elevation_service.requests.get')
-    def test_coordinate_validation(self, mock_get):
+    @patch('app.elevation_service.requests.Session.post')
+    def test_coordinate_validation(self, mock_post):
         """Test that coordinates are properly formatted in request"""
         mock_response = Mock()
         mock_response.status_code = 200
         mock_response.json.return_value = {
             'results': [{'elevation': 100.0}]
         }
-        mock_get.return_value = mock_response
+        mock_post.return_value = mock_response
         
         service = ElevationService()
         service.get_elevation(48.8584, 2.2945)
         
         # Verify the request was made with correct coordinates
-        assert mock_get.called
-        call_args = mock_get.call_args
+        assert mock_post.called
+        call_args = mock_post.call_args
         assert '48.8584' in str(call_args) or 48.8584 in str(call_args)
+    
+    @patch('app.elevation_service.requests.Session.post')
+    def test_batch_elevations_single_request(self, mock_post):
+        """Test that multiple coordinates are fetched in one request, in order"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            'results': [{'elevation': 10.0}, {'elevation': 20.0}, {'elevation': None}]
+        }
+        mock_post.return_value = mock_response
+        
+        service = ElevationService()
+        elevations = service.get_elevations([(1.0, 2.0), (3.0, 4.0), (5.0, 6.0)], service='open-elevation')
+        
+        assert elevations == [10.0, 20.0, None]
+        assert mock_post.call_count == 1
+        locations = mock_post.call_args.kwargs['json']['locations']
+        assert locations[1] == {'latitude': 3.0, 'longitude': 4.0}
+    
+    @patch('app.elevation_service.time.sleep')
+    @patch('app.elevation_service.requests.Session.post')
+    def test_batch_elevations_chunked(self, mock_post, mock_sleep):
+        """Test that large batches are split into chunks of at most 100 locations"""
+        def respond(url, json=None, **kwargs):
+            count = len(json['locations'].split('|'))
+            response = Mock()
+            response.json.return_value = {'results': [{'elevation': 1.0}] * count}
+            return response
+        mock_post.side_effect = respond
+        
+        service = ElevationService()
+        elevations = service.get_elevations([(0.0, float(i)) for i in range(250)], service='opentopodata')
+        
+        assert len(elevations) == 250
+        assert mock_post.call_count == 3
+        # OpenTopoData is rate limited, so requests after the first are spaced out
+        assert mock_sleep.called
+    
+    @patch('app.elevation_service.requests.Session.post')
+    def test_parallel_elevations_preserve_order(self, mock_post):
+        """Test that concurrently fetched chunks are returned in input order"""
+        def respond(url, json=None, **kwargs):
+            response = Mock()
+            response.json.return_value = {
+                'results': [{'elevation': loc['longitude']} for loc in json['locations']]
+            }
+            return response
+        mock_post.side_effect = respond
+        
+        service = ElevationService()
+        coords = [(0.0, float(i)) for i in range(350)]
+        elevations = service.get_elevations_parallel(coords, service='open-elevation', workers=4)
+        
+        assert elevations == [float(i) for i in range(350)]
+        assert mock_post.call_count == 4
+    
+    @patch('app.elevation_service.requests.Session.post')
+    def test_elevation_cache_hit(self, mock_post):
+        """Test that repeated nearby lookups are served from the cache"""
+        mock_response = Mock()
+        mock_response.json.return_value = {'results': [{'elevation': 321.0}]}
+        mock_post.return_value = mock_response
+        
+        service = ElevationService()
+        assert service.get_elevation(45.123456, -75.0) == 321.0
+        # Same point within the ~1 m quantization grid
+        assert service.get_elevation(45.1234561, -75.0) == 321.0
+        
+        assert mock_post.call_count == 1
+    
+    @patch('app.elevation_service.requests.Session.post')
+    def test_elevation_cache_persistence(self, mock_post, tmp_path):
+        """Test that the cache is saved on close and reloaded"""
+        mock_response = Mock()
+        mock_response.json.return_value = {'results': [{'elevation': 12.5}]}
+        mock_post.return_value = mock_response
+        cache_file = tmp_path / "elev.json"
+        
+        with ElevationService(cache_file=cache_file) as service:
+            service.get_elevation(10.0, 20.0, service='opentopodata')
+        assert cache_file.exists()
+        
+        reloaded = ElevationService(cache_file=cache_file)
+        assert reloaded.get_elevation(10.0, 20.0, service='opentopodata') == 12.5
+        assert mock_post.call_count == 1
+    
+    def test_context_manager_closes_session(self):
+        """Test that the pooled session is closed when leaving the context"""
+        with patch('app.elevation_service.requests.Session.close') as mock_close:
+            with ElevationService() as service:
+                assert service is not None
+            assert mock_close.called
+    
+    def test_batch_elevations_empty(self):
+        """Test that an empty batch returns an empty list"""
+        service = ElevationService()
+        assert service.get_elevations([]) == []
 
 
 class TestGeocodingService:
@@ -151,7 +248,15 @@ class TestGeocodingService:
         service = GeocodingService()
         assert service is not None
     
-    @patch('app.geocoding_service.requests.get')
+    def test_session_pooling(self):
+        """Test that lookups share one session with the app User-Agent"""
+        service = GeocodingService()
+        
+        assert service.session.headers['User-Agent'] == 'GeotagPhotoApp/1.0'
+        adapter = service.session.get_adapter("https://nominatim.openstreetmap.org/reverse")
+        assert 429 in adapter.max_retries.status_forcelist
+    
+    @patch('app.geocoding_service.requests.Session.get')
     def test_nominatim_success(self, mock_get):
         """Test successful reverse geocoding with Nominatim"""
         mock_response = Mock()
@@ -174,7 +279,7 @@ class TestGeocodingService:
         assert result['state'] == 'Île-de-France'
         assert result['country'] == 'France'
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_photon_fallback(self, mock_get):
         """Test fallback to Photon when Nominatim fails"""
         # First call (Nominatim) fails, second call (Photon) succeeds
@@ -201,7 +306,7 @@ class TestGeocodingService:
         assert result is not None
         assert result['city'] == 'London'
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_both_providers_fail(self, mock_get):
         """Test handling when both providers fail"""
         mock_response = Mock()
@@ -213,7 +318,7 @@ class TestGeocodingService:
         
         assert result is None
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_partial_address_data(self, mock_get):
         """Test handling of partial address data"""
         mock_response = Mock()
@@ -234,7 +339,7 @@ class TestGeocodingService:
         assert result.get('state') is None or result['state'] == ''
         assert result.get('country') is None or result['country'] == ''
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_rate_limiting_delay(self, mock_get):
         """Test that rate limiting delay is applied for Nominatim"""
         import time
@@ -261,7 +366,7 @@ class TestGeocodingService:
         # (This test might be flaky, so we'll be lenient)
         assert elapsed >= 0.5  # At least some delay
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_connection_error_handling(self, mock_get):
         """Test handling of connection errors"""
         import requests
@@ -272,7 +377,7 @@ class TestGeocodingService:
         
         assert result is None
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_timeout_handling(self, mock_get):
         """Test handling of request timeouts"""
         import requests
@@ -283,7 +388,7 @@ class TestGeocodingService:
         
         assert result is None
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_invalid_json_handling(self, mock_get):
         """Test handling of invalid JSON in response"""
         mock_response = Mock()
@@ -296,7 +401,7 @@ class TestGeocodingService:
         
         assert result is None
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_photon_response_structure(self, mock_get):
         """Test parsing Photon's feature-based response structure"""
         mock_response = Mock()
@@ -319,7 +424,7 @@ class TestGeocodingService:
         
         assert result is not None
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_sublocation_extraction(self, mock_get):
         """Test extraction of sublocation (neighborhood)"""
         mock_response = Mock()
@@ -342,14 +447,77 @@ class TestGeocodingService:
         # Should extract sublocation from suburb or neighbourhood
         assert result.get('sublocation') is not None or result.get('city') is not None
 
+    
+    @patch('app.geocoding_service.sleep')
+    @patch('app.geocoding_service.requests.Session.get')
+    def test_single_lookup_does_not_sleep(self, mock_get, mock_sleep):
+        """Test that the Nominatim rate limit only delays back-to-back requests"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'address': {'city': 'Paris', 'country': 'France'}}
+        mock_get.return_value = mock_response
+        
+        service = GeocodingService()
+        service.reverse_geocode(48.8584, 2.2945)
+        assert not mock_sleep.called
+        
+        service.reverse_geocode(40.4168, -3.7038)
+        assert mock_sleep.call_count == 1
+        assert 0 < mock_sleep.call_args[0][0] <= 1.0
+    
+    @patch('app.geocoding_service.sleep')
+    @patch('app.geocoding_service.requests.Session.get')
+    def test_nearby_lookups_use_cache(self, mock_get, mock_sleep, tmp_path):
+        """Test that nearby coordinates are answered from the cache and persisted"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {'address': {'city': 'Paris', 'country': 'France'}}
+        mock_get.return_value = mock_response
+        
+        cache_file = tmp_path / "geocode.json"
+        service = GeocodingService(cache_file=cache_file)
+        first = service.reverse_geocode(48.85840, 2.29450)
+        second = service.reverse_geocode(48.85841, 2.29451)
+        
+        assert first == second
+        assert mock_get.call_count == 1
+        
+        service.close()
+        reloaded = GeocodingService(cache_file=cache_file)
+        assert reloaded.reverse_geocode(48.8584, 2.2945)['city'] == 'Paris'
+        assert mock_get.call_count == 1
+
+    @patch('app.geocoding_service.requests.Session.get')
+    def test_reverse_geocode_batch_photon(self, mock_get):
+        """Test batch geocoding with Photon, keeping input order and skipping duplicates"""
+        def photon_response(url, params=None, **kwargs):
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {
+                'features': [{'properties': {'city': f"City {params['lat']}", 'country': 'Spain'}}]
+            }
+            return response
+        mock_get.side_effect = photon_response
+        
+        service = GeocodingService()
+        service.set_provider('photon')
+        coords = [(40.0, -3.0), (41.0, -3.0), (40.0, -3.0), (-360.0, -360.0)]
+        results = service.reverse_geocode_batch(coords, max_workers=4)
+        
+        assert results[0]['city'] == 'City 40.0'
+        assert results[1]['city'] == 'City 41.0'
+        assert results[2] == results[0]
+        assert results[3] is None
+        assert mock_get.call_count == 2
+
 
 class TestServiceIntegration:
     """Test integration scenarios between services"""
     
     @patch('app.geocoding_service.sleep')  # Patch sleep to speed up tests
-    @patch('app.elevation_service.requests.get')
-    @patch('app.geocoding_service.requests.get')
-    def test_combined_elevation_and_geocoding(self, mock_geo_get, mock_elev_get, mock_sleep):
+    @patch('app.elevation_service.requests.Session.post')
+    @patch('app.geocoding_service.requests.Session.get')
+    def test_combined_elevation_and_geocoding(self, mock_geo_get, mock_elev_post, mock_sleep):
         """Test using both services together"""
         # Mock elevation service
         elev_response = Mock()
@@ -357,7 +525,7 @@ class TestServiceIntegration:
         elev_response.json.return_value = {
             'results': [{'elevation': 35.0}]
         }
-        mock_elev_get.return_value = elev_response
+        mock_elev_post.return_value = elev_response
         
         # Mock geocoding service (Nominatim response structure)
         geo_response = Mock()
@@ -429,7 +597,7 @@ class TestServiceConfiguration:
         assert service is not None
         assert hasattr(service, 'services')
     
-    @patch('app.geocoding_service.requests.get')
+    @patch('app.geocoding_service.requests.Session.get')
     def test_user_agent_header(self, mock_get):
         """Test that proper User-Agent header is set"""
         mock_response = Mock()